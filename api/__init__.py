@@ -3,6 +3,9 @@ api 패키지
 
 - hand.py  : 손 분석 및 라켓 추천 API 블루프린트 (hand_bp)
 - admin.py : DB 관리용 API 블루프린트 (admin_bp)
+- analytics.py : 추천 통계 조회 API 블루프린트 (analytics_bp)
+- health.py : 생존/준비 상태 확인, /metrics 블루프린트 (health_bp)
+- catalog.py : 공개 라켓 목록 (HTTP 캐시 가능) 블루프린트 (catalog_bp)
 """
 
 # 필요하면 블루프린트를 여기서 재노출할 수도 있습니다.
@@ -1,12 +1,36 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy import select, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
 from db_config import (
     db,
+    read_session,
     reset_db,
     Racket,
     HandMetrics,
     SurveyResponse,
     RecommendationLog,
+    ArchiveRollup,
+    CatalogMeta,
+)
+from services.catalog_service import (
+    bump_catalog_version,
+    catalog_read_session,
+    get_catalog_stamp,
+    get_catalog_version,
 )
+from services.profile_cache import invalidate_profile_cache
+from utils.http_cache import version_etag, not_modified, with_cache_headers
+from utils.profiler import list_profiles, load_profile, profiler_enabled
+from utils.sql_stats import query_budget
 
 admin_bp = Blueprint("admin_api", __name__)
 
@@ -154,7 +178,13 @@ def _apply_racket_fields_from_dict(racket: Racket, data: dict, is_create: bool =
 
 @admin_bp.route("/admin/reset-db", methods=["POST"])
 def reset_db_route():
+    # 리셋 후에도 버전은 계속 증가해야 다른 워커 캐시가 무효화된다.
+    prev_version = get_catalog_version()
     reset_db()
+    db.session.execute(update(CatalogMeta).values(version=prev_version + 1))
+    db.session.commit()
+    # id가 1부터 다시 쓰이므로 이 워커의 프로필 캐시도 비운다 (다른 워커는 TTL)
+    invalidate_profile_cache()
     return jsonify({"status": "ok", "message": "DB reset complete"})
 
 
@@ -167,11 +197,23 @@ def reset_db_route():
 def admin_rackets():
     """
     GET  /admin/rackets   : 모든 라켓 조회 (활성/비활성 모두)
+                            ETag = 카탈로그 버전, 바뀌지 않았으면 라켓 조회 없이 304
     POST /admin/rackets   : 라켓 신규 등록
     """
     if request.method == "GET":
-        rackets = Racket.query.order_by(Racket.id.asc()).all()
-        return jsonify({"rackets": [r.to_dict() for r in rackets]})
+        # admin은 방금 수정한 내용이 바로 보여야 하므로 매번 primary 버전을 확인한다.
+        cache_control = "private, no-cache"
+        version, updated_at = get_catalog_stamp()
+        etag = version_etag("admin-rackets", version)
+        cached = not_modified(etag, updated_at, cache_control)
+        if cached is not None:
+            return cached
+
+        rackets = (
+            catalog_read_session(version).query(Racket).order_by(Racket.id.asc()).all()
+        )
+        response = jsonify({"rackets": [r.to_dict() for r in rackets]})
+        return with_cache_headers(response, etag, updated_at, cache_control)
 
     # POST - 생성
     data = request.get_json(silent=True) or {}
@@ -188,6 +230,7 @@ def admin_rackets():
     _apply_racket_fields_from_dict(racket, data, is_create=True)
 
     db.session.add(racket)
+    bump_catalog_version()
     db.session.commit()
 
     return jsonify({"racket": racket.to_dict()}), 201
@@ -209,65 +252,467 @@ def admin_racket_detail(racket_id):
 
     if request.method == "DELETE":
         db.session.delete(racket)
+        bump_catalog_version()
         db.session.commit()
         return jsonify({"status": "ok"})
 
     # PUT - 수정
     data = request.get_json(silent=True) or {}
     _apply_racket_fields_from_dict(racket, data, is_create=False)
+    bump_catalog_version()
     db.session.commit()
     return jsonify({"racket": racket.to_dict()})
 
 
+# ------------------------------------------------------------
+# 라켓 일괄 등록/수정 (brand + name 기준 upsert)
+# ------------------------------------------------------------
+
+# 값이 있으면 정수여야 하는 입력 키 (_apply_racket_fields_from_dict에서 _to_int로 읽는 키)
+_BULK_INT_KEYS = (
+    "power", "control", "spin", "weight",
+    "headSizeSqIn", "head_size_sq_in",
+    "unstrungWeightG", "unstrung_weight_g",
+    "swingweight",
+    "stiffnessRa", "stiffness_ra",
+    "lengthMm", "length_mm",
+    "powerScore", "controlScore", "spinScore", "comfortScore", "maneuverScore",
+    "levelMin", "levelMax",
+)
+
+# 값이 있으면 문자열이어야 하는 입력 키 (_apply_racket_fields_from_dict에서 .strip()으로 읽는 키)
+_BULK_STR_KEYS = (
+    "name", "brand", "url",
+    "stringPattern", "string_pattern",
+    "balanceType", "balance_type",
+)
+
+# NOT NULL + default가 있는 컬럼은 빈 값이면 insert 시 default, update 시 기존 값 유지
+_BULK_SKIP_IF_NONE = ("power", "control", "spin", "is_active")
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "y", "yes", "on")
+    return bool(value)
+
+
+def _read_bulk_rows():
+    """
+    JSON 배열({"rackets": [...]}도 허용) 또는 CSV(파일 업로드 'file' / text/csv 본문)를
+    dict 목록으로 읽는다. CSV 헤더는 JSON 키(name, brand, powerScore ...)와 같다.
+    """
+    upload = request.files.get("file")
+    if upload is not None:
+        text_body = upload.read().decode("utf-8-sig")
+    elif request.mimetype == "text/csv":
+        text_body = request.get_data(as_text=True)
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("rackets")
+        if not isinstance(data, list):
+            return None
+        return data
+
+    # CSV: 빈 칸은 "값 없음"으로 보고 키 자체를 뺀다 (부분 수정 의미 유지)
+    rows = []
+    for raw in csv.DictReader(io.StringIO(text_body)):
+        rows.append({k.strip(): v for k, v in raw.items() if k and v not in (None, "")})
+    return rows
+
+
+def _is_bulk_int(value):
+    # JSON 숫자(정수값) 또는 CSV 문자열만 허용 (true/false, 배열/객체는 거부)
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, float):
+        return value.is_integer()
+    if isinstance(value, (int, str)):
+        return _to_int(value) is not None
+    return False
+
+
+def _validate_bulk_row(data):
+    if not isinstance(data, dict):
+        return ["객체(dict)여야 합니다."]
+
+    errors = []
+    for key in _BULK_STR_KEYS:
+        value = data.get(key)
+        if value is not None and not isinstance(value, str):
+            errors.append(f"{key}: 문자열이어야 합니다 ({value!r})")
+    for key in ("name", "brand"):
+        value = data.get(key)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            errors.append(f"{key} 필드는 반드시 필요합니다.")
+
+    for key in _BULK_INT_KEYS:
+        value = data.get(key)
+        if value is None or value == "":
+            continue
+        if not _is_bulk_int(value):
+            errors.append(f"{key}: 정수가 아닙니다 ({value!r})")
+    return errors
+
+
+def _bulk_column_values(data, is_create):
+    """
+    _apply_racket_fields_from_dict와 같은 규칙으로 {컬럼: 값} dict를 만든다.
+    (ORM 객체를 만들지 않고 bulk insert/update 파라미터로 바로 사용)
+    """
+    if "isActive" in data:
+        data = dict(data, isActive=_to_bool(data["isActive"]))
+
+    holder = SimpleNamespace()
+    _apply_racket_fields_from_dict(holder, data, is_create=is_create)
+    values = vars(holder)
+    for key in _BULK_SKIP_IF_NONE:
+        if key in values and values[key] is None:
+            del values[key]
+    return values
+
+
+def _bulk_insert_conflicts(insert_keys):
+    """
+    insert하려던 (brand, name) 중 그사이 다른 요청이 먼저 넣은 것들을 row별 오류로 만든다.
+    (IntegrityError 롤백 후 호출 — insert_keys: {(brand, name): row 번호})
+    """
+    if not insert_keys:
+        return []
+    brands = {brand for brand, _ in insert_keys}
+    taken = {
+        (brand, name)
+        for brand, name in db.session.execute(
+            select(Racket.brand, Racket.name).where(Racket.brand.in_(brands))
+        )
+    }
+    return [
+        {"row": idx, "errors": ["(brand, name)이 다른 요청으로 이미 등록되었습니다. 다시 보내면 update됩니다."]}
+        for key, idx in sorted(insert_keys.items(), key=lambda item: item[1])
+        if key in taken
+    ]
+
+
+@admin_bp.route("/admin/rackets/bulk", methods=["POST"])
+def admin_rackets_bulk():
+    """
+    POST /admin/rackets/bulk : 라켓 일괄 upsert
+
+    - 입력: JSON 배열 / {"rackets": [...]} / CSV 업로드
+    - 모든 row를 먼저 검증하고, 하나라도 오류가 있으면 아무것도 쓰지 않고
+      row별 오류 목록을 400으로 돌려준다.
+    - (brand, name)이 이미 있으면 update, 없으면 insert.
+      한 트랜잭션 안에서 bulk insert/update 후 카탈로그 버전을 한 번만 올린다.
+    - 조회 후 다른 요청이 같은 (brand, name)을 먼저 넣었으면 유니크 인덱스
+      uq_rackets_brand_name 위반 → 전체 롤백하고 해당 row 목록을 409로 돌려준다. (다시 보내면 update)
+    """
+    rows = _read_bulk_rows()
+    if rows is None:
+        return jsonify({"error": "JSON 배열 또는 CSV가 필요합니다."}), 400
+
+    errors = []
+    seen = {}
+    for idx, data in enumerate(rows):
+        row_errors = _validate_bulk_row(data)
+        if not row_errors:
+            key = (str(data["brand"]).strip(), str(data["name"]).strip())
+            if key in seen:
+                row_errors.append(f"(brand, name) 중복: {seen[key]}번째 row와 같습니다.")
+            else:
+                seen[key] = idx
+        if row_errors:
+            errors.append({"row": idx, "errors": row_errors})
+
+    if errors:
+        return jsonify({"error": "validation failed", "rows": errors}), 400
+
+    existing = {
+        (brand, name): racket_id
+        for racket_id, brand, name in db.session.execute(
+            select(Racket.id, Racket.brand, Racket.name)
+        )
+    }
+
+    inserts, updates = [], []
+    insert_keys = {}  # (brand, name) -> row 번호
+    for idx, data in enumerate(rows):
+        key = (str(data["brand"]).strip(), str(data["name"]).strip())
+        racket_id = existing.get(key)
+        if racket_id is None:
+            inserts.append(_bulk_column_values(data, is_create=True))
+            insert_keys[key] = idx
+        else:
+            values = _bulk_column_values(data, is_create=False)
+            values["id"] = racket_id
+            updates.append(values)
+
+    try:
+        if inserts:
+            db.session.execute(insert(Racket), inserts)
+        if updates:
+            db.session.execute(update(Racket), updates)
+        bump_catalog_version()
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        conflicts = _bulk_insert_conflicts(insert_keys)
+        if not conflicts:
+            return jsonify({"error": f"bulk upsert failed: {e.orig}"}), 500
+        return jsonify({"error": "conflict", "rows": conflicts}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"bulk upsert failed: {e}"}), 500
+
+    return jsonify(
+        {
+            "status": "ok",
+            "inserted": len(inserts),
+            "updated": len(updates),
+        }
+    )
+
+
 # ------------------------------------------------------------
 # HandMetrics / SurveyResponse / RecommendationLog 조회용 API
 # ------------------------------------------------------------
 
 
-@admin_bp.route("/admin/hand-metrics", methods=["GET"])
-def admin_hand_metrics():
+# keyset 첫 페이지 상한 (BIGINT 최댓값)
+_MAX_ID = 2**63 - 1
+
+
+def _keyset_page(model, *, options=(), serialize=None):
     """
-    최근 손 분석 결과 조회 (기본 50건, 최대 200건)
+    id 내림차순 keyset 페이지네이션.
+    - ?limit=N (기본 50, 최대 200)
+    - ?cursor=<id> : 이전 페이지의 nextCursor (이 id보다 작은 row부터)
+    - options : joinedload 등 로더 옵션 (관계 조회를 한 쿼리로 묶을 때)
+    - 복제본이 설정돼 있으면 복제본에서 읽는다.
+    - 모델에 list_columns()/row_to_list_dict()가 있으면 ORM 객체 없이 컬럼 Row로 바로 직렬화
     """
     limit = _to_int(request.args.get("limit")) or 50
     limit = max(1, min(limit, 200))
-
-    rows = (
-        HandMetrics.query.order_by(HandMetrics.id.desc())
-        .limit(limit)
-        .all()
+    cursor = _to_int(request.args.get("cursor"))
+
+    columnar = serialize is None and not options and hasattr(model, "list_columns")
+    if columnar:
+        stmt = select(*model.list_columns())
+        serialize = model.row_to_list_dict
+    else:
+        stmt = select(model).options(*options)
+        serialize = serialize or (lambda r: r.to_dict())
+    # 첫 페이지도 같은 keyset 조건(id < 상한)으로 읽는다 → 모든 페이지가 PK 범위 검색 한 번
+    stmt = stmt.where(model.id < (cursor if cursor is not None else _MAX_ID))
+
+    # 한 건 더 읽어서 다음 페이지 존재 여부 판단
+    result = read_session().execute(stmt.order_by(model.id.desc()).limit(limit + 1))
+    rows = result.all() if columnar else result.scalars().unique().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify(
+        {
+            "items": [serialize(r) for r in rows],
+            "nextCursor": rows[-1].id if has_more else None,
+        }
     )
-    return jsonify({"items": [r.to_dict() for r in rows]})
+
+
+@admin_bp.route("/admin/hand-metrics", methods=["GET"])
+@query_budget(1)
+def admin_hand_metrics():
+    """
+    최근 손 분석 결과 조회 (기본 50건, 최대 200건, cursor로 다음 페이지)
+    """
+    return _keyset_page(HandMetrics)
 
 
 @admin_bp.route("/admin/surveys", methods=["GET"])
+@query_budget(1)
 def admin_surveys():
     """
-    최근 설문 응답 조회 (기본 50건, 최대 200건)
+    최근 설문 응답 조회 (기본 50건, 최대 200건, cursor로 다음 페이지)
     """
-    limit = _to_int(request.args.get("limit")) or 50
-    limit = max(1, min(limit, 200))
-
-    rows = (
-        SurveyResponse.query.order_by(SurveyResponse.id.desc())
-        .limit(limit)
-        .all()
-    )
-    return jsonify({"items": [r.to_dict() for r in rows]})
+    return _keyset_page(SurveyResponse)
 
 
 @admin_bp.route("/admin/recommendations", methods=["GET"])
+@query_budget(1)
 def admin_recommendations():
     """
-    최근 추천 로그 조회 (기본 50건, 최대 200건)
+    최근 추천 로그 조회 (기본 50건, 최대 200건, cursor로 다음 페이지)
     - hand_metrics_id / survey_response_id / racket_id / 점수 / 스트링 정보 등 포함
+    - 라켓 이름/브랜드, 손/설문 요약도 함께 (LEFT JOIN 한 번으로 로드, row별 추가 쿼리 없음)
     """
-    limit = _to_int(request.args.get("limit")) or 50
-    limit = max(1, min(limit, 200))
+    log = RecommendationLog
+    options = (
+        joinedload(log.racket).load_only(Racket.name, Racket.brand),
+        joinedload(log.hand_metrics).load_only(
+            HandMetrics.hand_length_mm,
+            HandMetrics.hand_width_mm,
+            HandMetrics.hand_size_category,
+        ),
+        joinedload(log.survey_response).load_only(
+            SurveyResponse.level,
+            SurveyResponse.pain,
+            SurveyResponse.swing,
+            SurveyResponse.styles_json,
+        ),
+    )
+    return _keyset_page(log, options=options, serialize=lambda r: r.to_admin_dict())
+
+
+# ------------------------------------------------------------
+# 이력 export (CSV / NDJSON 스트리밍)
+# ------------------------------------------------------------
+
+_EXPORT_TABLES = {
+    "hand-metrics": HandMetrics,
+    "surveys": SurveyResponse,
+    "recommendations": RecommendationLog,
+}
+
+_EXPORT_YIELD_PER = 1000
+
+
+def _export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _parse_date_arg(name):
+    """
+    ?since= / ?until= (ISO 날짜/시각). 없으면 None, 형식이 틀리면 ValueError
+    (오타를 조건 없음으로 보면 테이블 전체가 내려간다)
+    """
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{name}는 YYYY-MM-DD 형식이어야 합니다: {raw!r}")
+
 
+@admin_bp.route("/admin/export/<table>", methods=["GET"])
+def admin_export(table):
+    """
+    GET /admin/export/<hand-metrics|surveys|recommendations>
+      ?format=csv|ndjson (기본 ndjson)
+      &since=2024-01-01&until=2024-02-01 (created_at 기준, 선택)
+
+    - ORM 객체를 만들지 않고 컬럼 튜플만 스트리밍 (기간 조건이 있으면 yield_per, 없으면 id keyset batch)
+    - 응답도 generator로 내려보내므로 테이블 크기와 무관하게 메모리 사용량이 일정하다.
+    """
+    model = _EXPORT_TABLES.get(table)
+    if model is None:
+        return jsonify({"error": f"unknown table: {table}"}), 404
+
+    fmt = (request.args.get("format") or "ndjson").lower()
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format은 csv 또는 ndjson만 가능합니다."}), 400
+
+    columns = list(model.__table__.columns)
+    names = [c.name for c in columns]
+
+    stmt = select(*columns)
+    try:
+        since = _parse_date_arg("since")
+        until = _parse_date_arg("until")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if since is not None:
+        stmt = stmt.where(model.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(model.created_at < until)
+
+    def batches():
+        if since is not None or until is not None:
+            # 기간 조건이 있으면 created_at 인덱스 순서 그대로 읽어 정렬용 임시 테이블을 피한다.
+            ordered = stmt.order_by(model.created_at.asc(), model.id.asc())
+            result = read_session().execute(ordered.execution_options(yield_per=_EXPORT_YIELD_PER))
+            yield from result.partitions()
+            return
+        # 전체 export는 id keyset으로 끊어 읽는다 (batch마다 PK 범위 검색, 긴 커서를 열어 두지 않음)
+        id_index = names.index("id")
+        last_id = 0
+        while True:
+            rows = read_session().execute(
+                stmt.where(model.id > last_id).order_by(model.id.asc()).limit(_EXPORT_YIELD_PER)
+            ).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][id_index]
+
+    def generate_ndjson():
+        for partition in batches():
+            for row in partition:
+                record = {k: _export_value(v) for k, v in zip(names, row)}
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    def generate_csv():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(names)
+        for partition in batches():
+            for row in partition:
+                writer.writerow([_export_value(v) for v in row])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+        yield buf.getvalue()
+
+    if fmt == "csv":
+        body, mimetype = generate_csv(), "text/csv"
+    else:
+        body, mimetype = generate_ndjson(), "application/x-ndjson"
+
+    filename = f"{model.__tablename__}.{fmt}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@admin_bp.route("/admin/archive-rollups", methods=["GET"])
+def admin_archive_rollups():
+    """
+    아카이브 요약 조회 (테이블 × 날짜 단위, 최근 날짜 순)
+    """
     rows = (
-        RecommendationLog.query.order_by(RecommendationLog.id.desc())
-        .limit(limit)
+        read_session()
+        .query(ArchiveRollup)
+        .order_by(ArchiveRollup.partition_date.desc(), ArchiveRollup.table_name.asc())
         .all()
     )
     return jsonify({"items": [r.to_dict() for r in rows]})
+
+
+# ------------------------------------------------------------
+# 요청 프로파일 (PROFILE_SAMPLE_RATE / PROFILE_SLOW_MS)
+# ------------------------------------------------------------
+
+
+@admin_bp.route("/admin/profiles", methods=["GET"])
+def admin_profiles():
+    """
+    수집된 요청 프로파일 목록 (최신순, 디스크 ring에 남아 있는 것만)
+    """
+    return jsonify({"enabled": profiler_enabled(), "items": list_profiles()})
+
+
+@admin_bp.route("/admin/profiles/<name>", methods=["GET"])
+def admin_profile_detail(name):
+    """
+    프로파일 한 건 (cProfile 요약 또는 스택 샘플, SQL 문/시간 포함)
+    """
+    record = load_profile(name)
+    if record is None:
+        return jsonify({"error": "not found"}), 404
+    return jsonify(record)
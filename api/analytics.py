@@ -0,0 +1,67 @@
+from datetime import date
+
+from flask import Blueprint, request, jsonify
+
+from services.analytics_service import top_rackets, breakdown
+
+analytics_bp = Blueprint("analytics_api", __name__)
+
+
+# ------------------------------------------------------------
+# 공통 유틸
+# ------------------------------------------------------------
+
+
+def _date_arg(name):
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        return None
+
+
+def _filters_from_args():
+    """
+    공통 필터: since / until (YYYY-MM-DD, until 미포함), racketId, handSize, level
+    """
+    racket_id = request.args.get("racketId")
+    return {
+        "since": _date_arg("since"),
+        "until": _date_arg("until"),
+        "racket_id": int(racket_id) if racket_id and racket_id.isdigit() else None,
+        "hand_size": request.args.get("handSize") or None,
+        "level": request.args.get("level") or None,
+    }
+
+
+# ------------------------------------------------------------
+# 추천 통계 API (recommendation_rollups만 조회)
+# ------------------------------------------------------------
+
+
+@analytics_bp.route("/admin/analytics/top-rackets", methods=["GET"])
+def analytics_top_rackets():
+    """
+    가장 많이 추천된 라켓 (기본 20개, 최대 100개)
+    """
+    try:
+        limit = int(request.args.get("limit") or 20)
+    except ValueError:
+        limit = 20
+    limit = max(1, min(limit, 100))
+    return jsonify({"items": top_rackets(limit=limit, **_filters_from_args())})
+
+
+@analytics_bp.route("/admin/analytics/breakdown/<group_by>", methods=["GET"])
+def analytics_breakdown(group_by):
+    """
+    group_by: day / rankBucket / handSize / level / cohort
+    예) /admin/analytics/breakdown/cohort?racketId=3&since=2024-01-01
+    """
+    try:
+        items = breakdown(group_by, **_filters_from_args())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"items": items})
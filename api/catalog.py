@@ -0,0 +1,38 @@
+import os
+
+from flask import Blueprint, current_app
+
+from services.catalog_service import peek_catalog_stamp, get_catalog_stamp, get_public_listing
+from utils.http_cache import version_etag, not_modified, with_cache_headers
+
+catalog_bp = Blueprint("catalog_api", __name__)
+
+# 리버스 프록시/브라우저가 재검증 없이 재사용해도 되는 시간 (초)
+CATALOG_CACHE_MAX_AGE_SEC = int(os.getenv("CATALOG_CACHE_MAX_AGE_SEC", "60"))
+
+
+@catalog_bp.route("/rackets", methods=["GET"])
+def public_rackets():
+    """
+    공개 라켓 목록 (활성 라켓만, 읽기 전용)
+    - ETag: 카탈로그 버전, Last-Modified: catalog_meta.updated_at
+    - If-None-Match / If-Modified-Since가 최신이면 304 (프로세스 내 버전 캐시로 DB 접근 없음)
+    - 본문은 카탈로그 버전마다 한 번만 직렬화
+    """
+    cache_control = f"public, max-age={CATALOG_CACHE_MAX_AGE_SEC}"
+    version, updated_at = peek_catalog_stamp()
+    etag = version_etag("rackets", version)
+
+    cached = not_modified(etag, updated_at, cache_control)
+    if cached is not None:
+        return cached
+
+    listing_version, body = get_public_listing()
+    if listing_version != version:
+        version, updated_at = get_catalog_stamp()
+        etag = version_etag("rackets", listing_version)
+        if version != listing_version:
+            updated_at = None
+
+    response = current_app.response_class(body + "\n", mimetype=current_app.json.mimetype)
+    return with_cache_headers(response, etag, updated_at, cache_control)
@@ -1,16 +1,48 @@
 import os
+import tempfile
+from contextlib import contextmanager
 from flask import Blueprint, request, jsonify
 
 from utils.hand_utils import analyze_hand
-from services.recommend_service import recommend_rackets_from_metrics
+from utils.json_provider import loads_json
+from services.recommend_service import (
+    recommend_rackets_from_metrics,
+    scan_and_recommend,
+    sweep_recommendations,
+)
 from services.history_service import save_hand_metrics_from_result  # ✅ 추가
+from utils.admission import admission_control
+from utils.executors import inference_executor
+from utils.upload_guard import image_upload
 
 hand_bp = Blueprint("hand_api", __name__)
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+@contextmanager
+def _uploaded_image(file):
+    # 동시 요청(스레드 워커 포함)끼리 파일이 섞이지 않도록 요청마다 임시 파일
+    fd, temp_path = tempfile.mkstemp(suffix=".jpg")
+    os.close(fd)
+    try:
+        file.save(temp_path)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
+
+
+def _capture_info():
+    capture_distance = request.form.get("captureDistance")
+    capture_device = request.form.get("captureDevice")
+
+    try:
+        capture_distance_cm = float(capture_distance) if capture_distance else None
+    except Exception:
+        capture_distance_cm = None
+    return capture_distance_cm, capture_device
 
 
 @hand_bp.route("/scan-hand", methods=["POST"])
+@image_upload
+@admission_control("scan")
 def scan_hand():
     # 파일 체크
     if "file" not in request.files:
@@ -18,25 +50,17 @@ def scan_hand():
 
     file = request.files["file"]
 
-    # 임시 저장 경로 (필요하면 uuid 등으로 바꿔도 됨)
-    temp_path = os.path.join(BASE_DIR, "temp.jpg")
-    file.save(temp_path)
-
     # 촬영 정보
-    capture_distance = request.form.get("captureDistance")
-    capture_device = request.form.get("captureDevice")
+    capture_distance_cm, capture_device = _capture_info()
 
-    try:
-        capture_distance_cm = float(capture_distance) if capture_distance else None
-    except Exception:
-        capture_distance_cm = None
-
-    # 손 분석 실행
-    result = analyze_hand(
-        temp_path,
-        capture_distance_cm=capture_distance_cm,
-        capture_device=capture_device,
-    )
+    # 손 분석 실행 (/scan-and-recommend와 같은 추론 전용 executor, 임시 파일은 결과를 받은 뒤 삭제)
+    with _uploaded_image(file) as temp_path:
+        result = inference_executor().submit(
+            analyze_hand,
+            temp_path,
+            capture_distance_cm=capture_distance_cm,
+            capture_device=capture_device,
+        ).result()
 
     if result is None:
         return jsonify({"error": "손 인식 실패"}), 400
@@ -56,3 +80,47 @@ def recommend_rackets_api():
     data = request.get_json(silent=True) or {}
     result = recommend_rackets_from_metrics(data)
     return jsonify(result)
+
+
+@hand_bp.route("/recommend-rackets/sweep", methods=["POST"])
+def recommend_rackets_sweep_api():
+    # 설문 조합별 추천 일괄 계산 (로그 없음)
+    data = request.get_json(silent=True) or {}
+    try:
+        result = sweep_recommendations(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+
+@hand_bp.route("/scan-and-recommend", methods=["POST"])
+@image_upload
+@admission_control("scan")
+def scan_and_recommend_api():
+    """
+    multipart: file(손 이미지) + survey(설문 JSON 문자열, 옵션) + captureDistance / captureDevice
+    /scan-hand → /recommend-rackets 두 번 왕복 대신 한 번에 분석 + 추천 + 저장
+    """
+    if "file" not in request.files:
+        return jsonify({"error": "이미지 파일이 필요합니다"}), 400
+
+    try:
+        survey = loads_json(request.form.get("survey") or "{}")
+    except ValueError:
+        return jsonify({"error": "survey는 JSON 객체여야 합니다"}), 400
+    if not isinstance(survey, dict):
+        return jsonify({"error": "survey는 JSON 객체여야 합니다"}), 400
+
+    capture_distance_cm, capture_device = _capture_info()
+
+    with _uploaded_image(request.files["file"]) as temp_path:
+        result = scan_and_recommend(
+            temp_path,
+            survey,
+            capture_distance_cm=capture_distance_cm,
+            capture_device=capture_device,
+        )
+
+    if result is None:
+        return jsonify({"error": "손 인식 실패"}), 400
+    return jsonify(result)
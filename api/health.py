@@ -0,0 +1,34 @@
+from flask import Blueprint, current_app, jsonify
+
+from services.boot_service import boot_status
+from utils.metrics import render_metrics
+
+health_bp = Blueprint("health_api", __name__)
+
+
+@health_bp.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    프로세스 생존 여부만 확인 (DB 접근 없음)
+    """
+    return jsonify({"status": "ok"})
+
+
+@health_bp.route("/readyz", methods=["GET"])
+def readyz():
+    """
+    워커 준비 상태 (스키마 확인 + 카탈로그 프리로드 완료 여부, time-to-ready)
+    - 준비 전이면 503
+    """
+    status = boot_status(current_app)
+    return jsonify(status), (200 if status["ready"] else 503)
+
+
+@health_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus 텍스트 포맷 메트릭 (요청 지연, 단계별 시간, DB 쿼리, 캐시 hit/miss, 진행 중 스캔)
+    """
+    return current_app.response_class(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
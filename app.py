@@ -1,34 +1,167 @@
 import os
+import time
+import click
 from flask import Flask
-from db_config import db, init_db
+from db_config import (
+    db,
+    init_db,
+    init_read_session,
+    engine_options_for_url,
+    READ_BIND_KEY,
+)
 
 from views.main import main_bp
 from api.hand import hand_bp
 from api.admin import admin_bp
+from api.analytics import analytics_bp
+from api.health import health_bp
+from api.catalog import catalog_bp
+from services.boot_service import boot_app
+from utils.sql_stats import init_sql_stats
+from utils.json_provider import init_json_provider
+from utils.admission import init_admission
+from utils.metrics import init_metrics
+from utils.profiler import init_profiler
+from utils.upload_guard import init_upload_guard
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def create_app() -> Flask:
+    boot_started = time.perf_counter()
     app = Flask(__name__)
 
+    # JSON 직렬화 (orjson이 있으면 사용)
+    init_json_provider(app)
+
+    # 업로드 크기/형식 제한 (손 사진은 본문을 다 받기 전에 거른다)
+    init_upload_guard(app)
+
     # DB 설정
-    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
+    database_url = os.getenv(
         "DATABASE_URL",
         "sqlite:///" + os.path.join(BASE_DIR, "rackets.db"),
     )
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options_for_url(database_url)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-    # DB 초기화
+    # 읽기 전용 복제본 (카탈로그 로드, admin 목록 조회, 통계 API용, 선택)
+    read_database_url = os.getenv("READ_DATABASE_URL")
+    if read_database_url:
+        app.config["SQLALCHEMY_BINDS"] = {
+            READ_BIND_KEY: {
+                "url": read_database_url,
+                **engine_options_for_url(read_database_url),
+            }
+        }
+
+    # DB 연결 (스키마 생성/확인은 아래 boot_app에서 DB_BOOT_MODE에 따라)
     db.init_app(app)
-    with app.app_context():
-        init_db()
+    init_read_session(app)
+
+    # /metrics 용 요청 지연/상태 코드 수집
+    init_metrics(app)
+
+    # 느린 요청 프로파일 수집 (PROFILE_SAMPLE_RATE / PROFILE_SLOW_MS 지정 시에만)
+    init_profiler(app)
+
+    # 요청별 SQL 쿼리 카운터 (목록 API 쿼리 수 회귀 체크)
+    init_sql_stats(app)
+
+    # /scan-hand 입장 제어 (클라이언트별 rate limit + 동시 스캔 상한, ADMISSION_MODE)
+    init_admission(app)
 
     # 블루프린트 등록
     app.register_blueprint(main_bp)
     app.register_blueprint(hand_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(catalog_bp)
+
+    # CLI 명령
+    @app.cli.command("init-db")
+    def init_db_command():
+        """테이블 생성/업그레이드 + 샘플 seed + 스키마 버전 기록 (배포 시 한 번만 실행)."""
+        for ddl in init_db():
+            print(f"[upgrade] {ddl}")
+        print("DB initialized")
+
+    @app.cli.command("archive-history")
+    @click.option("--days", type=int, default=None, help="보존기간(일), 기본 HISTORY_RETENTION_DAYS")
+    @click.option("--archive-dir", default=None, help="아카이브 디렉터리, 기본 HISTORY_ARCHIVE_DIR")
+    @click.option("--batch-size", type=int, default=None)
+    @click.option("--vacuum", is_flag=True, help="아카이브 후 SQLite VACUUM 실행")
+    def archive_history(days, archive_dir, batch_size, vacuum):
+        """보존기간이 지난 이력을 gzip NDJSON으로 옮기고 hot 테이블에서 삭제한다."""
+        from services.retention_service import archive_old_history, compact_database
+
+        summary = archive_old_history(
+            max_age_days=days,
+            archive_dir=archive_dir,
+            batch_size=batch_size,
+        )
+        for table_name, count in summary.items():
+            print(f"{table_name}: {count}")
+        if vacuum and compact_database():
+            print("VACUUM done")
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--since", required=True, help="YYYY-MM-DD (포함)")
+    @click.option("--until", default=None, help="YYYY-MM-DD (미포함)")
+    def rebuild_rollups(since, until):
+        """recommendation_logs로부터 기간별 추천 통계 롤업을 다시 계산한다."""
+        from datetime import date
+        from services.analytics_service import rebuild_recommendation_rollups
+
+        total = rebuild_recommendation_rollups(
+            date.fromisoformat(since),
+            date.fromisoformat(until) if until else None,
+        )
+        print(f"rebuilt from {total} logs")
+
+    @app.cli.command("rebuild-cohort-sketch")
+    def rebuild_cohort_sketch():
+        """hand_metrics 전체로 손 측정값 분포 히스토그램을 다시 만든다."""
+        from services.cohort_service import rebuild_histograms
+
+        total = rebuild_histograms()
+        print(f"rebuilt from {total} hand_metrics rows")
+
+    # DB 초기화/확인 + 카탈로그 프리로드 (준비 상태는 /readyz)
+    boot_app(app, boot_started)
+
+    @app.cli.command("bench-recommend")
+    @click.option("--requests", "requests_", type=int, default=200, help="시나리오별 요청 수")
+    def bench_recommend_command(requests_):
+        """/recommend-rackets 요청당 SQL 왕복/commit 수와 지연 (개발 DB 전용, 추천 로그가 쌓임)."""
+        import json
+        from utils.bench import bench_recommend
+
+        print(json.dumps(bench_recommend(app, requests_), indent=2))
+
+    @app.cli.command("bench-concurrency")
+    @click.option("--url", default="http://127.0.0.1:5000", help="떠 있는 서버 주소")
+    @click.option("--clients", type=int, default=32, help="동시 느린 클라이언트 수")
+    @click.option("--trickle-sec", type=float, default=2.0, help="요청당 본문 전송 시간")
+    @click.option("--duration", type=float, default=10.0, help="측정 시간(초)")
+    def bench_concurrency_command(url, clients, trickle_sec, duration):
+        """느린 클라이언트가 몰릴 때 /healthz 지연 (sync vs gthread 워커 비교용)."""
+        import json
+        from utils.bench import bench_slow_clients
+
+        print(json.dumps(bench_slow_clients(url, clients, trickle_sec, duration), indent=2))
+
+    @app.cli.command("memory-report")
+    @click.argument("master_pid", type=int)
+    def memory_report_command(master_pid):
+        """gunicorn 마스터/워커별 RSS·PSS·USS (preload 유무 비교용)."""
+        import json
+        from utils.memory import memory_report
+
+        print(json.dumps(memory_report(master_pid), indent=2))
 
     return app
 
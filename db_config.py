@@ -1,10 +1,125 @@
 # db_config.py
+from flask import g
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import AddConstraint, CreateColumn
 import json
+import os
+import sqlite3
+
+from utils.json_provider import loads_json, json_column
 
 db = SQLAlchemy()
 
 
+# ----------------------------------------------------------------------
+# 엔진 옵션 (URL 스킴별)
+# ----------------------------------------------------------------------
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+# SQLite 연결마다 적용할 PRAGMA (WAL: 쓰기 중에도 읽기가 막히지 않음)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+    "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+    "cache_size": -_env_int("SQLITE_CACHE_SIZE_KB", 64 * 1024),  # 음수 = KiB 단위
+}
+
+
+def engine_options_for_url(url: str) -> dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS / SQLALCHEMY_BINDS에 넣을 엔진 옵션.
+    - sqlite : busy timeout (PRAGMA는 connect 이벤트에서 적용)
+    - mysql/mariadb : 풀 크기/오버플로/recycle/pre-ping (환경변수로 조정)
+    """
+    backend = make_url(url).get_backend_name()
+
+    if backend == "sqlite":
+        return {
+            "connect_args": {
+                "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000.0,
+            },
+        }
+
+    if backend in ("mysql", "mariadb"):
+        return {
+            # 스레드 워커(GUNICORN_THREADS)면 스레드마다 커넥션이 하나씩 필요하다.
+            "pool_size": _env_int("DB_POOL_SIZE", max(10, _env_int("GUNICORN_THREADS", 1))),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+            "pool_timeout": _env_int("DB_POOL_TIMEOUT", 10),
+            # MariaDB wait_timeout보다 짧게 잡아 끊긴 연결 재사용을 피한다.
+            "pool_recycle": _env_int("DB_POOL_RECYCLE", 280),
+            "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        }
+
+    return {}
+
+
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def db_now():
+    """
+    DB 서버 시계의 현재 시각 (server_default=func.now() 컬럼과 같은 시계).
+    SQLite는 UTC, MariaDB는 세션 time_zone 기준이라 파이썬 utcnow()와 다를 수 있다.
+    """
+    return db.session.execute(db.select(db.func.now())).scalar()
+
+
+# 읽기 전용 복제본 bind 키 (READ_DATABASE_URL이 있을 때만 SQLALCHEMY_BINDS에 등록)
+READ_BIND_KEY = "replica"
+
+
+def read_session():
+    """
+    읽기 전용 세션.
+    - 복제본 bind가 설정돼 있으면 복제본 엔진에 붙은 세션(app context 단위로 재사용)
+    - 없으면 기본 db.session 그대로
+    쓰기(add/commit)는 항상 db.session으로 할 것.
+    """
+    engine = db.engines.get(READ_BIND_KEY)
+    if engine is None:
+        return db.session
+
+    session = g.get("_read_session")
+    if session is None:
+        session = Session(bind=engine, autoflush=False, expire_on_commit=False)
+        g._read_session = session
+    return session
+
+
+def init_read_session(app):
+    @app.teardown_appcontext
+    def _close_read_session(exc):
+        session = g.pop("_read_session", None)
+        if session is not None:
+            session.close()
+
+
 class HandMetrics(db.Model):
     """
     손 분석 결과 테이블 (hand_metrics)
@@ -12,19 +127,24 @@ class HandMetrics(db.Model):
     - hand_utils.analyze_hand() 결과를 그대로/부분적으로 저장한다.
     """
     __tablename__ = "hand_metrics"
+    __table_args__ = (
+        # 손 크기 코호트별 기간 조회용
+        db.Index("ix_hand_metrics_size_created", "hand_size_category", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
 
-    hand_length_mm = db.Column(db.Numeric(6, 2), nullable=False)
-    hand_width_mm = db.Column(db.Numeric(6, 2), nullable=False)
-    hand_length_score = db.Column(db.Numeric(7, 1), nullable=False)
-    hand_width_score = db.Column(db.Numeric(7, 1), nullable=False)
+    # Numeric 컬럼은 float로 읽는다 (응답 직렬화 때 Decimal 생성/변환 비용 제거)
+    hand_length_mm = db.Column(db.Numeric(6, 2, asdecimal=False), nullable=False)
+    hand_width_mm = db.Column(db.Numeric(6, 2, asdecimal=False), nullable=False)
+    hand_length_score = db.Column(db.Numeric(7, 1, asdecimal=False), nullable=False)
+    hand_width_score = db.Column(db.Numeric(7, 1, asdecimal=False), nullable=False)
 
     hand_size_category = db.Column(db.String(32), nullable=False)  # SMALL/MEDIUM/LARGE
     finger_ratios_json = db.Column(db.Text, nullable=False)
 
     capture_device = db.Column(db.String(32), nullable=True)
-    capture_distance_cm = db.Column(db.Numeric(5, 2), nullable=True)
+    capture_distance_cm = db.Column(db.Numeric(5, 2, asdecimal=False), nullable=True)
 
     raw_result_json = db.Column(db.Text, nullable=True)
 
@@ -32,6 +152,7 @@ class HandMetrics(db.Model):
         db.DateTime,
         nullable=False,
         server_default=db.func.now(),
+        index=True,
     )
     updated_at = db.Column(
         db.DateTime,
@@ -49,30 +170,59 @@ class HandMetrics(db.Model):
 
     def get_finger_ratios(self):
         try:
-            return json.loads(self.finger_ratios_json)
+            return loads_json(self.finger_ratios_json)
         except Exception:
             return []
 
     def get_raw_result(self):
         try:
-            return json.loads(self.raw_result_json) if self.raw_result_json else None
+            return loads_json(self.raw_result_json) if self.raw_result_json else None
         except Exception:
             return None
 
     def to_dict(self):
+        return self._serialize(self, self.get_finger_ratios())
+
+    @classmethod
+    def list_columns(cls):
+        """
+        admin 목록용 컬럼 (raw_result_json 같은 큰 컬럼은 읽지 않는다)
+        """
+        return (
+            cls.id,
+            cls.hand_length_mm,
+            cls.hand_width_mm,
+            cls.hand_length_score,
+            cls.hand_width_score,
+            cls.hand_size_category,
+            cls.finger_ratios_json,
+            cls.capture_device,
+            cls.capture_distance_cm,
+            cls.created_at,
+        )
+
+    @classmethod
+    def row_to_list_dict(cls, row):
+        """
+        list_columns()로 읽은 Row → to_dict()와 같은 형태 (ORM 객체 생성 없음)
+        """
+        return cls._serialize(row, json_column(row.finger_ratios_json, []))
+
+    @staticmethod
+    def _serialize(obj, finger_ratios):
         return {
-            "id": self.id,
-            "handLengthMm": float(self.hand_length_mm),
-            "handWidthMm": float(self.hand_width_mm),
-            "handLength": float(self.hand_length_score),
-            "handWidth": float(self.hand_width_score),
-            "handSizeCategory": self.hand_size_category,
-            "fingerRatios": self.get_finger_ratios(),
-            "captureDevice": self.capture_device,
-            "captureDistanceCm": float(self.capture_distance_cm)
-            if self.capture_distance_cm is not None
+            "id": obj.id,
+            "handLengthMm": float(obj.hand_length_mm),
+            "handWidthMm": float(obj.hand_width_mm),
+            "handLength": float(obj.hand_length_score),
+            "handWidth": float(obj.hand_width_score),
+            "handSizeCategory": obj.hand_size_category,
+            "fingerRatios": finger_ratios,
+            "captureDevice": obj.capture_device,
+            "captureDistanceCm": float(obj.capture_distance_cm)
+            if obj.capture_distance_cm is not None
             else None,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "createdAt": obj.created_at.isoformat() if obj.created_at else None,
         }
 
 
@@ -94,6 +244,9 @@ class SurveyResponse(db.Model):
 
     styles_json = db.Column(db.Text, nullable=True)
 
+    # 동일 설문 payload는 한 row로 재사용하기 위한 정규화 JSON 해시 (sha256 hex)
+    payload_hash = db.Column(db.String(64), nullable=True, unique=True)
+
     preferred_weight_min_g = db.Column(db.SmallInteger, nullable=True)
     preferred_weight_max_g = db.Column(db.SmallInteger, nullable=True)
     preferred_head_size_min_sq_in = db.Column(db.SmallInteger, nullable=True)
@@ -108,6 +261,7 @@ class SurveyResponse(db.Model):
         db.DateTime,
         nullable=False,
         server_default=db.func.now(),
+        index=True,
     )
     updated_at = db.Column(
         db.DateTime,
@@ -124,28 +278,83 @@ class SurveyResponse(db.Model):
 
     def get_styles(self):
         try:
-            return json.loads(self.styles_json) if self.styles_json else []
+            return loads_json(self.styles_json) if self.styles_json else []
         except Exception:
             return []
 
     def get_extra_payload(self):
         try:
-            return json.loads(self.extra_payload_json) if self.extra_payload_json else None
+            return loads_json(self.extra_payload_json) if self.extra_payload_json else None
         except Exception:
             return None
 
     def to_dict(self):
+        return self._serialize(self, self.get_styles())
+
+    @classmethod
+    def list_columns(cls):
+        """
+        admin 목록용 컬럼 (extra_payload_json 등은 읽지 않는다)
+        """
+        return (
+            cls.id,
+            cls.level,
+            cls.pain,
+            cls.swing,
+            cls.styles_json,
+            cls.string_type_preference,
+            cls.created_at,
+        )
+
+    @classmethod
+    def row_to_list_dict(cls, row):
+        """
+        list_columns()로 읽은 Row → to_dict()와 같은 형태 (ORM 객체 생성 없음)
+        """
+        return cls._serialize(row, json_column(row.styles_json, []))
+
+    @staticmethod
+    def _serialize(obj, styles):
         return {
-            "id": self.id,
-            "level": self.level,
-            "pain": self.pain,
-            "swing": self.swing,
-            "styles": self.get_styles(),
-            "stringTypePreference": self.string_type_preference,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "id": obj.id,
+            "level": obj.level,
+            "pain": obj.pain,
+            "swing": obj.swing,
+            "styles": styles,
+            "stringTypePreference": obj.string_type_preference,
+            "createdAt": obj.created_at.isoformat() if obj.created_at else None,
         }
 
 
+class ProfileSnapshot(db.Model):
+    """
+    손/스타일 프로필 스냅샷 테이블 (profile_snapshots)
+
+    - 정규화 JSON(sort_keys, 공백 없음)의 sha256 해시를 키로 내용을 한 번만 저장한다.
+    - recommendation_logs는 요청당 8개 row가 같은 스냅샷 id를 참조한다.
+    """
+    __tablename__ = "profile_snapshots"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    kind = db.Column(db.String(16), nullable=False)  # hand / style
+    content_hash = db.Column(db.String(64), nullable=False, unique=True)
+    payload_json = db.Column(db.Text, nullable=False)
+
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        server_default=db.func.now(),
+        index=True,  # 보존기간 정리(retention)용
+    )
+
+    def get_payload(self):
+        try:
+            return loads_json(self.payload_json)
+        except Exception:
+            return None
+
+
 class RecommendationLog(db.Model):
     """
     실제 추천 결과 로그 테이블 (recommendation_logs)
@@ -153,6 +362,10 @@ class RecommendationLog(db.Model):
     - 어떤 손/설문 조합으로 어떤 라켓과 스트링/텐션을 추천했는지 기록
     """
     __tablename__ = "recommendation_logs"
+    __table_args__ = (
+        # 라켓별 기간/순위 집계용
+        db.Index("ix_recommendation_logs_racket_created", "racket_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
 
@@ -160,29 +373,47 @@ class RecommendationLog(db.Model):
         db.Integer,
         db.ForeignKey("hand_metrics.id"),
         nullable=True,
+        index=True,
     )
     survey_response_id = db.Column(
         db.Integer,
         db.ForeignKey("survey_responses.id"),
         nullable=True,
+        index=True,
     )
     racket_id = db.Column(
         db.Integer,
         db.ForeignKey("rackets.id"),
         nullable=False,
-    )
+    )  # 인덱스는 ix_recommendation_logs_racket_created의 선두 컬럼으로 대체
 
     recommended_string_type = db.Column(db.String(32), nullable=True)
     recommended_string_label = db.Column(db.String(100), nullable=True)
-    recommended_tension_main_kg = db.Column(db.Numeric(4, 2), nullable=True)
-    recommended_tension_main_lbs = db.Column(db.Numeric(5, 1), nullable=True)
+    recommended_tension_main_kg = db.Column(db.Numeric(4, 2, asdecimal=False), nullable=True)
+    recommended_tension_main_lbs = db.Column(db.Numeric(5, 1, asdecimal=False), nullable=True)
 
-    recommendation_score = db.Column(db.Numeric(6, 2), nullable=True)
+    recommendation_score = db.Column(db.Numeric(6, 2, asdecimal=False), nullable=True)
     rank_in_result = db.Column(db.SmallInteger, nullable=True)
 
     algorithm_version = db.Column(db.String(32), nullable=True)
     rationale = db.Column(db.Text, nullable=True)
 
+    # 손/스타일 프로필 스냅샷 (profile_snapshots 참조, 같은 내용은 한 row만 저장)
+    # 인덱스: 참조가 끊긴 스냅샷 정리(retention) 시 NOT EXISTS 조회용
+    hand_profile_snapshot_id = db.Column(
+        db.Integer,
+        db.ForeignKey("profile_snapshots.id"),
+        nullable=True,
+        index=True,
+    )
+    style_profile_snapshot_id = db.Column(
+        db.Integer,
+        db.ForeignKey("profile_snapshots.id"),
+        nullable=True,
+        index=True,
+    )
+
+    # 구버전 로그 호환용 (신규 로그는 스냅샷 id만 기록)
     hand_profile_json = db.Column(db.Text, nullable=True)
     style_profile_json = db.Column(db.Text, nullable=True)
 
@@ -190,21 +421,32 @@ class RecommendationLog(db.Model):
         db.DateTime,
         nullable=False,
         server_default=db.func.now(),
+        index=True,
     )
 
     hand_metrics = db.relationship("HandMetrics", back_populates="recommendation_logs")
     survey_response = db.relationship("SurveyResponse", back_populates="recommendation_logs")
     racket = db.relationship("Racket")
+    hand_profile_snapshot = db.relationship(
+        "ProfileSnapshot", foreign_keys=[hand_profile_snapshot_id]
+    )
+    style_profile_snapshot = db.relationship(
+        "ProfileSnapshot", foreign_keys=[style_profile_snapshot_id]
+    )
 
     def get_hand_profile(self):
+        if self.hand_profile_snapshot is not None:
+            return self.hand_profile_snapshot.get_payload()
         try:
-            return json.loads(self.hand_profile_json) if self.hand_profile_json else None
+            return loads_json(self.hand_profile_json) if self.hand_profile_json else None
         except Exception:
             return None
 
     def get_style_profile(self):
+        if self.style_profile_snapshot is not None:
+            return self.style_profile_snapshot.get_payload()
         try:
-            return json.loads(self.style_profile_json) if self.style_profile_json else None
+            return loads_json(self.style_profile_json) if self.style_profile_json else None
         except Exception:
             return None
 
@@ -230,6 +472,155 @@ class RecommendationLog(db.Model):
             "createdAt": self.created_at.isoformat() if self.created_at else None,
         }
 
+    def to_admin_dict(self):
+        """
+        admin 목록용: to_dict() + 라켓 이름/브랜드, 손/설문 요약.
+        관계는 호출 쪽에서 joinedload로 미리 로드해 두어야 row별 추가 쿼리가 없다.
+        """
+        data = self.to_dict()
+
+        racket = self.racket
+        data["racket"] = (
+            {"id": racket.id, "name": racket.name, "brand": racket.brand}
+            if racket is not None
+            else None
+        )
+
+        hm = self.hand_metrics
+        data["hand"] = (
+            {
+                "id": hm.id,
+                "handLengthMm": float(hm.hand_length_mm),
+                "handWidthMm": float(hm.hand_width_mm),
+                "handSizeCategory": hm.hand_size_category,
+            }
+            if hm is not None
+            else None
+        )
+
+        sr = self.survey_response
+        data["survey"] = (
+            {
+                "id": sr.id,
+                "level": sr.level,
+                "pain": sr.pain,
+                "swing": sr.swing,
+                "styles": sr.get_styles(),
+            }
+            if sr is not None
+            else None
+        )
+        return data
+
+
+class ArchiveRollup(db.Model):
+    """
+    이력 아카이브 요약 테이블 (archive_rollups)
+
+    - retention_service가 오래된 row를 압축 파일로 옮길 때 (테이블 × 날짜) 단위로 누적 기록
+    - 원본 row는 hot 테이블에서 삭제되므로, 무엇이 어디로 갔는지는 여기서 확인한다.
+    """
+    __tablename__ = "archive_rollups"
+    __table_args__ = (
+        db.UniqueConstraint("table_name", "partition_date", name="uq_archive_rollups_table_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    table_name = db.Column(db.String(64), nullable=False)
+    partition_date = db.Column(db.Date, nullable=False)
+
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    min_id = db.Column(db.Integer, nullable=True)
+    max_id = db.Column(db.Integer, nullable=True)
+    file_path = db.Column(db.String(255), nullable=False)
+
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "tableName": self.table_name,
+            "partitionDate": self.partition_date.isoformat() if self.partition_date else None,
+            "rowCount": self.row_count,
+            "minId": self.min_id,
+            "maxId": self.max_id,
+            "filePath": self.file_path,
+            "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class RecommendationRollup(db.Model):
+    """
+    추천 통계 롤업 테이블 (recommendation_rollups)
+
+    - (일자 × 라켓 × 순위 구간 × 손 크기 × 레벨) 단위 추천 횟수/점수 합계
+    - log_recommendations가 로그를 쓸 때 같은 트랜잭션에서 누적한다.
+    - /admin/analytics/* 는 recommendation_logs 대신 이 테이블만 읽는다.
+    """
+    __tablename__ = "recommendation_rollups"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "day",
+            "racket_id",
+            "rank_bucket",
+            "hand_size_category",
+            "level",
+            name="uq_recommendation_rollups_key",
+        ),
+        db.Index("ix_recommendation_rollups_racket_day", "racket_id", "day"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    day = db.Column(db.Date, nullable=False)
+    racket_id = db.Column(db.Integer, nullable=False)
+    rank_bucket = db.Column(db.String(8), nullable=False)  # 1 / 2-3 / 4-8 / 9+
+    hand_size_category = db.Column(db.String(32), nullable=False)  # SMALL/MEDIUM/LARGE/UNKNOWN
+    level = db.Column(db.String(32), nullable=False)  # beginner ~ expert / unknown
+
+    recommend_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class MetricHistogram(db.Model):
+    """
+    손 측정값 분포 히스토그램 테이블 (metric_histograms)
+
+    - 고정 구간(lo~hi를 bins개로 등분) 카운트라 여러 워커의 증분을 단순 합산으로 병합할 수 있다.
+    - cohort_service가 주기적으로 증분을 더하고, hand_metrics에서 통째로 다시 만들 수도 있다.
+    """
+    __tablename__ = "metric_histograms"
+
+    metric = db.Column(db.String(32), primary_key=True)  # handLengthMm / handWidthMm / indexRatio / ringRatio
+
+    lo = db.Column(db.Float, nullable=False)
+    hi = db.Column(db.Float, nullable=False)
+    bins = db.Column(db.Integer, nullable=False)
+
+    counts_json = db.Column(db.Text, nullable=False)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    # rebuild마다 +1: 이전 세대 기준으로 쌓인 워커 증분은 flush 때 버린다 (rebuild에 이미 포함)
+    generation = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+    )
+
+    def get_counts(self):
+        try:
+            return loads_json(self.counts_json)
+        except Exception:
+            return []
+
 
 class Racket(db.Model):
     """
@@ -239,6 +630,10 @@ class Racket(db.Model):
     - 추천 알고리즘 고도화를 위해 swingweight, head_size, stiffness_ra 등 확장
     """
     __tablename__ = "rackets"
+    __table_args__ = (
+        # 일괄 업서트(brand, name) 조회용 + 동시 import가 같은 라켓을 두 번 넣지 못하게 유니크
+        db.Index("uq_rackets_brand_name", "brand", "name", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
 
@@ -289,7 +684,7 @@ class Racket(db.Model):
 
     # 태그 및 활성 여부
     tags = db.Column(db.String(300), nullable=True)
-    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True, index=True)
 
     url = db.Column(db.String(255), nullable=True)
 
@@ -337,6 +732,52 @@ class Racket(db.Model):
         }
 
 
+class CatalogMeta(db.Model):
+    """
+    라켓 카탈로그 버전 테이블 (catalog_meta, 단일 row)
+
+    - 라켓이 추가/수정/삭제될 때마다 version을 1 올린다.
+    - 각 워커의 카탈로그 캐시는 이 값만 읽어 보고 바뀌었을 때만 다시 로드한다.
+    """
+    __tablename__ = "catalog_meta"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+    )
+
+
+class SchemaMeta(db.Model):
+    """
+    스키마 버전 테이블 (schema_meta, 단일 row)
+
+    - `flask init-db`가 테이블 생성/업그레이드 후 verify_schema()를 통과하면 SCHEMA_VERSION을 기록한다.
+    - DB_BOOT_MODE=check 인 워커는 create_all 대신 이 값만 비교한다.
+    """
+    __tablename__ = "schema_meta"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+    )
+
+
+# 모델(테이블/컬럼/인덱스)을 바꾸면 1 올릴 것
+# 2: upgrade_schema() 도입 (1은 기존 테이블을 검증 없이 기록했을 수 있어 다시 init-db 필요)
+# 3: profile_snapshots.created_at, recommendation_logs 스냅샷 id 인덱스
+# 4: metric_histograms.generation
+# 5: rackets (brand, name) 유니크 인덱스 uq_rackets_brand_name (ix_rackets_brand_name 대체)
+SCHEMA_VERSION = 5
+
+
 # ----------------------------------------------------------------------
 # 샘플 라켓 데이터 (MariaDB든 SQLite든 처음 DB 만들 때 seed)
 # ----------------------------------------------------------------------
@@ -356,14 +797,184 @@ def _seed_rackets():
     db.session.commit()
 
 
+def _ensure_catalog_meta():
+    """
+    카탈로그 버전 row(id=1)가 없으면 생성.
+    """
+    if db.session.get(CatalogMeta, 1) is None:
+        db.session.add(CatalogMeta(id=1, version=1))
+        db.session.commit()
+
+
+def _unique_column_sets(inspector, table_name):
+    """
+    유니크 제약/유니크 인덱스가 걸린 컬럼 조합들 (create_all의 UNIQUE와 upgrade_schema의 인덱스 모두)
+    """
+    sets = {tuple(ix["column_names"]) for ix in inspector.get_indexes(table_name) if ix.get("unique")}
+    sets |= {tuple(uc["column_names"]) for uc in inspector.get_unique_constraints(table_name)}
+    return sets
+
+
+def verify_schema():
+    """
+    DB가 모델과 맞는지 reflection으로 확인한다. (테이블/컬럼/인덱스/유니크 키 존재 여부만)
+    빠진 것이 있으면 RuntimeError — 버전을 기록하기 전에 호출한다.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.append(table.name)
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        missing += [f"{table.name}.{c.name}" for c in table.columns if c.name not in columns]
+
+        index_names = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        missing += [f"{table.name}:{ix.name}" for ix in table.indexes if ix.name not in index_names]
+
+        unique_sets = _unique_column_sets(inspector, table.name)
+        missing += [
+            f"{table.name}.{c.name} (unique)"
+            for c in table.columns
+            if c.unique and (c.name,) not in unique_sets
+        ]
+    if missing:
+        raise RuntimeError("DB 스키마가 모델과 다릅니다, 빠진 항목: " + ", ".join(missing))
+
+
+def _write_schema_version():
+    meta = db.session.get(SchemaMeta, 1)
+    if meta is None:
+        db.session.add(SchemaMeta(id=1, version=SCHEMA_VERSION))
+    elif meta.version != SCHEMA_VERSION:
+        meta.version = SCHEMA_VERSION
+    db.session.commit()
+
+
+# ----------------------------------------------------------------------
+# 기존 테이블 업그레이드 (create_all은 이미 있는 테이블을 바꾸지 않는다)
+# ----------------------------------------------------------------------
+# 다른 이름의 인덱스로 대체돼 upgrade_schema()가 지우는 예전 인덱스 {테이블: (이름, ...)}
+_RETIRED_INDEXES = {
+    "rackets": ("ix_rackets_brand_name",),  # → uq_rackets_brand_name (버전 5)
+}
+
+
+def upgrade_schema():
+    """
+    이미 있는 테이블에 모델에만 있는 컬럼/유니크 키/인덱스를 추가한다.
+    - 컬럼 : ALTER TABLE ADD COLUMN (NULL 허용이거나 server_default가 있는 컬럼만, 아니면 RuntimeError)
+             FK는 SQLite면 컬럼 정의의 REFERENCES로, 그 외에는 ADD CONSTRAINT로 붙인다.
+    - unique=True 컬럼 : 유니크 인덱스 uq_<테이블>_<컬럼>
+    - 모델의 인덱스 : 이름으로 비교해 없으면 CREATE INDEX
+      (유니크 인덱스인데 기존 데이터가 중복이면 RuntimeError — 중복 row를 먼저 정리해야 한다)
+    - _RETIRED_INDEXES : 다른 이름으로 대체된 예전 인덱스는 DROP INDEX
+    실행한 DDL 목록을 돌려준다.
+    """
+    applied = []
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        preparer = conn.dialect.identifier_preparer
+        is_sqlite = conn.dialect.name == "sqlite"
+
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue  # create_all이 방금 만든 테이블은 모델과 같다
+
+            columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(
+                        f"{table.name}.{column.name}: NOT NULL 컬럼은 자동으로 추가할 수 없습니다"
+                    )
+                ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN " + str(
+                    CreateColumn(column).compile(dialect=conn.dialect)
+                )
+                if is_sqlite:
+                    for fk in column.foreign_keys:
+                        ddl += (
+                            f" REFERENCES {preparer.format_table(fk.column.table)}"
+                            f" ({preparer.quote(fk.column.name)})"
+                        )
+                conn.execute(db.text(ddl))
+                applied.append(ddl)
+                if not is_sqlite:
+                    for fk in column.foreign_keys:
+                        conn.execute(AddConstraint(fk.constraint))
+                        applied.append(f"{table.name}.{column.name} → {fk.target_fullname}")
+
+            index_names = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            unique_sets = _unique_column_sets(inspector, table.name)
+            for column in table.columns:
+                if column.unique and (column.name,) not in unique_sets:
+                    name = f"uq_{table.name}_{column.name}"
+                    ddl = (
+                        f"CREATE UNIQUE INDEX {preparer.quote(name)} ON "
+                        f"{preparer.format_table(table)} ({preparer.quote(column.name)})"
+                    )
+                    conn.execute(db.text(ddl))
+                    applied.append(ddl)
+            for index in table.indexes:
+                if index.name not in index_names:
+                    try:
+                        index.create(bind=conn)
+                    except IntegrityError as e:
+                        cols = ", ".join(c.name for c in index.columns)
+                        raise RuntimeError(
+                            f"{table.name}:{index.name}: ({cols})가 중복된 row가 있어 "
+                            f"유니크 인덱스를 만들 수 없습니다. 중복을 정리한 뒤 다시 실행하세요: {e.orig}"
+                        ) from e
+                    applied.append(f"CREATE INDEX {index.name}")
+            for name in _RETIRED_INDEXES.get(table.name, ()):
+                if name in index_names:
+                    ddl = f"DROP INDEX {preparer.quote(name)}"
+                    if conn.dialect.name in ("mysql", "mariadb"):
+                        ddl += f" ON {preparer.format_table(table)}"
+                    conn.execute(db.text(ddl))
+                    applied.append(ddl)
+    return applied
+
+
 def init_db():
     """
-    앱 시작 시 한 번 호출:
-    - 테이블 없으면 생성
+    스키마 생성 + seed (`flask init-db` 또는 DB_BOOT_MODE=auto 부팅 시):
+    - 테이블 없으면 생성, 이미 있는 테이블은 upgrade_schema()로 컬럼/인덱스 추가
     - 라켓 테이블이 비어 있으면 샘플 데이터 seed
+    - verify_schema()로 모델과 맞는지 확인한 뒤에만 스키마 버전 기록
+    실행한 업그레이드 DDL 목록을 돌려준다.
     """
     db.create_all()
+    applied = upgrade_schema()
+    verify_schema()
     _seed_rackets()
+    _ensure_catalog_meta()
+    _write_schema_version()
+    return applied
+
+
+def check_schema_version():
+    """
+    DB_BOOT_MODE=check 워커용: 메타데이터 reflection 없이 버전 row 하나만 읽는다.
+    맞지 않으면 RuntimeError (init-db 먼저 실행 필요)
+    """
+    try:
+        version = db.session.execute(
+            db.select(SchemaMeta.version).where(SchemaMeta.id == 1)
+        ).scalar()
+    except Exception as e:
+        db.session.rollback()
+        raise RuntimeError(f"schema_meta 조회 실패, `flask init-db`를 먼저 실행하세요: {e}")
+
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"schema version mismatch (db={version}, app={SCHEMA_VERSION}), "
+            "`flask init-db`를 먼저 실행하세요."
+        )
+    return version
 
 
 def reset_db():
@@ -374,4 +985,7 @@ def reset_db():
     """
     db.drop_all()
     db.create_all()
+    verify_schema()
     _seed_rackets()
+    _ensure_catalog_meta()
+    _write_schema_version()
@@ -0,0 +1,71 @@
+# gunicorn.conf.py
+#
+# 사용: gunicorn -c gunicorn.conf.py app:app
+#
+# - preload_app: 마스터에서 앱(카탈로그 스냅샷, cv2/mediapipe 모듈)을 한 번 올리고
+#   워커는 fork로 copy-on-write 공유 → 워커 수에 비례하던 메모리 증가를 줄인다.
+# - fork에 안전하지 않은 핸들(DB 커넥션, MediaPipe 그래프)은 post_fork에서 워커별로 다시 만든다.
+# - 효과 확인: GUNICORN_PRELOAD=1 / 0 으로 각각 띄운 뒤
+#     flask --app app memory-report <마스터 pid>
+#   의 workerUssAvgKb 비교
+#
+# 워커 모델
+# - 기본(sync): 워커 하나가 연결 하나를 끝까지 처리한다. 느린 업로드/느린 DB가 워커 전체를 묶어서
+#   느린 클라이언트가 WEB_CONCURRENCY 개만 있어도 나머지 요청(/healthz 포함)이 줄을 선다.
+# - 고동시성 모드: GUNICORN_THREADS > 1 이면 gthread 워커. 워커 하나가 스레드 수만큼 연결을
+#   동시에 처리하므로 느린 클라이언트는 스레드 하나만 묶는다. 예) WEB_CONCURRENCY=2 GUNICORN_THREADS=32
+#   - 손 분석 추론은 /scan-hand, /scan-and-recommend 모두 inference_executor 스레드
+#     (INFERENCE_THREADS)에서 돌고 요청 스레드는 결과를 기다린다. 프로세스당 MediaPipe 그래프
+#     하나라 _detector_lock 으로 직렬화되고, 동시 스캔 수는 입장 제어(SCAN_MAX_INFLIGHT)가 제한한다.
+#     (CPU 병렬성은 여전히 워커 수)
+#   - DB 작업은 별도 executor 없이 요청 스레드에서 실행된다.
+#     DB 커넥션 풀(DB_POOL_SIZE) 기본값은 스레드 수 이상으로 따라간다.
+#   - 업로드는 요청마다 임시 파일이라 스레드끼리 섞이지 않는다.
+# - 비교: 두 모드로 각각 띄운 뒤
+#     flask --app app bench-concurrency --url http://127.0.0.1:5000 --clients 32 --trickle-sec 2
+#   느린 클라이언트가 몰리는 동안의 /healthz 지연(probe)을 본다.
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:" + os.getenv("PORT", "5000"))
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# 앱(입장 제어 기본 모드/상한)이 실제 워커 수를 알 수 있게 내보낸다. (-w 옵션 대신 이 변수로 조정할 것)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or ("gthread" if threads > 1 else "sync")
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").strip().lower() in ("1", "true", "yes", "on")
+
+# preload 시 create_app()(DB_BOOT_MODE에 따른 init/check, 카탈로그 프리로드)은 마스터에서 한 번만 실행된다.
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app import app
+    from services.boot_service import prepare_for_fork
+
+    prepare_for_fork(app)
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from app import app
+    from services.boot_service import after_fork
+
+    after_fork(app)
+
+
+def worker_exit(server, worker):
+    # 워커 프로세스에서: 자기 METRICS_DIR dump 파일 정리 (합산에서 빠지도록)
+    from utils.metrics import remove_process_dump
+
+    remove_process_dump()
+
+
+def child_exit(server, worker):
+    # 마스터에서: 정리 훅 없이 죽은 워커(타임아웃 SIGKILL 등)의 dump 파일도 정리
+    from utils.metrics import remove_process_dump
+
+    remove_process_dump(worker.pid)
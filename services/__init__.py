@@ -7,6 +7,14 @@ services 패키지
 - playstyle_service.py       : 설문 결과 → 플레이 스타일 프로필 생성
 - racket_matching_service.py : 손 프로필 + 스타일 → 라켓/스트링 매칭
 - recommend_service.py       : 위 서비스들을 조합한 최종 추천 진입점
+- catalog_service.py         : 라켓 카탈로그 버전 관리 + 활성 라켓 캐시
+- catalog_matrix.py          : 카탈로그 숫자 컬럼 행렬 (워커 간 메모리 매핑 공유)
+- history_service.py         : 손 분석/설문/추천 이력 저장
+- profile_cache.py           : handMetricsId / surveyResponseId → 프로필 LRU+TTL 캐시
+- cohort_service.py          : 손 측정값 분포(히스토그램) 기반 코호트 백분위
+- analytics_service.py       : 추천 통계 롤업 누적/조회
+- retention_service.py       : 오래된 이력 아카이브(gzip NDJSON) 및 정리
+- boot_service.py            : 워커 부팅 모드(DB_BOOT_MODE) / 준비 상태
 """
 
 # 필요하다면 여기서 주요 함수들을 재노출할 수 있습니다.
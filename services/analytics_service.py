@@ -0,0 +1,332 @@
+# services/analytics_service.py
+
+"""
+추천 통계 롤업 (recommendation_rollups) 누적 및 조회.
+
+- record_recommendation_rollups() : log_recommendations에서 로그와 같은 트랜잭션으로 호출
+- rebuild_recommendation_rollups() : 기존 로그로부터 기간 단위 재계산 (최초 backfill 용)
+- 조회 함수들은 롤업 테이블만 읽으므로 이력 크기와 무관하게 빠르다. (복제본이 있으면 복제본)
+"""
+
+from collections import defaultdict
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func, update, case
+
+from db_config import db, db_now, read_session, RecommendationLog, RecommendationRollup, ProfileSnapshot, Racket
+from utils.json_provider import loads_json
+
+UNKNOWN_SIZE = "UNKNOWN"
+UNKNOWN_LEVEL = "unknown"
+
+_REBUILD_BATCH = 1000
+
+RollupKey = Tuple[date, int, str, str, str]
+
+
+def rank_bucket(rank: Optional[int]) -> str:
+    if rank is None:
+        return "9+"
+    if rank <= 1:
+        return "1"
+    if rank <= 3:
+        return "2-3"
+    if rank <= 8:
+        return "4-8"
+    return "9+"
+
+
+def _cohort(hand_profile: Optional[dict], style_profile: Optional[dict]) -> Tuple[str, str]:
+    size = (hand_profile or {}).get("handSizeCategory") or UNKNOWN_SIZE
+    level = (style_profile or {}).get("level") or UNKNOWN_LEVEL
+    return str(size), str(level)
+
+
+def _upsert_rollups(counts: Dict[RollupKey, List[float]]):
+    """
+    {키: [횟수, 점수합]} 을 롤업 테이블에 더한다.
+    SQLite / MySQL(MariaDB)은 네이티브 upsert, 그 외는 update → insert 순서로 처리.
+    """
+    if not counts:
+        return
+
+    table = RecommendationRollup.__table__
+    params = [
+        {
+            "day": key[0],
+            "racket_id": key[1],
+            "rank_bucket": key[2],
+            "hand_size_category": key[3],
+            "level": key[4],
+            "recommend_count": int(value[0]),
+            "score_sum": float(value[1]),
+        }
+        for key, value in counts.items()
+    ]
+
+    dialect = db.session.get_bind(mapper=RecommendationRollup).dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "racket_id", "rank_bucket", "hand_size_category", "level"],
+            set_={
+                "recommend_count": table.c.recommend_count + stmt.excluded.recommend_count,
+                "score_sum": table.c.score_sum + stmt.excluded.score_sum,
+            },
+        )
+        db.session.execute(stmt, params)
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            recommend_count=table.c.recommend_count + stmt.inserted.recommend_count,
+            score_sum=table.c.score_sum + stmt.inserted.score_sum,
+        )
+        db.session.execute(stmt, params)
+        return
+
+    for p in params:
+        result = db.session.execute(
+            update(table)
+            .where(
+                table.c.day == p["day"],
+                table.c.racket_id == p["racket_id"],
+                table.c.rank_bucket == p["rank_bucket"],
+                table.c.hand_size_category == p["hand_size_category"],
+                table.c.level == p["level"],
+            )
+            .values(
+                recommend_count=table.c.recommend_count + p["recommend_count"],
+                score_sum=table.c.score_sum + p["score_sum"],
+            )
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert(), p)
+
+
+def record_recommendation_rollups(
+    *,
+    hand_profile: dict,
+    style_profile: dict,
+    racket_candidates: List[Dict],
+    day: Optional[date] = None,
+):
+    """
+    한 번의 추천 결과(순위 목록)를 롤업에 더한다. commit은 호출자가 담당.
+    day 기본값은 DB 시계(db_now) 기준 오늘 — rebuild가 묶는 로그 created_at(server now())과 같은 날짜.
+    """
+    day = day or db_now().date()
+    size, level = _cohort(hand_profile, style_profile)
+
+    counts: Dict[RollupKey, List[float]] = defaultdict(lambda: [0, 0.0])
+    for idx, racket in enumerate(racket_candidates, start=1):
+        racket_id = racket.get("id")
+        if racket_id is None:
+            continue
+        raw_score = racket.get("rawScore")
+        score = raw_score if raw_score is not None else racket.get("score")
+
+        entry = counts[(day, racket_id, rank_bucket(idx), size, level)]
+        entry[0] += 1
+        entry[1] += float(score or 0.0)
+
+    _upsert_rollups(counts)
+
+
+def _legacy_profile(text: Optional[str]) -> Optional[dict]:
+    # 스냅샷 도입 전 로그: 프로필 JSON이 로그 row에 그대로 들어 있다.
+    if not text:
+        return None
+    try:
+        return loads_json(text)
+    except Exception:
+        return None
+
+
+def rebuild_recommendation_rollups(since: date, until: Optional[date] = None) -> int:
+    """
+    [since, until) 기간 롤업을 지우고 recommendation_logs로부터 다시 계산한다.
+    - 로그는 id keyset으로 _REBUILD_BATCH씩 끊어 읽는다. (스트리밍 커서를 열어 둔 채 다른 쿼리를 하지 않도록)
+    - 코호트는 스냅샷(배치마다 IN 한 번), 스냅샷 id가 없는 구버전 로그는 *_profile_json에서 읽는다.
+    - 아카이브로 이미 로그가 빠진 기간에는 쓰지 말 것 (남은 로그만 다시 집계됨)
+    - 반환: 다시 집계한 로그 수
+    """
+    log = RecommendationLog
+    start = datetime.combine(since, datetime.min.time())
+    end = datetime.combine(until, datetime.min.time()) if until else None
+
+    rollup_filter = [RecommendationRollup.day >= since]
+    if until:
+        rollup_filter.append(RecommendationRollup.day < until)
+    db.session.execute(delete(RecommendationRollup).where(*rollup_filter))
+
+    stmt = select(
+        log.id,
+        log.created_at,
+        log.racket_id,
+        log.rank_in_result,
+        log.recommendation_score,
+        log.hand_profile_snapshot_id,
+        log.style_profile_snapshot_id,
+        log.hand_profile_json,
+        log.style_profile_json,
+    ).where(log.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(log.created_at < end)
+
+    snapshots: Dict[int, Optional[dict]] = {}
+    counts: Dict[RollupKey, List[float]] = defaultdict(lambda: [0, 0.0])
+    total = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            stmt.where(log.id > last_id).order_by(log.id.asc()).limit(_REBUILD_BATCH)
+        ).all()
+        if not rows:
+            break
+
+        missing = {
+            snap_id
+            for row in rows
+            for snap_id in (row.hand_profile_snapshot_id, row.style_profile_snapshot_id)
+            if snap_id is not None and snap_id not in snapshots
+        }
+        if missing:
+            for snap_id, payload_json in db.session.execute(
+                select(ProfileSnapshot.id, ProfileSnapshot.payload_json).where(
+                    ProfileSnapshot.id.in_(missing)
+                )
+            ):
+                snapshots[snap_id] = _legacy_profile(payload_json)
+
+        for row in rows:
+            hand = (
+                snapshots.get(row.hand_profile_snapshot_id)
+                if row.hand_profile_snapshot_id is not None
+                else _legacy_profile(row.hand_profile_json)
+            )
+            style = (
+                snapshots.get(row.style_profile_snapshot_id)
+                if row.style_profile_snapshot_id is not None
+                else _legacy_profile(row.style_profile_json)
+            )
+            size, level = _cohort(hand, style)
+            day = row.created_at.date()
+            entry = counts[(day, row.racket_id, rank_bucket(row.rank_in_result), size, level)]
+            entry[0] += 1
+            entry[1] += float(row.recommendation_score or 0.0)
+        total += len(rows)
+        last_id = rows[-1].id
+
+    _upsert_rollups(counts)
+    db.session.commit()
+    return total
+
+
+# ----------------------------------------------------------------------
+# 조회 (롤업 테이블만 사용)
+# ----------------------------------------------------------------------
+def _rollup_filters(*, since=None, until=None, racket_id=None, hand_size=None, level=None):
+    r = RecommendationRollup
+    filters = []
+    if since is not None:
+        filters.append(r.day >= since)
+    if until is not None:
+        filters.append(r.day < until)
+    if racket_id is not None:
+        filters.append(r.racket_id == racket_id)
+    if hand_size:
+        filters.append(r.hand_size_category == hand_size)
+    if level:
+        filters.append(r.level == level)
+    return filters
+
+
+def _with_avg(count, score_sum) -> dict:
+    count = int(count or 0)
+    return {
+        "count": count,
+        "avgScore": round(float(score_sum) / count, 2) if count else None,
+    }
+
+
+def top_rackets(*, limit: int = 20, **filters) -> List[dict]:
+    r = RecommendationRollup
+    count = func.sum(r.recommend_count)
+    rows = read_session().execute(
+        select(
+            r.racket_id,
+            count,
+            func.sum(r.score_sum),
+            func.sum(case((r.rank_bucket == "1", r.recommend_count), else_=0)),
+        )
+        .where(*_rollup_filters(**filters))
+        .group_by(r.racket_id)
+        .order_by(count.desc())
+        .limit(limit)
+    ).all()
+
+    racket_ids = [row[0] for row in rows]
+    names = {}
+    if racket_ids:
+        names = {
+            rid: (brand, name)
+            for rid, brand, name in read_session().execute(
+                select(Racket.id, Racket.brand, Racket.name).where(Racket.id.in_(racket_ids))
+            )
+        }
+
+    items = []
+    for racket_id, total, score_sum, top1 in rows:
+        brand, name = names.get(racket_id, (None, None))
+        item = {"racketId": racket_id, "brand": brand, "name": name, "rank1Count": int(top1 or 0)}
+        item.update(_with_avg(total, score_sum))
+        items.append(item)
+    return items
+
+
+def breakdown(group_by: str, **filters) -> List[dict]:
+    """
+    group_by: day / rankBucket / handSize / level / cohort(handSize × level)
+    """
+    r = RecommendationRollup
+    columns = {
+        "day": [r.day],
+        "rankBucket": [r.rank_bucket],
+        "handSize": [r.hand_size_category],
+        "level": [r.level],
+        "cohort": [r.hand_size_category, r.level],
+    }.get(group_by)
+    if columns is None:
+        raise ValueError(f"unknown group_by: {group_by}")
+
+    rows = read_session().execute(
+        select(*columns, func.sum(r.recommend_count), func.sum(r.score_sum))
+        .where(*_rollup_filters(**filters))
+        .group_by(*columns)
+        .order_by(*columns)
+    ).all()
+
+    keys = {
+        "day": ["day"],
+        "rankBucket": ["rankBucket"],
+        "handSize": ["handSize"],
+        "level": ["level"],
+        "cohort": ["handSize", "level"],
+    }[group_by]
+
+    items = []
+    for row in rows:
+        values = row[: len(keys)]
+        item = {
+            k: (v.isoformat() if isinstance(v, date) else v) for k, v in zip(keys, values)
+        }
+        item.update(_with_avg(row[len(keys)], row[len(keys) + 1]))
+        items.append(item)
+    return items
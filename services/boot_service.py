@@ -0,0 +1,154 @@
+# services/boot_service.py
+
+"""
+워커 부팅 / 준비 상태(readiness).
+
+DB_BOOT_MODE
+- auto  (기본) : 기존처럼 부팅 때 init_db() (create_all + 기존 테이블 업그레이드 + seed) 실행. 로컬 개발용.
+- check        : 스키마 생성/seed는 `flask init-db`로 한 번만 하고,
+                 워커는 schema_meta 버전 한 줄만 확인한 뒤 카탈로그 스냅샷을 미리 로드한다.
+
+준비가 안 된 워커(스키마 버전 불일치 등)는 요청마다(최대 RETRY_INTERVAL_SEC 간격) 다시 확인하고,
+그동안 /readyz 는 503, 그 외 요청도 503을 돌려준다.
+"""
+
+import os
+import threading
+import time
+
+from flask import jsonify, request
+
+from db_config import init_db, check_schema_version
+from services.catalog_service import get_active_rackets, get_catalog_version
+
+RETRY_INTERVAL_SEC = 5.0
+
+# 준비 여부와 무관하게 항상 응답하는 엔드포인트
+_ALWAYS_ALLOWED = {"health_api.healthz", "health_api.readyz", "health_api.metrics", "static"}
+
+_lock = threading.Lock()
+
+
+def boot_mode() -> str:
+    mode = (os.getenv("DB_BOOT_MODE") or "auto").strip().lower()
+    return mode if mode in ("auto", "check") else "auto"
+
+
+def _try_boot(app, info: dict):
+    started = time.perf_counter()
+    try:
+        with app.app_context():
+            if info["mode"] == "check":
+                check_schema_version()
+            else:
+                init_db()
+            # 카탈로그 스냅샷을 첫 요청 전에 미리 적재
+            rackets = get_active_rackets()
+            info["catalogVersion"] = get_catalog_version()
+            info["catalogSize"] = len(rackets)
+    except Exception as e:
+        info["ready"] = False
+        info["error"] = str(e)
+    else:
+        info["ready"] = True
+        info["error"] = None
+        info["readyAt"] = time.time()
+        # 프로세스 관점의 time-to-ready (create_app 시작 ~ 준비 완료)
+        info["timeToReadySec"] = round(time.perf_counter() - info["bootStartedPerf"], 4)
+    info["lastAttemptSec"] = round(time.perf_counter() - started, 4)
+    info["lastAttemptAt"] = time.monotonic()
+
+
+def boot_app(app, boot_started_perf: float):
+    """
+    create_app()에서 호출. 결과는 app.extensions["boot_info"]에 보관.
+    """
+    info = {
+        "mode": boot_mode(),
+        "pid": os.getpid(),
+        "ready": False,
+        "error": None,
+        "bootStartedPerf": boot_started_perf,
+        "timeToReadySec": None,
+        "catalogVersion": None,
+        "catalogSize": None,
+    }
+    app.extensions["boot_info"] = info
+    _try_boot(app, info)
+
+    @app.before_request
+    def _require_ready():
+        if info["ready"] or request.endpoint in _ALWAYS_ALLOWED:
+            return None
+        with _lock:
+            if not info["ready"] and time.monotonic() - info["lastAttemptAt"] >= RETRY_INTERVAL_SEC:
+                _try_boot(app, info)
+        if info["ready"]:
+            return None
+        return jsonify({"error": "service not ready", "detail": info["error"]}), 503
+
+
+def boot_status(app) -> dict:
+    info = app.extensions.get("boot_info") or {}
+    return {
+        "ready": bool(info.get("ready")),
+        "mode": info.get("mode"),
+        "pid": info.get("pid"),
+        "timeToReadySec": info.get("timeToReadySec"),
+        "catalogVersion": info.get("catalogVersion"),
+        "catalogSize": info.get("catalogSize"),
+        "error": info.get("error"),
+    }
+
+
+# ----------------------------------------------------------------------
+# gunicorn preload (gunicorn.conf.py 훅에서 호출)
+# ----------------------------------------------------------------------
+def prepare_for_fork(app):
+    """
+    마스터에서 fork 직전 한 번:
+    - 읽기 전용 자산(MediaPipe 모델 파일, 카탈로그 스냅샷)은 이미 올라와 있는 상태 유지
+    - 마스터가 연 DB 연결은 닫는다 (소켓은 fork 후 공유하면 안 됨)
+    - gc.freeze()로 기존 객체를 GC 대상에서 빼서 워커의 copy-on-write 페이지 복사를 줄인다.
+    """
+    import gc
+
+    from db_config import db
+    from utils.hand_utils import preload_detector_assets
+
+    try:
+        preload_detector_assets()
+    except Exception:
+        pass
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork(app):
+    """
+    워커에서 fork 직후:
+    - 상속받은 커넥션 풀은 닫지 않고 버린다 (close=False, 부모 소켓을 건드리지 않음)
+    - MediaPipe 그래프 핸들도 버리고 워커에서 새로 만든다.
+    - 마스터에서 쌓인 메트릭 값은 버린다.
+    - executor 스레드 풀도 워커에서 새로 만든다.
+    """
+    from db_config import db
+    from utils.executors import reset_executors
+    from utils.hand_utils import reset_hand_detector
+    from utils.metrics import reset_after_fork
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    reset_hand_detector()
+    reset_after_fork()
+    reset_executors()
+    info = app.extensions.get("boot_info")
+    if info is not None:
+        info["pid"] = os.getpid()
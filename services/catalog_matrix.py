@@ -0,0 +1,279 @@
+# services/catalog_matrix.py
+
+"""
+라켓 카탈로그 숫자 컬럼 행렬 (호스트 단위 공유, 메모리 매핑).
+
+- 카탈로그 버전마다 한 번, 파일 락을 잡은 프로세스만 DB에서 라켓을 읽어
+  <CATALOG_MATRIX_DIR>/catalog-<DB해시>-v<버전>.rows.json (라켓 row)
+  <CATALOG_MATRIX_DIR>/catalog-<DB해시>-v<버전>.mtx       (float32 행렬)
+  두 파일을 발행한다. (기본 위치는 /dev/shm — 디스크 I/O 없이 페이지 캐시만 사용)
+- DB해시는 앱이 실제로 쓰는 엔진 URL(SQLite는 절대 경로)로 만든다.
+- 행렬 파일 헤더에는 row 파일 내용의 sha256을 넣어 두고, attach할 때 둘이 맞는지 확인한다.
+  (맞지 않거나 컬럼 구성이 다르면 그 워커만 DB에서 직접 읽는다)
+- 나머지 워커는 row 파일을 읽고 행렬은 np.memmap으로 zero-copy attach 하므로
+  카탈로그 로드/빌드는 호스트당 한 번, 행렬 메모리도 호스트당 한 벌이다.
+- 버전이 바뀌면 새 파일을 attach하고 참조를 한 번에 교체한다.
+  (이전 파일은 unlink 돼도 이미 매핑한 워커는 계속 읽을 수 있다)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from db_config import db
+from utils.metrics import cache_result
+
+try:
+    import fcntl
+except ImportError:  # Windows 등: 락 없이 워커별로 빌드
+    fcntl = None
+
+# 행렬 컬럼 (없는 값은 NaN)
+COL_ID = 0
+COL_POWER = 1
+COL_CONTROL = 2
+COL_SPIN = 3
+COL_COMFORT = 4
+COL_HEAD_SIZE = 5
+COL_WEIGHT = 6
+COL_SWINGWEIGHT = 7
+COL_STIFFNESS = 8
+COL_BALANCE = 9  # HL=1, EB=0, HH=-1
+NUM_COLS = 10
+
+_BALANCE_CODES = {"HL": 1.0, "EB": 0.0, "HH": -1.0}
+
+
+def _default_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "hand-analyzer-catalog")
+
+
+def _db_tag() -> str:
+    # 같은 호스트에서 DB가 다른 앱끼리 파일이 섞이지 않도록 실제 엔진 URL 해시를 이름에 넣는다.
+    url = db.engine.url
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        url = url.set(database=os.path.realpath(url.database))
+    key = url.render_as_string(hide_password=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+
+
+MATRIX_DIR = os.getenv("CATALOG_MATRIX_DIR") or _default_dir()
+
+# 행렬 파일 헤더: 매직 + row 파일 sha256(hex) — 뒤에 .npy 형식 배열이 이어진다.
+_MATRIX_MAGIC = b"CATMTX1 "
+_MATRIX_HEADER_LEN = 128
+
+_lock = threading.Lock()
+# (version, 행렬) — 한 튜플로 교체해 버전/내용이 어긋나지 않게 한다.
+_attached: Tuple[Optional[int], Optional[np.ndarray]] = (None, None)
+
+
+def _num(value):
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _first(*values):
+    for v in values:
+        if v is not None:
+            return v
+    return None
+
+
+def build_matrix(rackets: Sequence) -> np.ndarray:
+    """
+    CatalogRacket(또는 Racket) 목록 → (n, NUM_COLS) float32 행렬.
+    점수 fallback 규칙은 racket_matching_service와 동일하게 미리 적용해 둔다.
+    """
+    m = np.full((len(rackets), NUM_COLS), np.nan, dtype=np.float32)
+    for i, r in enumerate(rackets):
+        m[i, COL_ID] = r.id
+        m[i, COL_POWER] = _num(_first(r.power_score, r.power, 5))
+        m[i, COL_CONTROL] = _num(_first(r.control_score, r.control, 5))
+        m[i, COL_SPIN] = _num(_first(r.spin_score, r.spin, 5))
+        m[i, COL_COMFORT] = _num(r.comfort_score or 5)
+        m[i, COL_HEAD_SIZE] = _num(r.head_size_sq_in)
+        m[i, COL_WEIGHT] = _num(_first(r.unstrung_weight_g, r.weight))
+        m[i, COL_SWINGWEIGHT] = _num(r.swingweight)
+        m[i, COL_STIFFNESS] = _num(r.stiffness_ra)
+        m[i, COL_BALANCE] = _BALANCE_CODES.get(r.balance_type, np.nan)
+    return m
+
+
+def _paths(version: int) -> Tuple[str, str]:
+    base = os.path.join(MATRIX_DIR, f"catalog-{_db_tag()}-v{version}")
+    return base + ".rows.json", base + ".mtx"
+
+
+def _rows_payload(columns: Sequence[str], rows: Sequence) -> bytes:
+    return json.dumps(
+        {"columns": list(columns), "rows": [list(r) for r in rows]},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _write_atomic(path: str, write):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _write_matrix(f, matrix: np.ndarray, content_hash: str):
+    f.write(_MATRIX_MAGIC + content_hash.encode("ascii").ljust(_MATRIX_HEADER_LEN - len(_MATRIX_MAGIC)))
+    np.lib.format.write_array(f, matrix)
+
+
+def _open_matrix(path: str) -> Tuple[str, np.ndarray]:
+    """
+    (헤더의 content hash, 읽기 전용 memmap)
+    """
+    with open(path, "rb") as f:
+        header = f.read(_MATRIX_HEADER_LEN)
+        if len(header) != _MATRIX_HEADER_LEN or not header.startswith(_MATRIX_MAGIC):
+            raise ValueError(f"catalog matrix header 불일치: {path}")
+        content_hash = header[len(_MATRIX_MAGIC):].strip().decode("ascii")
+        fmt_version = np.lib.format.read_magic(f)
+        if fmt_version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    matrix = np.memmap(
+        path, dtype=dtype, mode="r", offset=offset, shape=shape,
+        order="F" if fortran_order else "C",
+    )
+    return content_hash, matrix
+
+
+def _read_published(version: int, columns: Sequence[str]):
+    """
+    발행된 (rows, 행렬). 없으면 None, 내용이 어긋나면 ValueError.
+    """
+    rows_path, matrix_path = _paths(version)
+    if not (os.path.exists(rows_path) and os.path.exists(matrix_path)):
+        return None
+    with open(rows_path, "rb") as f:
+        payload = f.read()
+    content_hash, matrix = _open_matrix(matrix_path)
+    if hashlib.sha256(payload).hexdigest() != content_hash:
+        raise ValueError(f"catalog rows/행렬 content hash 불일치: v{version}")
+    data = json.loads(payload)
+    if data["columns"] != list(columns) or matrix.shape != (len(data["rows"]), NUM_COLS):
+        raise ValueError(f"catalog 파일 형식 불일치: v{version}")
+    return data["rows"], matrix
+
+
+def _publish(version: int, columns: Sequence[str], rows: Sequence) -> np.ndarray:
+    payload = _rows_payload(columns, rows)
+    content_hash = hashlib.sha256(payload).hexdigest()
+    matrix = build_matrix(rows)
+    rows_path, matrix_path = _paths(version)
+    # 행렬 → rows 순서로 교체: rows 파일이 보이면 행렬도 이미 있다.
+    _write_atomic(matrix_path, lambda f: _write_matrix(f, matrix, content_hash))
+    _write_atomic(rows_path, lambda f: f.write(payload))
+    _remove_old_versions(version)
+    return _open_matrix(matrix_path)[1]
+
+
+def _remove_old_versions(current: int):
+    prefix = f"catalog-{_db_tag()}-v"
+    try:
+        names = os.listdir(MATRIX_DIR)
+    except OSError:
+        return
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        version_part, _, suffix = name[len(prefix):].partition(".")
+        if suffix not in ("rows.json", "mtx"):
+            continue
+        try:
+            version = int(version_part)
+        except ValueError:
+            continue
+        # 직전 버전까지는 남겨 둔다 (교체 중인 워커가 attach 할 수 있도록)
+        if version < current - 1:
+            try:
+                os.remove(os.path.join(MATRIX_DIR, name))
+            except OSError:
+                pass
+
+
+def discard_shared_catalog():
+    """
+    이 DB의 발행 파일과 attach한 행렬을 모두 버린다. (버전을 올리지 않고 라켓을 바꾼 경우용)
+    """
+    global _attached
+    with _lock:
+        _attached = (None, None)
+    _remove_old_versions(float("inf"))
+
+
+def load_shared_catalog(
+    version: int, columns: Sequence[str], load_rows: Callable[[], Sequence]
+) -> Sequence:
+    """
+    버전의 카탈로그 row 목록 (각 row는 columns 순서의 값 시퀀스).
+
+    - 호스트에 발행돼 있으면 파일에서 읽고 행렬을 attach (DB 접근 없음)
+    - 없으면 파일 락을 잡고 다시 확인한 뒤, 락을 잡은 프로세스만 load_rows()로 DB에서 읽어 발행
+    - 공유 디렉터리를 못 쓰거나 파일이 어긋나면 이 워커만 load_rows() + 로컬 행렬
+    """
+    global _attached
+
+    lock_file = None
+    try:
+        try:
+            published = _read_published(version, columns)
+            if published is None:
+                os.makedirs(MATRIX_DIR, exist_ok=True)
+                lock_file = open(os.path.join(MATRIX_DIR, f"catalog-{_db_tag()}.lock"), "a")
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                # 락을 기다리는 동안 다른 워커가 발행했을 수 있다.
+                published = _read_published(version, columns)
+            if published is not None:
+                cache_result("catalog_shared", True)
+                rows, matrix = published
+            else:
+                cache_result("catalog_shared", False)
+                rows = list(load_rows())
+                matrix = _publish(version, columns, rows)
+        except (OSError, ValueError):
+            cache_result("catalog_shared", False)
+            rows = list(load_rows())
+            matrix = build_matrix(rows)
+    finally:
+        if lock_file is not None:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    with _lock:
+        _attached = (version, matrix)
+    return rows
+
+
+def get_catalog_matrix(version: int, rackets: Sequence) -> np.ndarray:
+    """
+    버전에 해당하는 행렬. load_shared_catalog()가 attach한 공유 행렬(읽기 전용 memmap)이 있으면 그것,
+    없으면(다른 경로로 얻은 스냅샷) 워커 로컬 행렬을 만든다.
+    """
+    global _attached
+
+    attached = _attached
+    if attached[0] == version and attached[1] is not None and len(attached[1]) == len(rackets):
+        cache_result("catalog_matrix", True)
+        return attached[1]
+
+    cache_result("catalog_matrix", False)
+    with _lock:
+        if _attached[0] != version or _attached[1] is None or len(_attached[1]) != len(rackets):
+            _attached = (version, build_matrix(rackets))
+        return _attached[1]
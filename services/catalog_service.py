@@ -0,0 +1,200 @@
+# services/catalog_service.py
+
+"""
+라켓 카탈로그 버전 관리 + 프로세스 로컬 캐시.
+
+- catalog_meta.version : 라켓 변경 시마다 1씩 증가 (bump_catalog_version)
+- get_active_rackets() : 활성 라켓 스냅샷. 요청마다 version 한 번만 조회하고,
+  바뀌었을 때만 rackets 테이블을 다시 읽는다.
+- get_catalog_snapshot() : (버전, 스냅샷)을 함께 반환 — 버전별 공유 행렬(catalog_matrix) 조회용
+  버전이 바뀌면 catalog_matrix.load_shared_catalog()를 거친다. (호스트에서 한 프로세스만 DB에서 읽어 발행)
+- get_catalog_stamp() / peek_catalog_stamp() : (버전, 갱신 시각) — HTTP ETag / Last-Modified 용
+  peek은 CATALOG_PEEK_TTL_SEC 동안 프로세스 안에서 재사용한다. (공개 GET /rackets 304 경로는 DB 접근 없음)
+- get_public_listing() : 공개 라켓 목록 JSON 본문 (버전마다 한 번만 직렬화)
+- 버전 확인은 항상 primary, 라켓 로드는 복제본이 그 버전까지 따라왔을 때만 복제본에서 한다.
+  (catalog_read_session)
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Optional, Tuple
+
+from flask import current_app
+
+from sqlalchemy import select, update
+
+from db_config import db, read_session, Racket, CatalogMeta
+from services.catalog_matrix import discard_shared_catalog, load_shared_catalog
+from utils.metrics import cache_result
+
+CATALOG_META_ID = 1
+
+# Racket 컬럼을 그대로 갖는 읽기 전용 레코드 (getattr 접근은 ORM 객체와 동일)
+CatalogRacket = namedtuple("CatalogRacket", [c.name for c in Racket.__table__.columns])
+
+_lock = threading.Lock()
+# (version, rackets) 를 한 튜플로 들고 있어야 읽는 쪽에서 버전과 내용이 어긋나지 않는다.
+_cached: Tuple[int, Tuple[CatalogRacket, ...]] = (None, ())
+
+CATALOG_PEEK_TTL_SEC = float(os.getenv("CATALOG_PEEK_TTL_SEC", "1.0"))
+# (확인 시각(monotonic), (version, updated_at))
+_peeked: Tuple[float, Optional[Tuple[int, Optional[datetime]]]] = (0.0, None)
+# (version, JSON 본문)
+_public_listing: Tuple[Optional[int], Optional[str]] = (None, None)
+
+
+def get_catalog_version(session=None) -> int:
+    """
+    카탈로그 버전 (기본: primary에서 조회)
+    """
+    session = session or db.session
+    version = session.execute(
+        select(CatalogMeta.version).where(CatalogMeta.id == CATALOG_META_ID)
+    ).scalar()
+    return version or 0
+
+
+def get_catalog_stamp(session=None) -> Tuple[int, Optional[datetime]]:
+    """
+    (카탈로그 버전, 마지막 변경 시각). 기본: primary에서 조회
+    """
+    session = session or db.session
+    row = session.execute(
+        select(CatalogMeta.version, CatalogMeta.updated_at).where(
+            CatalogMeta.id == CATALOG_META_ID
+        )
+    ).first()
+    if row is None:
+        return 0, None
+    return row[0] or 0, row[1]
+
+
+def peek_catalog_stamp() -> Tuple[int, Optional[datetime]]:
+    """
+    get_catalog_stamp()를 CATALOG_PEEK_TTL_SEC 동안 캐시한 값.
+    다른 워커의 변경은 최대 TTL만큼 늦게 보일 수 있으므로 공개(캐시 허용) 응답에만 쓴다.
+    """
+    global _peeked
+
+    checked_at, stamp = _peeked
+    if stamp is not None and time.monotonic() - checked_at < CATALOG_PEEK_TTL_SEC:
+        cache_result("catalog_stamp", True)
+        return stamp
+    cache_result("catalog_stamp", False)
+    stamp = get_catalog_stamp()
+    _peeked = (time.monotonic(), stamp)
+    return stamp
+
+
+def catalog_read_session(min_version: int = None):
+    """
+    카탈로그 조회용 세션.
+    복제본이 primary의 카탈로그 버전(min_version)까지 따라왔으면 복제본, 아니면 primary.
+    (admin에서 방금 수정한 라켓이 복제 지연 때문에 안 보이는 일을 막는다)
+    """
+    session = read_session()
+    if session is db.session:
+        return session
+
+    if min_version is None:
+        min_version = get_catalog_version()
+    try:
+        if get_catalog_version(session) >= min_version:
+            return session
+    except Exception:
+        session.rollback()
+    return db.session
+
+
+def bump_catalog_version() -> int:
+    """
+    카탈로그 버전 +1. commit은 호출자의 트랜잭션에 맡긴다.
+    (라켓 변경과 같은 트랜잭션에서 올려야 다른 워커가 중간 상태를 캐시하지 않는다)
+    """
+    global _peeked
+
+    _peeked = (0.0, None)
+    result = db.session.execute(
+        update(CatalogMeta)
+        .where(CatalogMeta.id == CATALOG_META_ID)
+        .values(version=CatalogMeta.version + 1)
+    )
+    if result.rowcount == 0:
+        db.session.add(CatalogMeta(id=CATALOG_META_ID, version=1))
+        db.session.flush()
+    return get_catalog_version()
+
+
+def _load_active_rackets(version: int) -> Tuple[CatalogRacket, ...]:
+    columns = list(Racket.__table__.columns)
+    rows = catalog_read_session(version).execute(
+        select(*columns).filter_by(is_active=True).order_by(Racket.id.asc())
+    ).all()
+    return tuple(CatalogRacket(*row) for row in rows)
+
+
+def _load_shared_rackets(version: int) -> Tuple[CatalogRacket, ...]:
+    rows = load_shared_catalog(
+        version, CatalogRacket._fields, lambda: _load_active_rackets(version)
+    )
+    return tuple(r if isinstance(r, CatalogRacket) else CatalogRacket(*r) for r in rows)
+
+
+def get_catalog_snapshot() -> Tuple[int, Tuple[CatalogRacket, ...]]:
+    """
+    (카탈로그 버전, is_active=True 라켓 스냅샷). 버전이 같으면 캐시 그대로 반환.
+    """
+    global _cached
+
+    version = get_catalog_version()
+    cached = _cached
+    if cached[0] == version:
+        cache_result("catalog_snapshot", True)
+        return cached
+
+    cache_result("catalog_snapshot", False)
+    with _lock:
+        if _cached[0] != version:
+            _cached = (version, _load_shared_rackets(version))
+        return _cached
+
+
+def get_active_rackets() -> Tuple[CatalogRacket, ...]:
+    """
+    is_active=True 라켓 스냅샷
+    """
+    return get_catalog_snapshot()[1]
+
+
+def get_public_listing() -> Tuple[int, str]:
+    """
+    공개 GET /rackets 본문: (버전, {"rackets": [...활성 라켓...]} JSON 문자열)
+    """
+    global _public_listing
+
+    version, rackets = get_catalog_snapshot()
+    listing = _public_listing
+    if listing[0] == version:
+        cache_result("public_listing", True)
+        return listing
+    cache_result("public_listing", False)
+
+    # CatalogRacket은 Racket과 속성명이 같아 to_dict를 그대로 쓸 수 있다.
+    body = current_app.json.dumps({"rackets": [Racket.to_dict(r) for r in rackets]})
+    _public_listing = (version, body)
+    return _public_listing
+
+
+def invalidate_catalog_cache():
+    """
+    워커 캐시와 호스트 공유 파일(catalog_matrix)을 모두 버린다.
+    """
+    global _cached, _peeked, _public_listing
+    with _lock:
+        _cached = (None, ())
+        _peeked = (0.0, None)
+        _public_listing = (None, None)
+    discard_shared_catalog()
@@ -0,0 +1,397 @@
+# services/cohort_service.py
+
+"""
+손 측정값 코호트 백분위 (고정 구간 히스토그램 스케치).
+
+- 손 길이/너비(mm), 검지/중지·약지/중지 비율을 고정 구간 카운트로 누적한다.
+- save_hand_metrics_from_result()마다 record_hand_metrics()로 프로세스 내 증분을 쌓고,
+  일정 개수/시간마다 metric_histograms에 합산(flush)한 뒤 전체 분포를 다시 읽는다.
+  요청이 끊긴 워커도 백그라운드 스레드(FLUSH_INTERVAL_SEC)와 종료 시(atexit) flush 한다.
+- DB I/O는 (첫 로드 포함) _lock 밖에서 한다. (_lock은 메모리 분포 교체에만 짧게, percentile 조회를 막지 않도록)
+- rebuild는 metric_histograms.generation을 올린다. 다른 워커가 이전 세대에서 쌓은 증분은
+  rebuild가 읽은 hand_metrics에 이미 들어 있으므로 flush 때 버린다. (중복 집계 방지)
+- percentile 조회는 구간 수에만 비례(이력 크기와 무관)하고, 누적합은 변경 시에만 다시 계산한다.
+- `flask --app app rebuild-cohort-sketch` 로 hand_metrics 전체에서 다시 만들 수 있다.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import select, delete, func
+
+from db_config import db, HandMetrics, MetricHistogram
+
+# metric → (lo, hi, bins)
+METRIC_BINS = {
+    "handLengthMm": (100.0, 260.0, 320),  # 0.5mm 단위
+    "handWidthMm": (40.0, 220.0, 360),  # 0.5mm 단위
+    "indexRatio": (0.6, 1.4, 160),  # 0.005 단위
+    "ringRatio": (0.6, 1.4, 160),
+}
+
+# 표본이 이보다 적으면 백분위를 내려주지 않는다.
+MIN_SAMPLES = int(os.getenv("COHORT_MIN_SAMPLES", "50"))
+FLUSH_EVERY = int(os.getenv("COHORT_FLUSH_EVERY", "20"))
+FLUSH_INTERVAL_SEC = float(os.getenv("COHORT_FLUSH_INTERVAL_SEC", "60"))
+
+_REBUILD_BATCH = 1000
+
+
+class FixedBinHistogram:
+    """
+    [lo, hi) 구간을 bins개로 나눈 카운트. 범위 밖 값은 양 끝 구간에 넣는다.
+    """
+
+    __slots__ = ("lo", "hi", "bins", "counts", "total", "_cum")
+
+    def __init__(self, lo: float, hi: float, bins: int, counts=None):
+        self.lo = lo
+        self.hi = hi
+        self.bins = bins
+        self.counts = list(counts) if counts and len(counts) == bins else [0] * bins
+        self.total = sum(self.counts)
+        self._cum = None
+
+    def _index(self, value: float) -> int:
+        idx = int((value - self.lo) / (self.hi - self.lo) * self.bins)
+        return min(max(idx, 0), self.bins - 1)
+
+    def add(self, value: float, n: int = 1):
+        self.counts[self._index(value)] += n
+        self.total += n
+        self._cum = None
+
+    def merge(self, other: "FixedBinHistogram"):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.total += other.total
+        self._cum = None
+
+    def percentile_rank(self, value: float) -> Optional[float]:
+        """
+        value보다 작은 표본 비율(%) — 같은 구간은 절반만 센다.
+        """
+        if self.total <= 0:
+            return None
+        if self._cum is None:
+            cum, running = [], 0
+            for c in self.counts:
+                cum.append(running)
+                running += c
+            self._cum = cum
+        idx = self._index(value)
+        below = self._cum[idx] + self.counts[idx] / 2.0
+        return below / self.total * 100.0
+
+
+def _new_histograms() -> Dict[str, FixedBinHistogram]:
+    return {name: FixedBinHistogram(*spec) for name, spec in METRIC_BINS.items()}
+
+
+def _metric_values(length_mm, width_mm, finger_ratios) -> Dict[str, float]:
+    values = {}
+    if isinstance(length_mm, (int, float)):
+        values["handLengthMm"] = float(length_mm)
+    if isinstance(width_mm, (int, float)):
+        values["handWidthMm"] = float(width_mm)
+    finger_ratios = finger_ratios or []
+    if len(finger_ratios) >= 1 and isinstance(finger_ratios[0], (int, float)):
+        values["indexRatio"] = float(finger_ratios[0])
+    if len(finger_ratios) >= 2 and isinstance(finger_ratios[1], (int, float)):
+        values["ringRatio"] = float(finger_ratios[1])
+    return values
+
+
+_lock = threading.Lock()  # _state 보호 (DB I/O 동안 잡지 않는다)
+_flush_lock = threading.Lock()  # flush / rebuild 직렬화
+_state = {
+    "loaded": False,
+    "hists": _new_histograms(),  # DB 분포 + 아직 flush 안 된 로컬 증분
+    "pending": _new_histograms(),  # 로컬 증분
+    "pending_count": 0,
+    "generation": 0,  # hists를 읽은 metric_histograms 세대 (pending도 이 세대 기준)
+    "last_flush": time.monotonic(),
+}
+_flusher_pid = None
+
+
+def _load_from_db() -> Tuple[Dict[str, FixedBinHistogram], int]:
+    """
+    (분포, 세대) — 세대는 구간 정의가 맞는 row 중 가장 큰 generation
+    """
+    hists = _new_histograms()
+    generation = 0
+    for row in MetricHistogram.query.all():
+        spec = METRIC_BINS.get(row.metric)
+        if spec is None or (row.lo, row.hi, row.bins) != spec:
+            # 구간 정의가 바뀐 경우 예전 카운트는 쓰지 않는다 (rebuild 필요)
+            continue
+        hists[row.metric] = FixedBinHistogram(*spec, counts=row.get_counts())
+        generation = max(generation, row.generation or 0)
+    return hists, generation
+
+
+def _ensure_loaded():
+    """
+    첫 조회/기록 전에 DB 분포를 읽는다. (_lock 없이 호출, 읽은 뒤 _lock 안에서 교체)
+    """
+    if _state["loaded"]:
+        return
+    hists, generation = _load_from_db()
+    with _lock:
+        if _state["loaded"]:
+            # 그 사이 flush/다른 스레드가 더 최신 분포를 넣었다
+            return
+        for name, pending in _state["pending"].items():
+            hists[name].merge(pending)
+        _state["hists"] = hists
+        _state["generation"] = generation
+        _state["loaded"] = True
+
+
+def _write_pending(pending: Dict[str, FixedBinHistogram], generation: int):
+    """
+    증분을 metric_histograms에 더하고 commit. (_lock 없이 호출)
+    row의 generation이 증분의 세대와 다르면(그 사이 rebuild) 그 지표의 증분은 버린다.
+    """
+    for name, hist in pending.items():
+        if hist.total <= 0:
+            continue
+        lo, hi, bins = METRIC_BINS[name]
+        row = db.session.get(MetricHistogram, name, with_for_update=True)
+        if row is not None and (row.generation or 0) != generation:
+            continue
+        if row is None or (row.lo, row.hi, row.bins) != (lo, hi, bins):
+            if row is not None:
+                db.session.delete(row)
+                db.session.flush()
+            row = MetricHistogram(
+                metric=name,
+                lo=lo,
+                hi=hi,
+                bins=bins,
+                counts_json="[]",
+                total=0,
+                generation=generation,
+            )
+            db.session.add(row)
+        stored = FixedBinHistogram(lo, hi, bins, counts=row.get_counts())
+        stored.merge(hist)
+        row.counts_json = json.dumps(stored.counts)
+        row.total = stored.total
+    db.session.commit()
+
+
+def _flush():
+    """
+    _flush_lock 보유 상태에서 호출:
+    1) _lock 안에서 증분을 떼어 내고
+    2) 락 없이 DB에 합산 + 전체 분포 다시 읽기
+    3) _lock 안에서 그 사이 새로 쌓인 증분을 얹어 분포 교체
+    실패하면 떼어 낸 증분을 되돌려 놓고 예외를 다시 던진다.
+    """
+    with _lock:
+        pending, count = _state["pending"], _state["pending_count"]
+        generation = _state["generation"]
+        _state["pending"] = _new_histograms()
+        _state["pending_count"] = 0
+        _state["last_flush"] = time.monotonic()
+
+    try:
+        _write_pending(pending, generation)
+        hists, generation = _load_from_db()
+    except Exception:
+        db.session.rollback()
+        with _lock:
+            for name, hist in pending.items():
+                _state["pending"][name].merge(hist)
+            _state["pending_count"] += count
+        raise
+
+    with _lock:
+        for name, hist in _state["pending"].items():
+            hists[name].merge(hist)
+        _state["hists"] = hists
+        _state["generation"] = generation
+        _state["loaded"] = True
+
+
+def _try_flush():
+    # 다른 스레드가 flush 중이면 건너뛴다 (증분은 다음 기회에)
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _flush()
+    except Exception:
+        pass
+    finally:
+        _flush_lock.release()
+
+
+def flush_if_stale(app):
+    """
+    FLUSH_INTERVAL_SEC 이상 flush 안 된 증분이 있으면 flush. (백그라운드 스레드 / 종료 시)
+    """
+    with _lock:
+        stale = (
+            _state["pending_count"] > 0
+            and time.monotonic() - _state["last_flush"] >= FLUSH_INTERVAL_SEC
+        )
+    if stale:
+        with app.app_context():
+            _try_flush()
+
+
+def _flush_periodically(app):
+    while True:
+        time.sleep(FLUSH_INTERVAL_SEC)
+        flush_if_stale(app)
+
+
+def _flush_at_exit(app):
+    with _lock:
+        has_pending = _state["pending_count"] > 0
+    if has_pending:
+        with app.app_context():
+            _try_flush()
+
+
+def _ensure_flusher():
+    """
+    프로세스(fork된 워커 포함)마다 한 번: 주기 flush 스레드 시작 + 종료 시 flush 등록.
+    """
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    _flusher_pid = os.getpid()
+    app = current_app._get_current_object()
+    threading.Thread(
+        target=_flush_periodically, args=(app,), name="cohort-flush", daemon=True
+    ).start()
+    atexit.register(_flush_at_exit, app)
+
+
+def record_hand_metrics(length_mm, width_mm, finger_ratios):
+    """
+    새 손 측정값을 분포에 더한다. 조건이 되면 DB에 합산(flush)까지 수행.
+    """
+    values = _metric_values(length_mm, width_mm, finger_ratios)
+    if not values:
+        return
+
+    _ensure_loaded()
+    with _lock:
+        _ensure_flusher()
+        for name, value in values.items():
+            _state["hists"][name].add(value)
+            _state["pending"][name].add(value)
+        _state["pending_count"] += 1
+
+        due = (
+            _state["pending_count"] >= FLUSH_EVERY
+            or time.monotonic() - _state["last_flush"] >= FLUSH_INTERVAL_SEC
+        )
+    if due:
+        _try_flush()
+
+
+def flush_pending():
+    with _flush_lock:
+        _flush()
+
+
+def cohort_percentiles(length_mm, width_mm, finger_ratios) -> Optional[dict]:
+    """
+    {"handLengthMm": 72, "handWidthMm": 55, "indexRatio": ..., "ringRatio": ...} (정수 %)
+    - 표본이 MIN_SAMPLES 미만인 지표는 None
+    - app context 밖(순수 함수 호출)에서는 None
+    """
+    if not has_app_context():
+        return None
+
+    values = _metric_values(length_mm, width_mm, finger_ratios)
+    if not values:
+        return None
+
+    _ensure_loaded()
+    with _lock:
+        result = {}
+        for name, value in values.items():
+            hist = _state["hists"][name]
+            if hist.total < MIN_SAMPLES:
+                result[name] = None
+                continue
+            result[name] = int(round(hist.percentile_rank(value)))
+    return result
+
+
+def rebuild_histograms() -> int:
+    """
+    hand_metrics 전체를 id 순서로 나눠 읽어 분포를 새로 만든다. 반환: 반영한 row 수
+    generation을 올려 다른 워커가 그 전에 쌓아 둔 증분이 다시 더해지지 않게 한다.
+    """
+    hists = _new_histograms()
+    stmt = select(
+        HandMetrics.id,
+        HandMetrics.hand_length_mm,
+        HandMetrics.hand_width_mm,
+        HandMetrics.finger_ratios_json,
+    )
+
+    total = 0
+    last_id = 0
+    while True:
+        # id keyset으로 _REBUILD_BATCH씩 (batch마다 PK 범위 검색)
+        rows = db.session.execute(
+            stmt.where(HandMetrics.id > last_id).order_by(HandMetrics.id.asc()).limit(_REBUILD_BATCH)
+        ).all()
+        if not rows:
+            break
+        for _, length_mm, width_mm, ratios_json in rows:
+            try:
+                ratios = json.loads(ratios_json) if ratios_json else []
+            except Exception:
+                ratios = []
+            values = _metric_values(
+                float(length_mm) if length_mm is not None else None,
+                float(width_mm) if width_mm is not None else None,
+                ratios,
+            )
+            for name, value in values.items():
+                hists[name].add(value)
+        total += len(rows)
+        last_id = rows[-1].id
+
+    with _flush_lock:
+        generation = (
+            db.session.execute(select(func.max(MetricHistogram.generation))).scalar() or 0
+        ) + 1
+        db.session.execute(delete(MetricHistogram))
+        for name, hist in hists.items():
+            lo, hi, bins = METRIC_BINS[name]
+            db.session.add(
+                MetricHistogram(
+                    metric=name,
+                    lo=lo,
+                    hi=hi,
+                    bins=bins,
+                    counts_json=json.dumps(hist.counts),
+                    total=hist.total,
+                    generation=generation,
+                )
+            )
+        db.session.commit()
+
+        with _lock:
+            _state["pending"] = _new_histograms()
+            _state["pending_count"] = 0
+            _state["last_flush"] = time.monotonic()
+            _state["hists"] = hists
+            _state["generation"] = generation
+            _state["loaded"] = True
+    return total
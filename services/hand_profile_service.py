@@ -1,5 +1,10 @@
 # services/hand_profile_service.py
 
+from services.cohort_service import cohort_percentiles
+from utils.metrics import timed_stage
+
+
+@timed_stage("build_hand_profile")
 def build_hand_profile(metrics: dict) -> dict:
     """
     손 분석 결과(JSON)를 바탕으로 손 프로파일을 생성한다.
@@ -58,6 +63,9 @@ def build_hand_profile(metrics: dict) -> dict:
         else:
             hand_type = "average"
 
+    # 전체 고객 대비 위치 (예: 손 길이 72 → 72%보다 긺), 표본이 부족하면 None
+    percentiles = cohort_percentiles(length_mm, width_mm, finger_ratios)
+
     return {
         "handExists": True,
         "handLengthScore": length_score,
@@ -69,4 +77,5 @@ def build_hand_profile(metrics: dict) -> dict:
         "gripSizeLabel": grip_size_label,               # L1/L2/L3
         "fingerRatios": finger_ratios,
         "handType": hand_type,
+        "cohortPercentiles": percentiles,
     }
@@ -1,15 +1,78 @@
 # services/history_service.py
 
+import hashlib
 import json
 from typing import Optional, List, Dict
-from db_config import db, HandMetrics, SurveyResponse, RecommendationLog
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from services.analytics_service import record_recommendation_rollups
+from services.cohort_service import record_hand_metrics
+from utils.metrics import timed_stage
+from db_config import (
+    db,
+    HandMetrics,
+    SurveyResponse,
+    RecommendationLog,
+    ProfileSnapshot,
+)
+
+
+# ----------------------------------------------------------------------
+# 0) 내용 기반 해시 유틸
+# ----------------------------------------------------------------------
+def _canonical_json(value) -> str:
+    """
+    키 정렬 + 공백 제거로 같은 내용이면 항상 같은 문자열이 되도록 직렬화.
+    """
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _content_hash(kind: str, canonical: str) -> str:
+    return hashlib.sha256(f"{kind}:{canonical}".encode("utf-8")).hexdigest()
+
+
+def get_or_create_profile_snapshots(profiles: Dict[str, dict]) -> Dict[str, ProfileSnapshot]:
+    """
+    {kind: 프로필 dict}를 정규화 JSON 해시 기준으로 profile_snapshots에서 한 번에 찾고,
+    없는 것만 새로 추가한다. (commit은 호출자가 담당, 여기서는 flush만)
+    """
+    canonical = {kind: _canonical_json(profile) for kind, profile in profiles.items()}
+    hashes = {kind: _content_hash(kind, text) for kind, text in canonical.items()}
+
+    # 요청마다 hand/style 두 개를 조회하므로 IN 한 번으로 묶는다
+    # 공유 잠금: 재사용하려는 오래된 스냅샷을 archive-history가 커밋 전에 지우지 못하게 (SQLite는 무시)
+    found = {
+        snap.content_hash: snap
+        for snap in ProfileSnapshot.query.filter(
+            ProfileSnapshot.content_hash.in_(list(hashes.values()))
+        ).with_for_update(read=True)
+    }
+
+    snapshots = {}
+    for kind, content_hash in hashes.items():
+        snap = found.get(content_hash)
+        if snap is None:
+            snap = ProfileSnapshot(kind=kind, content_hash=content_hash, payload_json=canonical[kind])
+            try:
+                # 동시에 같은 스냅샷을 넣는 요청이 있을 수 있으므로 savepoint 안에서 flush
+                with db.session.begin_nested():
+                    db.session.add(snap)
+            except IntegrityError:
+                snap = ProfileSnapshot.query.filter_by(content_hash=content_hash).first()
+        snapshots[kind] = snap
+    return snapshots
 
 
 # ----------------------------------------------------------------------
 # 1) 손 분석 결과 저장
 # ----------------------------------------------------------------------
+@timed_stage("save_hand_metrics_from_result")
 def save_hand_metrics_from_result(
     analysis_result: dict,
+    *,
+    commit: bool = True,
 ) -> HandMetrics:
     """
     hand_utils.analyze_hand() 결과 dict를 받아 hand_metrics 테이블에 저장한다.
@@ -26,6 +89,9 @@ def save_hand_metrics_from_result(
         "captureDistanceCm": 35.0,
         ...
     }
+
+    commit=False면 flush(id 발급)까지만 하고, commit과 코호트 반영(record_hand_metrics)은
+    호출자가 commit 후에 한다.
     """
     if not analysis_result:
         raise ValueError("analysis_result is empty")
@@ -52,7 +118,13 @@ def save_hand_metrics_from_result(
         raw_result_json=json.dumps(analysis_result, ensure_ascii=False),
     )
     db.session.add(hm)
+    if not commit:
+        db.session.flush()
+        return hm
     db.session.commit()
+
+    # 코호트 백분위 분포에 반영
+    record_hand_metrics(hand_length_mm, hand_width_mm, finger_ratios)
     return hm
 
 
@@ -61,6 +133,8 @@ def save_hand_metrics_from_result(
 # ----------------------------------------------------------------------
 def save_survey_response_from_payload(
     survey_payload: dict,
+    *,
+    commit: bool = True,
 ) -> SurveyResponse:
     """
     recommend.js에서 올리는 설문 payload를 받아 survey_responses에 저장.
@@ -74,9 +148,21 @@ def save_survey_response_from_payload(
         "stringTypePreference": "auto|poly|multi",
         ...
     }
+
+    commit=False면 savepoint 안에서 flush만 하고 commit은 호출자가 담당한다.
+    (추천 요청처럼 로그와 한 트랜잭션으로 묶을 때)
     """
     survey_payload = survey_payload or {}
 
+    # 같은 설문 payload면 기존 row를 그대로 재사용
+    # 공유 잠금: 보존기간이 지난 row라도 이 트랜잭션이 끝날 때까지 archive-history가 지우지 못하게 (SQLite는 무시)
+    payload_hash = _content_hash("survey", _canonical_json(survey_payload))
+    existing = (
+        SurveyResponse.query.filter_by(payload_hash=payload_hash).with_for_update(read=True).first()
+    )
+    if existing is not None:
+        return existing
+
     styles = survey_payload.get("styles") or []
 
     sr = SurveyResponse(
@@ -85,28 +171,46 @@ def save_survey_response_from_payload(
         swing=survey_payload.get("swing"),
         string_type_preference=survey_payload.get("stringTypePreference"),
         styles_json=json.dumps(styles, ensure_ascii=False),
+        payload_hash=payload_hash,
         extra_payload_json=json.dumps(survey_payload, ensure_ascii=False),
     )
+    if not commit:
+        try:
+            with db.session.begin_nested():
+                db.session.add(sr)
+        except IntegrityError:
+            # 동시 요청이 먼저 같은 payload를 저장한 경우
+            sr = SurveyResponse.query.filter_by(payload_hash=payload_hash).first()
+        return sr
+
     db.session.add(sr)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # 동시 요청이 먼저 같은 payload를 저장한 경우
+        db.session.rollback()
+        sr = SurveyResponse.query.filter_by(payload_hash=payload_hash).first()
     return sr
 
 
 # ----------------------------------------------------------------------
 # 3) 추천 로그 저장
 # ----------------------------------------------------------------------
+@timed_stage("log_recommendations")
 def log_recommendations(
     *,
-    hand_metrics: Optional[HandMetrics],
-    survey_response: Optional[SurveyResponse],
+    hand_metrics_id: Optional[int],
+    survey_response_id: Optional[int],
     hand_profile: dict,
     style_profile: dict,
     racket_candidates: List[Dict],
     string_rec: Dict,
     algorithm_version: str = "v1",
-) -> List[RecommendationLog]:
+    commit: bool = True,
+) -> int:
     """
-    match_rackets 결과를 recommendation_logs에 저장.
+    match_rackets 결과를 recommendation_logs에 저장하고 저장한 row 수를 돌려준다.
+    (commit=False면 flush까지만, commit은 호출자가 담당)
 
     racket_candidates 예시 (racket_matching_service 반환 구조):
     [
@@ -129,42 +233,50 @@ def log_recommendations(
         "reason": "...",
     }
     """
-    logs: List[RecommendationLog] = []
-
-    hand_profile_json = json.dumps(hand_profile, ensure_ascii=False)
-    style_profile_json = json.dumps(style_profile, ensure_ascii=False)
+    # 프로필은 요청당 한 번만, 내용이 같으면 기존 스냅샷 재사용
+    snapshots = get_or_create_profile_snapshots({"hand": hand_profile, "style": style_profile})
 
-    string_type = string_rec.get("stringType")
-    string_label = string_rec.get("stringLabel")
-    tension_kg = string_rec.get("tensionMainKg")
-    tension_lbs = string_rec.get("tensionMainLbs")
-    reason = string_rec.get("reason")
+    common = {
+        "hand_metrics_id": hand_metrics_id,
+        "survey_response_id": survey_response_id,
+        "recommended_string_type": string_rec.get("stringType"),
+        "recommended_string_label": string_rec.get("stringLabel"),
+        "recommended_tension_main_kg": string_rec.get("tensionMainKg"),
+        "recommended_tension_main_lbs": string_rec.get("tensionMainLbs"),
+        "algorithm_version": algorithm_version,
+        "rationale": string_rec.get("reason"),
+        "hand_profile_snapshot_id": snapshots["hand"].id,
+        "style_profile_snapshot_id": snapshots["style"].id,
+    }
 
+    rows = []
     for idx, racket in enumerate(racket_candidates, start=1):
-        racket_id = racket.get("id")
-
         # 정규화 이전의 내부 점수(rawScore)가 있으면 그 값을 우선 저장,
         # 없으면 기존 score(정규화 or 절대값)를 그대로 사용.
         raw_score = racket.get("rawScore")
         score = raw_score if raw_score is not None else racket.get("score")
 
-        log = RecommendationLog(
-            hand_metrics_id=hand_metrics.id if hand_metrics else None,
-            survey_response_id=survey_response.id if survey_response else None,
-            racket_id=racket_id,
-            recommended_string_type=string_type,
-            recommended_string_label=string_label,
-            recommended_tension_main_kg=tension_kg,
-            recommended_tension_main_lbs=tension_lbs,
-            recommendation_score=score,
-            rank_in_result=idx,
-            algorithm_version=algorithm_version,
-            rationale=reason,
-            hand_profile_json=hand_profile_json,
-            style_profile_json=style_profile_json,
+        rows.append(
+            dict(
+                common,
+                racket_id=racket.get("id"),
+                recommendation_score=score,
+                rank_in_result=idx,
+            )
         )
-        db.session.add(log)
-        logs.append(log)
 
-    db.session.commit()
-    return logs
+    if rows:
+        # ORM add()는 row마다 INSERT(+ id 조회)가 나가므로, 로그는 id가 필요 없어서
+        # multi-row INSERT ... VALUES (...), (...) 한 문장으로 쓴다.
+        db.session.execute(insert(RecommendationLog).values(rows))
+
+    # 통계 롤업도 같은 트랜잭션에서 누적
+    record_recommendation_rollups(
+        hand_profile=hand_profile,
+        style_profile=style_profile,
+        racket_candidates=racket_candidates,
+    )
+
+    if commit:
+        db.session.commit()
+    return len(rows)
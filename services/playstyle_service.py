@@ -1,5 +1,9 @@
 # services/playstyle_service.py
 
+from utils.metrics import timed_stage
+
+
+@timed_stage("build_playstyle_profile")
 def build_playstyle_profile(survey: dict) -> dict:
     """
     설문 데이터를 바탕으로 플레이 스타일 프로파일을 만든다.
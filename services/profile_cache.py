@@ -0,0 +1,117 @@
+# services/profile_cache.py
+
+"""
+저장된 row(id)로 만든 프로필 캐시 (프로세스 로컬 LRU + TTL).
+
+- hand  : handMetricsId    → build_hand_profile() 결과
+- style : surveyResponseId → build_playstyle_profile() 결과
+- 크기 PROFILE_CACHE_SIZE (종류별, 기본 1024), 유효 시간 PROFILE_CACHE_TTL_SEC (기본 300, 0이면 끔)
+- 같은 프로세스의 ORM update/delete는 mapper 이벤트로 바로 무효화하고,
+  bulk delete 경로(/admin/reset-db, archive-history)는 invalidate_profile_cache()를 호출한다.
+  다른 워커에서의 변경과 손 프로필의 코호트 백분위 변화는 TTL만큼 늦게 반영된다.
+- hit/miss: cache_requests_total{cache="hand_profile"|"style_profile"}, 크기: profile_cache_entries
+
+캐시된 dict는 여러 요청이 공유하므로 읽기 전용으로 다룬다.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+
+from db_config import HandMetrics, SurveyResponse
+from utils.metrics import Gauge, cache_result
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "1024"))
+PROFILE_CACHE_TTL_SEC = float(os.getenv("PROFILE_CACHE_TTL_SEC", "300"))
+
+
+def _cache_key(row_id) -> Optional[int]:
+    # payload id가 "12"처럼 문자열로 와도 같은 항목을 쓰도록
+    try:
+        return int(row_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProfileCache:
+    def __init__(self, name: str, maxsize: int, ttl_sec: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        # key → (만료 시각(monotonic), profile), 뒤쪽이 최근 사용
+        self._items: "OrderedDict[int, tuple]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_sec > 0
+
+    def get(self, row_id) -> Optional[dict]:
+        key = _cache_key(row_id)
+        if key is None or not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] <= now:
+                del self._items[key]
+                item = None
+            if item is not None:
+                self._items.move_to_end(key)
+        cache_result(self.name, item is not None)
+        return item[1] if item is not None else None
+
+    def put(self, row_id, profile: dict):
+        key = _cache_key(row_id)
+        if key is None or not self.enabled:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_sec, profile)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, row_id=None):
+        """
+        row_id 항목만, 없으면 전체 삭제
+        """
+        with self._lock:
+            if row_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(_cache_key(row_id), None)
+
+    def __len__(self):
+        return len(self._items)
+
+
+hand_profiles = ProfileCache("hand_profile", PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL_SEC)
+style_profiles = ProfileCache("style_profile", PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL_SEC)
+
+PROFILE_CACHE_ENTRIES = Gauge(
+    "profile_cache_entries",
+    "프로필 캐시 항목 수 (이 워커)",
+    ["cache"],
+    fn=lambda: {(c.name,): len(c) for c in (hand_profiles, style_profiles)},
+)
+
+
+def invalidate_profile_cache():
+    hand_profiles.invalidate()
+    style_profiles.invalidate()
+
+
+def _on_row_changed(cache: ProfileCache):
+    def listener(mapper, connection, target):
+        cache.invalidate(target.id)
+
+    return listener
+
+
+for _model, _cache in ((HandMetrics, hand_profiles), (SurveyResponse, style_profiles)):
+    event.listen(_model, "after_update", _on_row_changed(_cache))
+    event.listen(_model, "after_delete", _on_row_changed(_cache))
@@ -1,4 +1,17 @@
-from db_config import Racket
+import numpy as np
+
+from services.catalog_service import get_catalog_snapshot
+from services.catalog_matrix import (
+    get_catalog_matrix,
+    COL_POWER,
+    COL_CONTROL,
+    COL_SPIN,
+    COL_COMFORT,
+    COL_WEIGHT,
+    COL_SWINGWEIGHT,
+    COL_BALANCE,
+)
+from utils.metrics import timed_stage
 
 
 def _get_attr(obj, name, default=None):
@@ -6,6 +19,170 @@ def _get_attr(obj, name, default=None):
     return value if value is not None else default
 
 
+def _comfort_adjustment(pain) -> float:
+    # 통증 여부에 따른 comfort 보정
+    if pain == "often":
+        return 1.0
+    if pain == "sometimes":
+        return 0.5
+    return 0.0
+
+
+def _weight_range(level_score, pain, size_cat, length_pct):
+    """
+    무게/손 크기/통증에 따른 목표 무게 범위 → (target, min, max)
+    """
+    target_weight = 295
+    min_weight = 270
+    max_weight = 315
+
+    # 레벨 반영
+    if level_score <= 1:
+        target_weight = 285
+        max_weight = 300
+    elif level_score >= 3:
+        target_weight = 300
+        min_weight = 280
+
+    # 손 크기 반영
+    if size_cat in ("SMALL", "small"):
+        target_weight -= 5
+        max_weight -= 5
+    elif size_cat in ("LARGE", "large"):
+        target_weight += 5
+        min_weight += 5
+
+    if isinstance(length_pct, (int, float)):
+        if length_pct >= 90:
+            target_weight += 3
+        elif length_pct <= 10:
+            target_weight -= 3
+
+    # 통증 있으면 다시 가볍게
+    if pain == "often":
+        target_weight -= 5
+        max_weight -= 5
+
+    return target_weight, min_weight, max_weight
+
+
+def _weight_score(weight: np.ndarray, weight_range) -> np.ndarray:
+    target_weight, min_weight, max_weight = weight_range
+    in_range = (weight >= min_weight) & (weight <= max_weight)
+    weight_score = np.where(
+        in_range,
+        1.0,
+        np.maximum(0.0, 1.0 - np.abs(weight - target_weight) / 30.0),
+    )
+    return np.where(~np.isnan(weight), weight_score, 0.0)
+
+
+def _stability_score(m: np.ndarray) -> np.ndarray:
+    # 밸런스/스윙웨이트 기반 안정성 점수
+    swingweight = m[:, COL_SWINGWEIGHT]
+    balance = m[:, COL_BALANCE]
+    stability_score = np.where(swingweight >= 325, 0.5, 0.0)
+    stability_score += np.where(swingweight <= 310, -0.3, 0.0)
+    stability_score += np.where(balance == 1.0, 0.2, 0.0)
+    stability_score += np.where(balance == -1.0, -0.2, 0.0)
+    return stability_score
+
+
+def _size_penalty(weight: np.ndarray, size_cat):
+    # 손 크기 그룹/레벨에 따라 약간 보정 (예: SMALL + 무거운 라켓이면 감점 등)
+    if size_cat == "SMALL":
+        return np.where(weight >= 305, 1.0, 0.0)
+    if size_cat == "LARGE":
+        return np.where(weight <= 280, 0.5, 0.0)
+    return None
+
+
+def _score_matrix(
+    m: np.ndarray,
+    *,
+    power_w: float,
+    control_w: float,
+    spin_w: float,
+    comfort_w: float,
+    level_score,
+    pain,
+    size_cat,
+    length_pct,
+) -> np.ndarray:
+    """
+    카탈로그 행렬(catalog_matrix) 전체의 라켓 점수를 벡터 연산으로 계산한다.
+    값이 없는 스펙(NaN)은 예전 라켓별 루프와 같이 해당 보정을 건너뛴다.
+    """
+    m = np.asarray(m, dtype=np.float64)
+    weight = m[:, COL_WEIGHT]
+
+    with np.errstate(invalid="ignore"):
+        weight_score = _weight_score(weight, _weight_range(level_score, pain, size_cat, length_pct))
+        stability_score = _stability_score(m)
+
+        # 스타일 가중치 적용
+        scores = (
+            m[:, COL_POWER] * power_w
+            + m[:, COL_CONTROL] * control_w
+            + m[:, COL_SPIN] * spin_w
+            + (m[:, COL_COMFORT] + _comfort_adjustment(pain)) * comfort_w
+        )
+
+        # 무게/안정성 반영
+        scores += weight_score * 1.5 + stability_score
+
+        penalty = _size_penalty(weight, size_cat)
+        if penalty is not None:
+            scores -= penalty
+
+    return scores
+
+
+def _score_matrix_batch(m: np.ndarray, style_profiles, *, size_cat, length_pct) -> np.ndarray:
+    """
+    스타일 프로필 K개 × 카탈로그 N개 점수 행렬 (K×N).
+    _score_matrix와 같은 연산 순서라 행마다 결과가 비트 단위로 같다.
+    """
+    m = np.asarray(m, dtype=np.float64)
+    weight = m[:, COL_WEIGHT]
+
+    def column(key, default):
+        return np.array([[p.get(key, default)] for p in style_profiles], dtype=np.float64)
+
+    power_w = column("powerWeight", 1.0)
+    control_w = column("controlWeight", 1.0)
+    spin_w = column("spinWeight", 1.0)
+    comfort_w = column("comfortWeight", 1.0)
+    comfort_adj = np.array(
+        [[_comfort_adjustment(p.get("pain"))] for p in style_profiles], dtype=np.float64
+    )
+
+    with np.errstate(invalid="ignore"):
+        # 무게 점수는 (레벨, 통증) 조합마다 한 번만
+        by_range = {}
+        weight_score = np.empty((len(style_profiles), len(m)), dtype=np.float64)
+        for k, p in enumerate(style_profiles):
+            key = _weight_range(p.get("levelScore", 2), p.get("pain"), size_cat, length_pct)
+            if key not in by_range:
+                by_range[key] = _weight_score(weight, key)
+            weight_score[k] = by_range[key]
+        stability_score = _stability_score(m)
+
+        scores = (
+            m[:, COL_POWER] * power_w
+            + m[:, COL_CONTROL] * control_w
+            + m[:, COL_SPIN] * spin_w
+            + (m[:, COL_COMFORT] + comfort_adj) * comfort_w
+        )
+        scores += weight_score * 1.5 + stability_score
+
+        penalty = _size_penalty(weight, size_cat)
+        if penalty is not None:
+            scores -= penalty
+
+    return scores
+
+
 def _compute_string_recommendation(hand_profile: dict, style_profile: dict) -> dict:
     """
     스트링 타입 / 텐션 추천 (추측 기반 로직).
@@ -172,12 +349,52 @@ def _build_racket_reason(
     return " ".join(reasons)
 
 
-def match_rackets(hand_profile: dict, style_profile: dict):
+def _racket_fields(r) -> dict:
+    """
+    응답 항목 중 라켓 자체 스펙 필드 (프로필과 무관)
+    """
+    return {
+        "id": r.id,
+        "name": r.name,
+        "brand": r.brand,
+        # 점수 계열(추후 DB 확장 시 활용)
+        "power": _get_attr(r, "power_score", _get_attr(r, "power", 5)),
+        "control": _get_attr(r, "control_score", _get_attr(r, "control", 5)),
+        "spin": _get_attr(r, "spin_score", _get_attr(r, "spin", 5)),
+        # 스펙 계열
+        "head_size_sq_in": _get_attr(r, "head_size_sq_in", None),
+        "unstrung_weight_g": _get_attr(r, "unstrung_weight_g", _get_attr(r, "weight", None)),
+        "swingweight": _get_attr(r, "swingweight", None),
+        "stiffness_ra": _get_attr(r, "stiffness_ra", None),
+        "string_pattern": _get_attr(r, "string_pattern", None),
+        "tags": r.tags,
+        "url": r.url,
+    }
+
+
+def _racket_reason(fields: dict, hand_profile: dict, style_profile: dict) -> str:
+    return _build_racket_reason(
+        hand_profile,
+        style_profile,
+        head_size=fields["head_size_sq_in"],
+        unstrung_weight=fields["unstrung_weight_g"],
+        swingweight=fields["swingweight"],
+        stiffness_ra=fields["stiffness_ra"],
+        string_pattern=fields["string_pattern"],
+        power_score=fields["power"],
+        control_score=fields["control"],
+        spin_score=fields["spin"],
+    )
+
+
+@timed_stage("match_rackets")
+def match_rackets(hand_profile: dict, style_profile: dict, snapshot=None):
     """
     손 프로파일 + 플레이스타일 프로파일을 기반으로 라켓/스트링을 추천한다.
 
     - 라켓 스코어: power/control/spin/comfort + 무게/스윙웨이트/헤드사이즈/프레임강성까지 반영
     - 스트링: _compute_string_recommendation에서 별도 산출
+    - snapshot: 미리 가져온 get_catalog_snapshot() 결과 (없으면 여기서 조회)
     """
     power_w = style_profile.get("powerWeight", 1.0)
     control_w = style_profile.get("controlWeight", 1.0)
@@ -193,167 +410,50 @@ def match_rackets(hand_profile: dict, style_profile: dict):
     size_cat = hand_profile.get("handSizeCategory")
     size_group = hand_profile.get("sizeGroup")
 
-    candidates = []
-
-    # ★ is_active=True 인 라켓만 추천 대상에 포함
-    for r in Racket.query.filter_by(is_active=True).all():
-        # 점수 계열(추후 DB 확장 시 활용)
-        power_score = _get_attr(r, "power_score", _get_attr(r, "power", 5))
-        control_score = _get_attr(r, "control_score", _get_attr(r, "control", 5))
-        spin_score = _get_attr(r, "spin_score", _get_attr(r, "spin", 5))
-        comfort_score = _get_attr(r, "comfort_score", 5)
-
-        # 스펙 계열
-        head_size = _get_attr(r, "head_size_sq_in", None)
-        unstrung_weight = _get_attr(
-            r, "unstrung_weight_g", _get_attr(r, "weight", None)
-        )
-        swingweight = _get_attr(r, "swingweight", None)
-        stiffness_ra = _get_attr(r, "stiffness_ra", None)
-        balance_type = _get_attr(r, "balance_type", None)  # 'HL', 'EB', 'HH'
-        string_pattern = _get_attr(r, "string_pattern", None)
-
-        # 무게/손 크기/통증에 따른 가중치 조정
-        weight_score = 0.0
-        if isinstance(unstrung_weight, (int, float)):
-            target_weight = 295
-            min_weight = 270
-            max_weight = 315
-
-            # 레벨 반영
-            if level_score <= 1:
-                target_weight = 285
-                max_weight = 300
-            elif level_score >= 3:
-                target_weight = 300
-                min_weight = 280
-
-            # 손 크기 반영
-            if size_cat in ("SMALL", "small"):
-                target_weight -= 5
-                max_weight -= 5
-            elif size_cat in ("LARGE", "large"):
-                target_weight += 5
-                min_weight += 5
-
-            # 통증 있으면 다시 가볍게
-            if pain == "often":
-                target_weight -= 5
-                max_weight -= 5
-
-            if isinstance(unstrung_weight, (int, float)):
-                if min_weight <= unstrung_weight <= max_weight:
-                    weight_score = 1.0
-                else:
-                    diff = abs(unstrung_weight - target_weight)
-                    weight_score = max(0.0, 1.0 - diff / 30.0)
-
-        # 밸런스/스윙웨이트 기반 안정성 점수
-        stability_score = 0.0
-        if isinstance(swingweight, (int, float)):
-            if swingweight >= 325:
-                stability_score += 0.5
-            elif swingweight <= 310:
-                stability_score -= 0.3
-
-        if balance_type == "HL":
-            stability_score += 0.2
-        elif balance_type == "HH":
-            stability_score -= 0.2
-
-        # 통증 여부에 따른 comfort 보정
-        comfort_adj = 0.0
-        if pain == "often":
-            comfort_adj += 1.0
-        elif pain == "sometimes":
-            comfort_adj += 0.5
-
-        final_comfort = (comfort_score or 5) + comfort_adj
-
-        # 스타일 가중치 적용
-        base_score = (
-            power_score * power_w
-            + control_score * control_w
-            + spin_score * spin_w
-            + final_comfort * comfort_w
-        )
+    # 고객 분포상 손 길이 위치 (상·하위 10%면 목표 무게를 조금 더 조정)
+    length_pct = (hand_profile.get("cohortPercentiles") or {}).get("handLengthMm")
 
-        # 무게/안정성 반영
-        base_score += weight_score * 1.5 + stability_score
+    version, rackets = snapshot if snapshot is not None else get_catalog_snapshot()
+    matrix = get_catalog_matrix(version, rackets)
 
-        # 손 크기 그룹/레벨에 따라 약간 보정 (예: SMALL + 무거운 라켓이면 감점 등)
-        if size_cat == "SMALL" and isinstance(unstrung_weight, (int, float)):
-            if unstrung_weight >= 305:
-                base_score -= 1.0
-        if size_cat == "LARGE" and isinstance(unstrung_weight, (int, float)):
-            if unstrung_weight <= 280:
-                base_score -= 0.5
-
-        candidates.append(
-            {
-                "racket": r,
-                "score": float(base_score),
-                "powerScore": power_score,
-                "controlScore": control_score,
-                "spinScore": spin_score,
-                "comfortScore": final_comfort,
-                "headSize": head_size,
-                "unstrungWeight": unstrung_weight,
-                "swingweight": swingweight,
-                "stiffnessRa": stiffness_ra,
-                "stringPattern": string_pattern,
-            }
-        )
+    # ★ is_active=True 인 라켓 전체를 한 번에 채점 (행 순서 = rackets 순서)
+    scores = _score_matrix(
+        matrix,
+        power_w=power_w,
+        control_w=control_w,
+        spin_w=spin_w,
+        comfort_w=comfort_w,
+        level_score=level_score,
+        pain=pain,
+        size_cat=size_cat,
+        length_pct=length_pct,
+    )
 
-    # 점수 기준 정렬
-    candidates.sort(key=lambda c: c["score"], reverse=True)
+    # 점수 기준 정렬 (동점이면 카탈로그 순서 유지)
+    order = np.argsort(-scores, kind="stable")
 
     # 상위 N개만 노출
     top_n = 8
     result_rackets = []
-    if candidates:
-        max_score = candidates[0]["score"] or 1.0
+    if len(order):
+        max_score = float(scores[order[0]]) or 1.0
     else:
         max_score = 1.0
 
-    for rank, c in enumerate(candidates[:top_n], start=1):
-        r = c["racket"]
-        score = c["score"]
-        normalized = (score / max_score) * 100.0 if max_score > 0 else 0.0
+    comfort_adj = _comfort_adjustment(pain)
 
-        reason = _build_racket_reason(
-            hand_profile,
-            style_profile,
-            head_size=c["headSize"],
-            unstrung_weight=c["unstrungWeight"],
-            swingweight=c["swingweight"],
-            stiffness_ra=c["stiffnessRa"],
-            string_pattern=c["stringPattern"],
-            power_score=c["powerScore"],
-            control_score=c["controlScore"],
-            spin_score=c["spinScore"],
-        )
+    for idx in order[:top_n]:
+        r = rackets[idx]
+        score = float(scores[idx])
+        normalized = (score / max_score) * 100.0 if max_score > 0 else 0.0
 
-        result_rackets.append(
-            {
-                "id": r.id,
-                "name": r.name,
-                "brand": r.brand,
-                "score": round(normalized, 1),
-                "power": c["powerScore"],
-                "control": c["controlScore"],
-                "spin": c["spinScore"],
-                "comfort": c["comfortScore"],
-                "head_size_sq_in": c["headSize"],
-                "unstrung_weight_g": c["unstrungWeight"],
-                "swingweight": c["swingweight"],
-                "stiffness_ra": c["stiffnessRa"],
-                "string_pattern": c["stringPattern"],
-                "tags": r.tags,
-                "url": r.url,
-                "reason": reason,
-            }
+        fields = _racket_fields(r)
+        fields.update(
+            score=round(normalized, 1),
+            comfort=(_get_attr(r, "comfort_score", 5) or 5) + comfort_adj,
+            reason=_racket_reason(fields, hand_profile, style_profile),
         )
+        result_rackets.append(fields)
 
     # 스트링 추천
     string_rec = _compute_string_recommendation(hand_profile, style_profile)
@@ -362,3 +462,77 @@ def match_rackets(hand_profile: dict, style_profile: dict):
         "rackets": result_rackets,
         "string": string_rec,
     }
+
+
+@timed_stage("sweep_rackets")
+def sweep_rackets(hand_profile: dict, style_profiles: list, *, top_n: int = 8, reasons: bool = True):
+    """
+    스타일 프로필 여러 개에 대한 match_rackets 결과를 카탈로그 한 번 채점(K×N 행렬)으로 계산한다.
+
+    반환:
+    {
+        "catalogVersion": 12,
+        "rackets": {id: 라켓 스펙 필드},          # 상위 N에 한 번이라도 든 라켓만, 한 번씩
+        "results": [                              # style_profiles 순서
+            {"rackets": [{"id", "score", "comfort", "reason"}, ...], "string": {...}},
+            ...
+        ]
+    }
+    results 항목에 rackets[id]를 합치면 match_rackets의 항목과 같다.
+    """
+    size_cat = hand_profile.get("handSizeCategory")
+    length_pct = (hand_profile.get("cohortPercentiles") or {}).get("handLengthMm")
+
+    version, rackets = get_catalog_snapshot()
+    matrix = get_catalog_matrix(version, rackets)
+
+    scores = _score_matrix_batch(matrix, style_profiles, size_cat=size_cat, length_pct=length_pct)
+    # 행마다 점수 기준 정렬 (동점이면 카탈로그 순서 유지)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :top_n]
+
+    fields_by_idx = {}
+    # 사유 문구는 (라켓, 레벨, 통증, 스타일)에만 의존 → 조합 간 재사용
+    reason_cache = {}
+    results = []
+    for k, style_profile in enumerate(style_profiles):
+        row = scores[k]
+        top = order[k]
+        max_score = (float(row[top[0]]) or 1.0) if len(top) else 1.0
+        comfort_adj = _comfort_adjustment(style_profile.get("pain"))
+
+        items = []
+        for idx in top:
+            fields = fields_by_idx.get(idx)
+            if fields is None:
+                fields = fields_by_idx[idx] = _racket_fields(rackets[idx])
+            score = float(row[idx])
+            item = {
+                "id": fields["id"],
+                "score": round((score / max_score) * 100.0 if max_score > 0 else 0.0, 1),
+                "comfort": (_get_attr(rackets[idx], "comfort_score", 5) or 5) + comfort_adj,
+            }
+            if reasons:
+                key = (
+                    idx,
+                    style_profile.get("levelScore", 2),
+                    style_profile.get("pain"),
+                    tuple(style_profile.get("styles") or ()),
+                )
+                reason = reason_cache.get(key)
+                if reason is None:
+                    reason = reason_cache[key] = _racket_reason(fields, hand_profile, style_profile)
+                item["reason"] = reason
+            items.append(item)
+
+        results.append(
+            {
+                "rackets": items,
+                "string": _compute_string_recommendation(hand_profile, style_profile),
+            }
+        )
+
+    return {
+        "catalogVersion": version,
+        "rackets": {fields["id"]: fields for fields in fields_by_idx.values()},
+        "results": results,
+    }
@@ -1,40 +1,105 @@
 # services/recommend_service.py
 
-import json
+import itertools
+import os
+from concurrent.futures import wait
 from typing import Dict, Any
 
+from sqlalchemy import literal, select
+from sqlalchemy.orm import defer
+
+from services.catalog_matrix import get_catalog_matrix
+from services.catalog_service import get_catalog_snapshot
+from services.cohort_service import record_hand_metrics
 from services.hand_profile_service import build_hand_profile
 from services.playstyle_service import build_playstyle_profile
-from services.racket_matching_service import match_rackets
+from services.racket_matching_service import match_rackets, sweep_rackets
 from services.history_service import (
+    save_hand_metrics_from_result,
     save_survey_response_from_payload,
     log_recommendations,
 )
+from services.profile_cache import hand_profiles, style_profiles
+from utils.executors import inference_executor
+from utils.hand_utils import analyze_hand
 from db_config import HandMetrics, SurveyResponse, db
 
+# 손 메트릭이 아닌 payload 키
+_NON_METRIC_KEYS = ("survey", "handMetricsId", "surveyResponseId", "vary", "reasons")
 
-def _load_hand_metrics_by_id(hand_metrics_id):
-    if not hand_metrics_id:
-        return None, None
+# /recommend-rackets/sweep 에서 바꿔 볼 수 있는 설문 항목과 값 (index.html 선택지, None = 선택 안 함)
+SWEEP_DIMENSIONS = {
+    "level": (None, "beginner", "intermediate", "advanced", "expert"),
+    "pain": (None, "none", "sometimes", "often"),
+    "swing": (None, "slow", "normal", "fast"),
+    "styles": tuple(
+        list(combo)
+        for n in range(4)
+        for combo in itertools.combinations(("power", "control", "spin"), n)
+    ),
+    "stringTypePreference": ("auto", "poly", "multi"),
+}
+# 기본값은 level × pain × swing × styles 전체(640)를 한 번에 받을 수 있는 크기
+SWEEP_MAX_COMBINATIONS = int(os.getenv("SWEEP_MAX_COMBINATIONS", "640"))
 
-    hm = HandMetrics.query.get(hand_metrics_id)
-    if not hm:
-        return None, None
 
-    metrics_dict = hm.to_dict()
-    return hm, metrics_dict
+def _load_hand_and_survey(hand_metrics_id, survey_response_id):
+    """
+    HandMetrics / SurveyResponse를 PK로 로드. 둘 다 있으면 한 번의 SELECT로 가져온다.
 
+    - 큰 JSON 컬럼(raw_result_json, extra_payload_json)은 읽지 않는다.
+    - 하나만 있으면 session.get (identity map에 있으면 쿼리 없음)
+    """
+    if hand_metrics_id and survey_response_id:
+        # (SELECT 1) anchor에 두 테이블을 각각 outer join → 어느 쪽이 없어도 row 하나
+        anchor = select(literal(1).label("one")).subquery("anchor")
+        stmt = (
+            select(HandMetrics, SurveyResponse)
+            .select_from(anchor)
+            .outerjoin(HandMetrics, HandMetrics.id == hand_metrics_id)
+            .outerjoin(SurveyResponse, SurveyResponse.id == survey_response_id)
+            .options(
+                defer(HandMetrics.raw_result_json),
+                defer(SurveyResponse.extra_payload_json),
+            )
+        )
+        hm, sr = db.session.execute(stmt).one()
+    else:
+        hm = db.session.get(HandMetrics, hand_metrics_id) if hand_metrics_id else None
+        sr = db.session.get(SurveyResponse, survey_response_id) if survey_response_id else None
+
+    return (
+        hm,
+        hm.to_dict() if hm else None,
+        sr,
+        sr.to_dict() if sr else None,
+    )
 
-def _load_survey_response_by_id(survey_response_id):
-    if not survey_response_id:
-        return None, None
 
-    sr = SurveyResponse.query.get(survey_response_id)
-    if not sr:
-        return None, None
+def _hand_metrics_from_payload(payload: Dict[str, Any]) -> dict:
+    # 1) handMetrics 키가 있으면 그걸 사용
+    hand_metrics = payload.get("handMetrics")
+    if isinstance(hand_metrics, dict):
+        return hand_metrics
+    # 2) 없으면 survey 등을 제외한 나머지 상위 키들을 메트릭스로 간주
+    return {k: v for k, v in payload.items() if k not in _NON_METRIC_KEYS}
 
-    survey_dict = sr.to_dict()
-    return sr, survey_dict
+
+def _hand_profile_for(payload: Dict[str, Any]) -> dict:
+    """
+    handMetricsId(캐시 → DB) 우선, 없으면 payload 메트릭으로 손 프로필 생성
+    """
+    hand_metrics_id = payload.get("handMetricsId")
+    if hand_metrics_id:
+        cached = hand_profiles.get(hand_metrics_id)
+        if cached is not None:
+            return cached
+        hm, hand_metrics_dict, _, _ = _load_hand_and_survey(hand_metrics_id, None)
+        if hm is not None:
+            hand_profile = build_hand_profile(hand_metrics_dict)
+            hand_profiles.put(hm.id, hand_profile)
+            return hand_profile
+    return build_hand_profile(_hand_metrics_from_payload(payload))
 
 
 def recommend_rackets_from_metrics(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -62,72 +127,76 @@ def recommend_rackets_from_metrics(payload: Dict[str, Any]) -> Dict[str, Any]:
        }
 
     - handMetricsId/surveyResponseId가 있으면 DB에서 우선 로드
+      (id로 만든 프로필은 profile_cache에 캐시)
     - survey payload가 함께 오면, DB 설문 대신 그걸 기반으로 profile 생성
       (단, 별도로 저장하고 싶으면 별도의 API에서 save_survey_response_from_payload 사용)
     """
     payload = payload or {}
 
-    # ---- 1) 손 메트릭 취합 (DB 우선, 없으면 payload 상단 키들) ----
     hand_metrics_id = payload.get("handMetricsId")
-    hand_obj = None
-    hand_metrics_dict = None
-
-    if hand_metrics_id:
-        hand_obj, hand_metrics_dict = _load_hand_metrics_by_id(hand_metrics_id)
-
-    if hand_metrics_dict is None:
-        # 1-1) handMetrics 키가 있으면 그걸 사용
-        hand_metrics = payload.get("handMetrics")
-        if isinstance(hand_metrics, dict):
-            hand_metrics_dict = hand_metrics
-        else:
-            # 1-2) 없으면 survey를 제외한 나머지 상위 키들을 메트릭스로 간주
-            hand_metrics_dict = {
-                k: v for k, v in payload.items()
-                if k not in ("survey", "handMetricsId", "surveyResponseId")
-            }
-
-    # ---- 2) 설문 취합 (DB 설문 vs payload survey) ----
     survey_response_id = payload.get("surveyResponseId")
-    survey_obj = None
-    survey_dict = None
 
-    if survey_response_id:
-        survey_obj, survey_dict = _load_survey_response_by_id(survey_response_id)
+    # ---- 0) id로 만든 프로필은 캐시 우선, 없는 것만 DB row 로드 (hand + survey 한 번에) ----
+    cached_hand = hand_profiles.get(hand_metrics_id) if hand_metrics_id else None
+    cached_style = style_profiles.get(survey_response_id) if survey_response_id else None
 
-    if payload.get("survey") is not None:
-        # payload 안의 survey가 있으면, DB에서 가져온 값보다 우선한다.
-        survey_dict = payload.get("survey") or {}
+    hand_obj, hand_metrics_dict, survey_obj, survey_dict = _load_hand_and_survey(
+        hand_metrics_id if cached_hand is None else None,
+        survey_response_id if cached_style is None else None,
+    )
+    # 로그에 남길 id (캐시 hit 이거나 row가 실제로 있을 때만)
+    if cached_hand is None:
+        hand_metrics_id = hand_obj.id if hand_obj else None
+    if cached_style is None:
+        survey_response_id = survey_obj.id if survey_obj else None
 
-    survey_dict = survey_dict or {}
+    # ---- 1) 손 프로필 (캐시 → DB 메트릭 → payload 상단 키들) ----
+    if cached_hand is not None:
+        hand_profile = cached_hand
+    elif hand_metrics_dict is not None:
+        hand_profile = build_hand_profile(hand_metrics_dict)
+        hand_profiles.put(hand_metrics_id, hand_profile)
+    else:
+        hand_profile = build_hand_profile(_hand_metrics_from_payload(payload))
 
-    # ---- 3) profile 생성 ----
-    hand_profile = build_hand_profile(hand_metrics_dict)
-    style_profile = build_playstyle_profile(survey_dict)
+    # ---- 2) 스타일 프로필 (payload survey → 캐시 → DB 설문) ----
+    if survey_obj is not None:
+        cached_style = build_playstyle_profile(survey_dict)
+        style_profiles.put(survey_response_id, cached_style)
+
+    survey_payload = payload.get("survey")
+    if survey_payload is not None:
+        # payload 안의 survey가 있으면, DB에서 가져온 값보다 우선한다.
+        survey_payload = survey_payload or {}
+        style_profile = build_playstyle_profile(survey_payload)
+    elif cached_style is not None:
+        style_profile = cached_style
+    else:
+        style_profile = build_playstyle_profile({})
 
     # ---- 4) 라켓/스트링 매칭 ----
     match = match_rackets(hand_profile, style_profile)
     rackets = match.get("rackets", [])
     string_rec = match.get("string") or {}
 
-    # ---- 5) 추천 로그 기록 ----
+    # ---- 5) 추천 로그 기록 (설문 저장 + 로그 + 롤업을 한 트랜잭션, commit 한 번) ----
     #    - 설문 payload만 있고 SurveyResponse row는 없을 수 있으므로
     #      여기서 새 row로 저장할지 여부는 정책에 따라 선택.
     #      여기서는 "surveyResponseId가 없고, survey payload가 있으면 새로 저장"으로 가정.
-    if survey_obj is None and survey_dict:
-        survey_obj = save_survey_response_from_payload(survey_dict)
+    if survey_response_id is None and survey_payload:
+        survey_response_id = save_survey_response_from_payload(survey_payload, commit=False).id
 
-    # hand_obj가 아직 없고, hand_metrics_dict가 있고, 그게 analyze_hand 결과라면
+    # hand_metrics_id가 아직 없고, hand_metrics_dict가 있고, 그게 analyze_hand 결과라면
     # 여기서 저장할 수도 있지만, 보통은 /scan-hand에서 저장하고 id만 써도 충분해서
     # 이 부분은 선택적으로 남겨둔다. 필요하면 정책에 따라 활성화.
     # 예시:
-    # if hand_obj is None and hand_metrics_dict and hand_metrics_dict.get("handLengthMm"):
+    # if hand_metrics_id is None and hand_metrics_dict and hand_metrics_dict.get("handLengthMm"):
     #     from services.history_service import save_hand_metrics_from_result
-    #     hand_obj = save_hand_metrics_from_result(hand_metrics_dict)
+    #     hand_metrics_id = save_hand_metrics_from_result(hand_metrics_dict).id
 
     log_recommendations(
-        hand_metrics=hand_obj,
-        survey_response=survey_obj,
+        hand_metrics_id=hand_metrics_id,
+        survey_response_id=survey_response_id,
         hand_profile=hand_profile,
         style_profile=style_profile,
         racket_candidates=rackets,
@@ -143,3 +212,177 @@ def recommend_rackets_from_metrics(payload: Dict[str, Any]) -> Dict[str, Any]:
         "rackets": rackets,
         "string": string_rec,
     }
+
+
+def scan_and_recommend(
+    image_path: str,
+    survey: Dict[str, Any],
+    *,
+    capture_distance_cm=None,
+    capture_device=None,
+) -> Dict[str, Any]:
+    """
+    /scan-and-recommend : 손 분석 + 추천을 한 요청으로 처리한다.
+
+    - analyze_hand는 inference_executor에서 돌리고, 그동안 요청 스레드는
+      카탈로그 스냅샷/행렬과 스타일 프로필을 준비한다.
+    - 점수는 저장한 row를 다시 읽지 않고 메모리의 분석 결과로 바로 계산한다.
+    - HandMetrics / SurveyResponse / 추천 로그는 그 뒤 한 트랜잭션(commit 한 번)으로 저장한다.
+
+    손 인식에 실패하면 None (아무것도 저장하지 않음).
+    준비 중 예외가 나도 추론이 끝나거나 취소된 뒤에 다시 던진다.
+    (호출자가 image_path 임시 파일을 지우기 전에 analyze_hand가 파일을 다 읽도록)
+    """
+    future = inference_executor().submit(
+        analyze_hand,
+        image_path,
+        capture_distance_cm=capture_distance_cm,
+        capture_device=capture_device,
+    )
+
+    # ---- 추론과 겹쳐서 준비 ----
+    try:
+        survey = survey or {}
+        style_profile = build_playstyle_profile(survey)
+        snapshot = get_catalog_snapshot()
+        get_catalog_matrix(*snapshot)
+    except BaseException:
+        if not future.cancel():
+            wait([future])
+        raise
+
+    result = future.result()
+    if result is None:
+        return None
+
+    # ---- 메모리의 분석 결과로 바로 채점 ----
+    hand_profile = build_hand_profile(result)
+    match = match_rackets(hand_profile, style_profile, snapshot=snapshot)
+    rackets = match.get("rackets", [])
+    string_rec = match.get("string") or {}
+
+    # ---- 저장 (손 + 설문 + 로그 + 롤업, commit 한 번) ----
+    hm = save_hand_metrics_from_result(result, commit=False)
+    survey_response_id = (
+        save_survey_response_from_payload(survey, commit=False).id if survey else None
+    )
+    log_recommendations(
+        hand_metrics_id=hm.id,
+        survey_response_id=survey_response_id,
+        hand_profile=hand_profile,
+        style_profile=style_profile,
+        racket_candidates=rackets,
+        string_rec=string_rec,
+        algorithm_version="v1",
+        commit=False,
+    )
+    db.session.commit()
+
+    # 코호트 분포 반영 + 이후 handMetricsId 로 오는 /recommend-rackets 는 캐시 hit
+    record_hand_metrics(
+        result.get("handLengthMm"), result.get("handWidthMm"), result.get("fingerRatios") or []
+    )
+    hand_profiles.put(hm.id, hand_profile)
+
+    result["handMetricsId"] = hm.id
+    return {
+        "handMetrics": result,
+        "surveyResponseId": survey_response_id,
+        "handProfile": hand_profile,
+        "styleProfile": style_profile,
+        "rackets": rackets,
+        "string": string_rec,
+    }
+
+
+def _sweep_values(name, values):
+    domain = SWEEP_DIMENSIONS[name]
+    if values is True:
+        return list(domain)
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"vary.{name}: 값 목록(list) 또는 true 여야 합니다")
+    if name == "styles":
+        # 순서/중복과 무관하게 같은 조합으로 본다
+        normalized = []
+        for styles in values:
+            if not isinstance(styles, list) or not set(styles) <= {"power", "control", "spin"}:
+                raise ValueError(f"vary.styles: 지원하지 않는 값 {styles!r}")
+            normalized.append([s for s in ("power", "control", "spin") if s in styles])
+        return normalized
+    unknown = [v for v in values if v not in domain]
+    if unknown:
+        raise ValueError(f"vary.{name}: 지원하지 않는 값 {unknown!r}")
+    return list(values)
+
+
+def sweep_recommendations(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    /recommend-rackets/sweep : 설문 항목 조합별 추천을 한 번에 계산한다. (추천 로그는 남기지 않음)
+
+    payload 예시:
+       {
+         "handMetricsId": 123,                 # 또는 /recommend-rackets와 같은 메트릭 키들
+         "survey": { ... 기준 설문 ... },
+         "vary": {                             # 바꿔 볼 항목: 값 목록 또는 true(전체 선택지)
+           "level": ["beginner", "intermediate"],
+           "styles": true
+         },
+         "reasons": true                       # false면 라켓별 추천 사유 문구 생략
+       }
+       ("vary": ["level", "pain"] 처럼 항목 이름 목록만 줘도 된다)
+
+    반환:
+       {
+         "handProfile": {...},
+         "catalogVersion": 12,
+         "dimensions": {"level": [...], "styles": [...]},
+         "rackets": {id: 라켓 스펙 필드},
+         "results": [
+           {"survey": {...조합 설문...}, "rackets": [{"id", "score", "comfort", "reason"}], "string": {...}},
+           ...
+         ]
+       }
+    results[i].rackets 항목에 rackets[id]를 합치면 /recommend-rackets 의 rackets 항목과 같다.
+    잘못된 vary 는 ValueError.
+    """
+    payload = payload or {}
+
+    vary = payload.get("vary") or {}
+    if isinstance(vary, list):
+        vary = {name: True for name in vary}
+    if not isinstance(vary, dict):
+        raise ValueError("vary: 객체 또는 항목 이름 목록이어야 합니다")
+    unknown = [name for name in vary if name not in SWEEP_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"vary: 지원하지 않는 항목 {unknown!r}")
+
+    # 항목 순서를 고정해 results 순서가 요청마다 같도록
+    dimensions = {
+        name: _sweep_values(name, vary[name]) for name in SWEEP_DIMENSIONS if name in vary
+    }
+    total = 1
+    for values in dimensions.values():
+        total *= len(values)
+    if total > SWEEP_MAX_COMBINATIONS:
+        raise ValueError(f"조합 수 {total}개가 최대 {SWEEP_MAX_COMBINATIONS}개를 넘습니다")
+
+    base_survey = payload.get("survey") or {}
+    surveys = [
+        dict(base_survey, **dict(zip(dimensions, combo)))
+        for combo in itertools.product(*dimensions.values())
+    ]
+
+    hand_profile = _hand_profile_for(payload)
+    style_list = [build_playstyle_profile(survey) for survey in surveys]
+
+    swept = sweep_rackets(hand_profile, style_list, reasons=payload.get("reasons", True) is not False)
+    for survey, result in zip(surveys, swept["results"]):
+        result["survey"] = survey
+
+    return {
+        "handProfile": hand_profile,
+        "catalogVersion": swept["catalogVersion"],
+        "dimensions": dimensions,
+        "rackets": swept["rackets"],
+        "results": swept["results"],
+    }
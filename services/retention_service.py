@@ -0,0 +1,326 @@
+# services/retention_service.py
+
+"""
+이력 테이블 보존기간(retention) / 아카이브 / 정리.
+
+- recommendation_logs, hand_metrics, survey_responses 중 보존기간이 지난 row를
+  <archive_dir>/<table>/<YYYY-MM-DD>.ndjson.gz (gzip NDJSON, 날짜별 파티션)으로 옮긴 뒤 삭제한다.
+- 삭제는 id 순서로 batch_size 단위로 나눠 커밋하므로 긴 락을 잡지 않는다.
+  참조 여부(NOT EXISTS)는 DELETE에서도 다시 확인해, 고른 뒤 재사용된 row는 남긴다.
+- batch는 먼저 <날짜>.ndjson.gz.pending 파일에 쓰고, 삭제 커밋이 성공한 뒤에만 날짜 파일에 붙인다.
+  커밋 전후로 죽어 pending이 남으면 다음 실행이 DB에 row가 남아 있는지 보고 버리거나
+  (이미 붙은 id는 빼고) 이어 붙인다 → 아카이브에 같은 row가 두 번 들어가지 않는다.
+- cutoff는 created_at을 채우는 DB 서버 시계(db_now) 기준
+- 무엇을 옮겼는지는 archive_rollups에 (테이블 × 날짜) 단위로 누적한다.
+- `flask --app app archive-history` 로 실행
+"""
+
+import glob
+import gzip
+import json
+import os
+import shutil
+from collections import defaultdict
+from datetime import datetime, timedelta, date
+from decimal import Decimal
+from typing import Dict, Optional
+
+from sqlalchemy import select, delete, exists
+
+from db_config import (
+    db,
+    db_now,
+    HandMetrics,
+    SurveyResponse,
+    RecommendationLog,
+    ProfileSnapshot,
+    ArchiveRollup,
+)
+from services.profile_cache import invalidate_profile_cache
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "180"))
+DEFAULT_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR", os.path.join(BASE_DIR, "archive"))
+DEFAULT_BATCH_SIZE = int(os.getenv("HISTORY_ARCHIVE_BATCH_SIZE", "1000"))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def _partition_date(created_at) -> date:
+    if isinstance(created_at, datetime):
+        return created_at.date()
+    # SQLite에서 문자열로 돌아오는 경우 대비
+    return datetime.fromisoformat(str(created_at)).date()
+
+
+def _bump_rollup(table_name: str, day: date, rows, file_path: str):
+    ids = [r["id"] for r in rows]
+    rollup = ArchiveRollup.query.filter_by(table_name=table_name, partition_date=day).first()
+    if rollup is None:
+        rollup = ArchiveRollup(
+            table_name=table_name,
+            partition_date=day,
+            row_count=0,
+            file_path=file_path,
+        )
+        db.session.add(rollup)
+
+    rollup.row_count = (rollup.row_count or 0) + len(ids)
+    rollup.min_id = min(ids) if rollup.min_id is None else min(rollup.min_id, min(ids))
+    rollup.max_id = max(ids) if rollup.max_id is None else max(rollup.max_id, max(ids))
+    rollup.file_path = file_path
+
+
+def _embed_profile_snapshots(rows):
+    """
+    로그 row에 프로필 스냅샷 내용을 채워 넣어 아카이브 파일만으로 해석 가능하게 한다.
+    (스냅샷 row는 참조가 사라지면 아래에서 정리된다)
+    """
+    snapshot_ids = set()
+    for r in rows:
+        snapshot_ids.update(
+            i for i in (r["hand_profile_snapshot_id"], r["style_profile_snapshot_id"]) if i
+        )
+    if not snapshot_ids:
+        return rows
+
+    payloads = dict(
+        db.session.execute(
+            select(ProfileSnapshot.id, ProfileSnapshot.payload_json).where(
+                ProfileSnapshot.id.in_(snapshot_ids)
+            )
+        ).all()
+    )
+
+    out = []
+    for r in rows:
+        r = dict(r)
+        if not r.get("hand_profile_json"):
+            r["hand_profile_json"] = payloads.get(r["hand_profile_snapshot_id"])
+        if not r.get("style_profile_json"):
+            r["style_profile_json"] = payloads.get(r["style_profile_snapshot_id"])
+        out.append(r)
+    return out
+
+
+_PENDING_SUFFIX = ".pending"
+
+
+def _read_archive_ids(file_path: str) -> set:
+    ids = set()
+    try:
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    ids.add(json.loads(line)["id"])
+    except (EOFError, OSError):
+        # 붙이던 중 끊겨 잘린 마지막 gzip 멤버 — 읽힌 데까지만
+        pass
+    return ids
+
+
+def _append_archive(file_path: str, pending_path: str, skip_ids=None):
+    """
+    pending 파일(완결된 gzip 멤버)을 날짜 파일 뒤에 붙이고 pending을 지운다.
+    skip_ids가 있으면 그 id의 row는 빼고 붙인다. (복구 경로)
+    """
+    if skip_ids:
+        with gzip.open(pending_path, "rt", encoding="utf-8") as src:
+            lines = [line for line in src if line.strip() and json.loads(line)["id"] not in skip_ids]
+        if lines:
+            with gzip.open(file_path, "at", encoding="utf-8") as dst:
+                dst.writelines(lines)
+    else:
+        with open(pending_path, "rb") as src, open(file_path, "ab") as dst:
+            shutil.copyfileobj(src, dst)
+    os.remove(pending_path)
+
+
+def _recover_pending(table, table_dir: str):
+    """
+    지난 실행이 남긴 pending 파일 정리.
+    - row가 아직 DB에 있으면 삭제 커밋 전에 멈춘 것 → pending 버림 (이번 실행이 다시 아카이브)
+    - 없으면 커밋 후 붙이기 전에 멈춘 것 → 날짜 파일에 이미 있는 id는 빼고 붙임
+    """
+    for pending_path in sorted(glob.glob(os.path.join(table_dir, "*" + _PENDING_SUFFIX))):
+        pending_ids = _read_archive_ids(pending_path)
+        still_in_db = pending_ids and db.session.execute(
+            select(table.c.id).where(table.c.id.in_(pending_ids)).limit(1)
+        ).first()
+        if still_in_db or not pending_ids:
+            os.remove(pending_path)
+            continue
+        file_path = pending_path[: -len(_PENDING_SUFFIX)]
+        _append_archive(file_path, pending_path, skip_ids=_read_archive_ids(file_path) or None)
+
+
+def _archive_table(model, cutoff, archive_dir, batch_size, *, extra_filters=(), transform=None) -> int:
+    """
+    한 테이블의 cutoff 이전 row를 id keyset으로 batch_size씩 읽어 삭제(extra_filters 재확인)하고,
+    실제로 지워진 row만 날짜별 pending 파일에 쓴 뒤 커밋하고 날짜 파일에 붙인다.
+    """
+    table = model.__table__
+    table_dir = os.path.join(archive_dir, table.name)
+    os.makedirs(table_dir, exist_ok=True)
+    _recover_pending(table, table_dir)
+
+    archived = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.session.execute(
+                select(table)
+                .where(table.c.created_at < cutoff, table.c.id > last_id, *extra_filters)
+                .order_by(table.c.id.asc())
+                .limit(batch_size)
+            )
+            .mappings()
+            .all()
+        )
+        if not rows:
+            break
+
+        if transform is not None:
+            rows = transform(rows)
+
+        ids = [r["id"] for r in rows]
+        staged = []
+        try:
+            # 고른 뒤 동시 요청이 row를 다시 참조했을 수 있으므로(설문/스냅샷 재사용)
+            # 삭제에도 같은 조건을 걸고, 실제로 지워진 row만 아카이브한다.
+            db.session.execute(delete(table).where(table.c.id.in_(ids), *extra_filters))
+            if extra_filters:
+                kept = set(
+                    db.session.execute(select(table.c.id).where(table.c.id.in_(ids))).scalars()
+                )
+                rows = [r for r in rows if r["id"] not in kept]
+
+            by_day = defaultdict(list)
+            for r in rows:
+                by_day[_partition_date(r["created_at"])].append(r)
+
+            for day, day_rows in sorted(by_day.items()):
+                file_path = os.path.join(table_dir, f"{day.isoformat()}.ndjson.gz")
+                pending_path = file_path + _PENDING_SUFFIX
+                with gzip.open(pending_path, "wt", encoding="utf-8") as f:
+                    for r in day_rows:
+                        f.write(json.dumps(dict(r), ensure_ascii=False, default=_json_default))
+                        f.write("\n")
+                staged.append((file_path, pending_path))
+                _bump_rollup(table.name, day, day_rows, file_path)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for _, pending_path in staged:
+                os.remove(pending_path)
+            raise
+
+        # 커밋된 batch만 날짜 파일로 (gzip 리더는 이어 붙인 여러 멤버를 그대로 읽는다)
+        for file_path, pending_path in staged:
+            _append_archive(file_path, pending_path)
+
+        archived += len(rows)
+        last_id = ids[-1]
+
+    return archived
+
+
+def _delete_orphan_snapshots(cutoff, batch_size) -> int:
+    """
+    어떤 로그에서도 참조하지 않는 오래된 프로필 스냅샷 삭제.
+    """
+    log = RecommendationLog
+    # OR 한 번 대신 NOT EXISTS 두 개 → 각각 스냅샷 id 인덱스로 찾는다. (후보는 created_at 인덱스 순서로)
+    unreferenced = (
+        ~exists().where(log.hand_profile_snapshot_id == ProfileSnapshot.id),
+        ~exists().where(log.style_profile_snapshot_id == ProfileSnapshot.id),
+    )
+
+    deleted = 0
+    while True:
+        ids = (
+            db.session.execute(
+                select(ProfileSnapshot.id)
+                .where(ProfileSnapshot.created_at < cutoff, *unreferenced)
+                .order_by(ProfileSnapshot.created_at.asc(), ProfileSnapshot.id.asc())
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+        # 그 사이 새 로그가 같은 스냅샷(content_hash)을 재사용했을 수 있으므로 삭제에도 같은 조건
+        result = db.session.execute(
+            delete(ProfileSnapshot).where(ProfileSnapshot.id.in_(ids), *unreferenced)
+        )
+        db.session.commit()
+        deleted += result.rowcount
+    return deleted
+
+
+def archive_old_history(
+    *,
+    max_age_days: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    보존기간이 지난 이력을 아카이브하고 hot 테이블에서 삭제한다.
+
+    - 로그를 먼저 옮긴 뒤, 남은 로그가 참조하지 않는 hand_metrics / survey_responses만 옮긴다.
+      (설문은 내용 해시로 재사용되므로 최근 로그가 참조 중일 수 있다)
+    - 반환: {테이블명: 아카이브된 row 수}
+    """
+    max_age_days = DEFAULT_RETENTION_DAYS if max_age_days is None else max_age_days
+    archive_dir = archive_dir or DEFAULT_ARCHIVE_DIR
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    # created_at(server_default=now())과 같은 시계로 비교해야 MariaDB time_zone이 UTC가 아니어도 맞는다.
+    cutoff = (now or db_now()) - timedelta(days=max_age_days)
+
+    log = RecommendationLog
+    summary = {}
+
+    summary[log.__tablename__] = _archive_table(
+        log, cutoff, archive_dir, batch_size, transform=_embed_profile_snapshots
+    )
+    summary[HandMetrics.__tablename__] = _archive_table(
+        HandMetrics,
+        cutoff,
+        archive_dir,
+        batch_size,
+        extra_filters=(~exists().where(log.hand_metrics_id == HandMetrics.id),),
+    )
+    summary[SurveyResponse.__tablename__] = _archive_table(
+        SurveyResponse,
+        cutoff,
+        archive_dir,
+        batch_size,
+        extra_filters=(~exists().where(log.survey_response_id == SurveyResponse.id),),
+    )
+    summary[ProfileSnapshot.__tablename__] = _delete_orphan_snapshots(cutoff, batch_size)
+
+    # Core delete는 mapper 이벤트를 거치지 않으므로 프로필 캐시를 직접 비운다.
+    invalidate_profile_cache()
+    return summary
+
+
+def compact_database():
+    """
+    삭제 후 파일 크기를 실제로 줄이기 위한 정리 (SQLite: VACUUM, 그 외: 생략).
+    VACUUM은 DB 전체 락을 잡으므로 트래픽이 적은 시간에만 실행할 것.
+    """
+    if db.engine.dialect.name != "sqlite":
+        return False
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+    return True
@@ -231,7 +231,8 @@ document.addEventListener("DOMContentLoaded", () => {
   async function handleLoadAllRackets() {
     try {
       setAdminStatus("DB 라켓 목록 조회 중...");
-      const res = await fetch("/admin/rackets");
+      // 항상 재검증: 카탈로그가 그대로면 서버가 304를 주고 브라우저 캐시 본문을 쓴다.
+      const res = await fetch("/admin/rackets", { cache: "no-cache" });
       if (!res.ok) {
         const text = await res.text();
         setAdminStatus(`조회 실패: ${res.status} ${text}`, true);
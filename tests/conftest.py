@@ -0,0 +1,96 @@
+# tests/conftest.py
+
+"""
+pytest 공통 fixture.
+
+- app 모듈 import 전에 DB / 공유 파일 경로를 임시 디렉터리로 돌린다.
+- 테스트마다 reset_db()로 스키마를 새로 만들고 라켓 카탈로그를 채운다.
+- fake_analyze_hand : 손 분석을 고정 결과로 바꿔 사진 없이 스캔 경로를 실행한다.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="hand-analyzer-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_TMP_DIR, "test.db")
+os.environ["ADMISSION_MODE"] = "off"
+os.environ["CATALOG_MATRIX_DIR"] = os.path.join(_TMP_DIR, "catalog")
+os.environ["HISTORY_ARCHIVE_DIR"] = os.path.join(_TMP_DIR, "archive")
+os.environ["PROFILE_DIR"] = os.path.join(_TMP_DIR, "profiles")
+os.environ.pop("READ_DATABASE_URL", None)
+os.environ.pop("METRICS_DIR", None)
+
+from app import app as flask_app  # noqa: E402
+from db_config import db, reset_db, Racket  # noqa: E402
+from services.catalog_service import bump_catalog_version, invalidate_catalog_cache  # noqa: E402
+from services.cohort_service import rebuild_histograms  # noqa: E402
+from services.profile_cache import invalidate_profile_cache  # noqa: E402
+
+# 스캔 업로드용 최소 PNG (시그니처 + IHDR 헤더)
+PNG_BYTES = (
+    b"\x89PNG\r\n\x1a\n"
+    b"\x00\x00\x00\x0dIHDR"
+    b"\x00\x00\x00\x64\x00\x00\x00\x64"
+    b"\x08\x02\x00\x00\x00"
+)
+
+HAND_RESULT = {
+    "handLength": 720.0,
+    "handWidth": 330.0,
+    "handLengthMm": 180.0,
+    "handWidthMm": 82.5,
+    "handSizeCategory": "MEDIUM",
+    "fingerRatios": [0.95, 1.0],
+}
+
+
+@pytest.fixture(scope="session")
+def app():
+    flask_app.config["TESTING"] = True
+    yield flask_app
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def fresh_db(app):
+    with app.app_context():
+        reset_db()
+        db.session.add_all(
+            Racket(
+                name=f"Racket {i}",
+                brand="Test",
+                power=5 + i % 3,
+                control=5,
+                spin=4 + i % 4,
+                head_size_sq_in=98 + i % 3 * 2,
+                unstrung_weight_g=280 + i * 3,
+            )
+            for i in range(12)
+        )
+        bump_catalog_version()
+        db.session.commit()
+        invalidate_catalog_cache()
+        rebuild_histograms()  # 이전 테스트의 코호트 분포/증분을 비운다
+    invalidate_profile_cache()
+    yield
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def fake_analyze_hand(monkeypatch):
+    import api.hand
+    import services.recommend_service
+
+    def analyze(*args, **kwargs):
+        return dict(HAND_RESULT)
+
+    monkeypatch.setattr(api.hand, "analyze_hand", analyze)
+    monkeypatch.setattr(services.recommend_service, "analyze_hand", analyze)
+    return analyze
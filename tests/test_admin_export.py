@@ -0,0 +1,20 @@
+# tests/test_admin_export.py
+
+"""
+/admin/export: 잘못된 기간 값은 전체 export 대신 400.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("query", ["since=2024-13-01", "until=yesterday", "since=2024-01-01&until=2024/02/01"])
+def test_bad_period_is_rejected(client, query):
+    resp = client.get(f"/admin/export/recommendations?{query}")
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+
+
+def test_valid_period_streams(client):
+    resp = client.get("/admin/export/recommendations?since=2024-01-01&until=2024-02-01T00:00:00")
+    assert resp.status_code == 200
+    assert resp.get_data(as_text=True) == ""
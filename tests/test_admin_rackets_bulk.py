@@ -0,0 +1,59 @@
+# tests/test_admin_rackets_bulk.py
+
+"""
+/admin/rackets/bulk: (brand, name) 유니크 인덱스와 동시 import 충돌 시 row별 409.
+"""
+
+from sqlalchemy import func, inspect, select
+
+from db_config import Racket, db
+
+
+def test_brand_name_index_is_unique(app):
+    with app.app_context():
+        indexes = {ix["name"]: ix for ix in inspect(db.engine).get_indexes("rackets")}
+    assert indexes["uq_rackets_brand_name"]["unique"]
+    assert "ix_rackets_brand_name" not in indexes
+
+
+def test_upsert_inserts_and_updates(client, app):
+    resp = client.post(
+        "/admin/rackets/bulk",
+        json=[{"brand": "Test", "name": "Racket 0", "power": 9}, {"brand": "New", "name": "One"}],
+    )
+    assert resp.status_code == 200
+    assert resp.get_json() == {"status": "ok", "inserted": 1, "updated": 1}
+
+
+def test_concurrent_insert_reports_conflicting_rows(client, app, monkeypatch):
+    """(brand, name) 조회 직후 다른 요청이 같은 라켓을 먼저 넣은 경우"""
+    original = db.session.execute
+    calls = []
+
+    def execute(statement, *args, **kwargs):
+        result = original(statement, *args, **kwargs)
+        calls.append(statement)
+        if len(calls) == 1:  # existing (brand, name) 조회
+            rows = result.all()
+            db.session.add(Racket(brand="New", name="Two"))
+            db.session.commit()
+            return rows
+        return result
+
+    with app.app_context():
+        monkeypatch.setattr(db.session, "execute", execute)
+        resp = client.post(
+            "/admin/rackets/bulk",
+            json=[{"brand": "New", "name": "One"}, {"brand": "New", "name": "Two"}],
+        )
+        monkeypatch.undo()
+
+        assert resp.status_code == 409
+        body = resp.get_json()
+        assert [r["row"] for r in body["rows"]] == [1]
+
+        # 전체 롤백: 충돌 없는 row도 들어가지 않는다
+        count = db.session.execute(
+            select(func.count()).select_from(Racket).where(Racket.brand == "New")
+        ).scalar()
+        assert count == 1
@@ -0,0 +1,118 @@
+# tests/test_admission.py
+
+"""
+/scan-hand 입장 제어: 클라이언트별 토큰 버킷 429, 처리 후 슬롯 반납, 죽은 워커 슬롯 회수.
+"""
+
+import io
+import subprocess
+import sys
+
+import pytest
+
+import api.hand
+from conftest import HAND_RESULT, PNG_BYTES
+from utils.admission import (
+    SLOT_TTL_SEC,
+    AdmissionController,
+    LocalAdmissionStore,
+    SqliteAdmissionStore,
+    init_admission,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _scan(client):
+    data = {"file": (io.BytesIO(PNG_BYTES), "hand.png")}
+    return client.post("/scan-hand", data=data, content_type="multipart/form-data")
+
+
+@pytest.fixture
+def admission(app, tmp_path):
+    """sqlite 모드 컨트롤러를 앱에 건다 (conftest는 ADMISSION_MODE=off)"""
+
+    def install(rate_per_min=60.0, burst=2, max_inflight=1):
+        store = SqliteAdmissionStore(str(tmp_path / "admission.db"))
+        controller = AdmissionController(store, {"scan": (rate_per_min, burst, max_inflight)})
+        init_admission(app, controller)
+        return controller
+
+    yield install
+    init_admission(app)  # ADMISSION_MODE=off → 다시 끄기
+
+
+def test_rate_limit_returns_429(client, admission, fake_analyze_hand):
+    admission(rate_per_min=1.0, burst=2, max_inflight=5)
+
+    assert _scan(client).status_code == 200
+    assert _scan(client).status_code == 200
+    resp = _scan(client)
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+
+
+def test_slot_is_held_during_scan_and_released_after(client, admission, monkeypatch):
+    controller = admission(rate_per_min=600.0, burst=10, max_inflight=1)
+    seen = []
+
+    def analyze(*args, **kwargs):
+        # 처리 중에는 자리가 없어 다른 클라이언트는 바로 503
+        seen.append(controller.inflight("scan"))
+        seen.append(controller.admit("scan", "ip:other")[1])
+        return dict(HAND_RESULT)
+
+    monkeypatch.setattr(api.hand, "analyze_hand", analyze)
+
+    for _ in range(3):
+        assert _scan(client).status_code == 200
+        assert controller.inflight("scan") == 0
+
+    assert seen[0] == 1
+    assert seen[1][0] == 503
+
+
+def test_local_bucket_refills_over_time():
+    clock = FakeClock()
+    store = LocalAdmissionStore(clock=clock)
+
+    assert store.take("scan:a", rate=1.0, burst=1)[0]
+    allowed, retry_after = store.take("scan:a", rate=1.0, burst=1)
+    assert not allowed and retry_after == pytest.approx(1.0)
+    assert store.take("scan:b", rate=1.0, burst=1)[0]  # 클라이언트마다 따로
+
+    clock.now += 1.0
+    assert store.take("scan:a", rate=1.0, burst=1)[0]
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_full_slots_reap_dead_and_stale_workers(tmp_path):
+    clock = FakeClock()
+    store = SqliteAdmissionStore(str(tmp_path / "admission.db"), clock=clock)
+
+    assert store.acquire_slot("scan", 2) is not None
+    assert store.acquire_slot("scan", 2) is not None
+    assert store.acquire_slot("scan", 2) is None
+
+    # 반납하지 못하고 죽은 워커의 슬롯
+    store._conn().execute("UPDATE admission_slots SET pid = ?", (_dead_pid(),))
+    assert store.acquire_slot("scan", 2) is not None
+    assert store.inflight("scan") == 1
+
+    # 살아 있는 프로세스라도 SLOT_TTL_SEC가 지난 슬롯은 회수
+    assert store.acquire_slot("scan", 2) is not None
+    assert store.acquire_slot("scan", 2) is None
+    clock.now += SLOT_TTL_SEC + 1
+    assert store.acquire_slot("scan", 2) is not None
+    assert store.inflight("scan") == 1
@@ -0,0 +1,78 @@
+# tests/test_analytics_service.py
+
+"""
+추천 롤업: 요청 때 누적한 값과 로그로부터 rebuild한 값이 같은 날짜(DB 시계)로 묶이는지.
+"""
+
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+import services.analytics_service as analytics_service
+from db_config import db, RecommendationLog, RecommendationRollup
+
+SURVEY = {"level": "advanced", "styles": ["spin"]}
+
+
+def _rollups():
+    r = RecommendationRollup
+    rows = db.session.execute(
+        select(r.day, r.racket_id, r.rank_bucket, r.hand_size_category, r.level, r.recommend_count)
+    ).all()
+    return sorted(tuple(row) for row in rows)
+
+
+def test_recorded_rollups_match_rebuild(app, client):
+    for i in range(3):
+        resp = client.post("/recommend-rackets", json={"handLengthMm": 175 + i, "survey": SURVEY})
+        assert resp.status_code == 200
+
+    with app.app_context():
+        recorded = _rollups()
+        assert recorded
+        analytics_service.rebuild_recommendation_rollups(date(2000, 1, 1))
+        assert _rollups() == recorded
+
+
+def test_recorded_day_comes_from_db_clock(app, monkeypatch):
+    monkeypatch.setattr(analytics_service, "db_now", lambda: datetime(2001, 2, 3, 23, 59))
+
+    with app.app_context():
+        analytics_service.record_recommendation_rollups(
+            hand_profile={"handSizeCategory": "MEDIUM"},
+            style_profile={"level": "advanced"},
+            racket_candidates=[{"id": 1, "score": 80.0}],
+        )
+        db.session.commit()
+        assert [row[0] for row in _rollups()] == [date(2001, 2, 3)]
+
+
+def test_rebuild_reads_cohort_from_legacy_json_logs(app):
+    with app.app_context():
+        db.session.add(
+            RecommendationLog(
+                racket_id=1,
+                rank_in_result=1,
+                recommendation_score=70.0,
+                hand_profile_json=json.dumps({"handSizeCategory": "LARGE"}),
+                style_profile_json=json.dumps({"level": "expert"}),
+            )
+        )
+        db.session.commit()
+
+        assert analytics_service.rebuild_recommendation_rollups(date(2000, 1, 1)) == 1
+        assert [row[1:] for row in _rollups()] == [(1, "1", "LARGE", "expert", 1)]
+
+
+def test_rebuild_reads_logs_in_batches(app, client, monkeypatch):
+    monkeypatch.setattr(analytics_service, "_REBUILD_BATCH", 2)
+    for i in range(3):
+        resp = client.post("/recommend-rackets", json={"handLengthMm": 175 + i, "survey": SURVEY})
+        assert resp.status_code == 200
+
+    with app.app_context():
+        recorded = _rollups()
+        total = analytics_service.rebuild_recommendation_rollups(date(2000, 1, 1))
+        assert total == sum(row[-1] for row in recorded)
+        assert _rollups() == recorded
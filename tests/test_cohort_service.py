@@ -0,0 +1,123 @@
+# tests/test_cohort_service.py
+
+"""
+cohort_service: flush 중 DB I/O가 백분위 조회를 막지 않는지, 쉬는 워커의 증분도 flush 되는지.
+"""
+
+import json
+import threading
+import time
+
+from sqlalchemy import update
+
+import services.cohort_service as cohort_service
+from db_config import db, MetricHistogram
+
+
+def test_percentiles_do_not_wait_for_flush_io(app, monkeypatch):
+    writing = threading.Event()
+    release = threading.Event()
+    write_pending = cohort_service._write_pending
+
+    def slow_write(pending, generation):
+        writing.set()
+        release.wait(2.0)
+        write_pending(pending, generation)
+
+    monkeypatch.setattr(cohort_service, "_write_pending", slow_write)
+
+    with app.app_context():
+        cohort_service.record_hand_metrics(180.0, 82.0, [0.95, 1.0])
+
+    def flush():
+        with app.app_context():
+            cohort_service.flush_pending()
+
+    flusher = threading.Thread(target=flush)
+    flusher.start()
+    assert writing.wait(2.0)
+
+    started = time.monotonic()
+    with app.app_context():
+        cohort_service.cohort_percentiles(181.0, 83.0, [0.95, 1.0])
+        cohort_service.record_hand_metrics(175.0, 80.0, [0.9, 1.0])
+    assert time.monotonic() - started < 1.0
+
+    release.set()
+    flusher.join(2.0)
+
+    with app.app_context():
+        cohort_service.flush_pending()
+        row = db.session.get(MetricHistogram, "handLengthMm")
+        assert row.total == 2
+
+
+def test_idle_worker_flushes_stale_pending(app, monkeypatch):
+    monkeypatch.setattr(cohort_service, "FLUSH_EVERY", 1000)
+
+    with app.app_context():
+        cohort_service.record_hand_metrics(180.0, 82.0, [0.95, 1.0])
+        assert db.session.get(MetricHistogram, "handLengthMm").total == 0
+
+        # 이후 요청이 없어도 백그라운드 스레드의 tick이 flush 한다 (여기서는 tick을 직접 실행)
+        monkeypatch.setattr(cohort_service, "FLUSH_INTERVAL_SEC", 0.0)
+        cohort_service.flush_if_stale(app)
+        db.session.remove()
+        row = db.session.get(MetricHistogram, "handLengthMm")
+        assert row is not None and row.total == 1
+
+
+def test_cold_load_does_not_hold_the_lock(app, monkeypatch):
+    loading = threading.Event()
+    release = threading.Event()
+    load_from_db = cohort_service._load_from_db
+
+    def slow_load():
+        loading.set()
+        release.wait(2.0)
+        return load_from_db()
+
+    monkeypatch.setattr(cohort_service, "_load_from_db", slow_load)
+    monkeypatch.setitem(cohort_service._state, "loaded", False)
+
+    def lookup():
+        with app.app_context():
+            cohort_service.cohort_percentiles(180.0, 82.0, [0.95, 1.0])
+
+    loader = threading.Thread(target=lookup)
+    loader.start()
+    assert loading.wait(2.0)
+
+    acquired = cohort_service._lock.acquire(timeout=0.5)
+    if acquired:
+        cohort_service._lock.release()
+    release.set()
+    loader.join(2.0)
+    assert acquired
+
+
+def test_pending_from_before_another_workers_rebuild_is_dropped(app, monkeypatch):
+    monkeypatch.setattr(cohort_service, "FLUSH_EVERY", 1000)
+
+    with app.app_context():
+        cohort_service.record_hand_metrics(180.0, 82.0, [0.95, 1.0])
+
+        # 다른 워커가 rebuild: 이 워커의 측정값(hand_metrics row)까지 포함해 새 세대로 기록
+        rebuilt = cohort_service.FixedBinHistogram(*cohort_service.METRIC_BINS["handLengthMm"])
+        rebuilt.add(180.0)
+        db.session.execute(
+            update(MetricHistogram).values(
+                generation=MetricHistogram.generation + 1,
+                counts_json=json.dumps(rebuilt.counts),
+                total=rebuilt.total,
+            )
+        )
+        db.session.commit()
+
+        cohort_service.flush_pending()
+        assert db.session.get(MetricHistogram, "handLengthMm").total == 1
+
+        # 새 세대 기준으로 쌓인 증분은 그대로 더해진다
+        cohort_service.record_hand_metrics(181.0, 82.0, [0.95, 1.0])
+        cohort_service.flush_pending()
+        assert db.session.get(MetricHistogram, "handLengthMm").total == 2
@@ -0,0 +1,58 @@
+# tests/test_history_service.py
+
+"""
+history_service: 같은 설문/프로필은 한 row를 재사용하고,
+그렇게 공유된 row는 최근 로그가 참조하는 동안 아카이브되지 않는지.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+
+from db_config import db, ProfileSnapshot, RecommendationLog, SurveyResponse
+from services.retention_service import archive_old_history
+
+SURVEY = {"level": "advanced", "styles": ["spin"]}
+
+
+def _count(model):
+    return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+
+def _recommend(client, hand_length_mm=180):
+    resp = client.post("/recommend-rackets", json={"handLengthMm": hand_length_mm, "survey": SURVEY})
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+
+
+def test_same_payload_is_stored_once(app, client):
+    _recommend(client)
+    _recommend(client)
+    _recommend(client, hand_length_mm=181)  # 손 프로필만 다름
+
+    with app.app_context():
+        assert _count(RecommendationLog) > 0
+        assert _count(SurveyResponse) == 1
+        kinds = db.session.execute(select(ProfileSnapshot.kind)).scalars().all()
+        assert sorted(kinds) == ["hand", "hand", "style"]
+
+
+def test_shared_rows_referenced_by_recent_logs_are_not_archived(app, client, tmp_path):
+    _recommend(client)
+    with app.app_context():
+        # 첫 요청의 로그/설문/스냅샷을 보존기간 밖으로
+        old = datetime(2000, 1, 1)
+        for model in (RecommendationLog, SurveyResponse, ProfileSnapshot):
+            db.session.execute(update(model).values(created_at=old))
+        db.session.commit()
+
+    _recommend(client)  # 같은 설문/프로필 → 오래된 row 재사용
+
+    with app.app_context():
+        summary = archive_old_history(archive_dir=str(tmp_path), max_age_days=30)
+
+        assert summary["recommendation_logs"] > 0
+        assert summary["survey_responses"] == 0
+        assert summary["profile_snapshots"] == 0
+        assert _count(SurveyResponse) == 1
+        assert _count(ProfileSnapshot) == 2
+        assert _count(RecommendationLog) == summary["recommendation_logs"]
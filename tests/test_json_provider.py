@@ -0,0 +1,37 @@
+# tests/test_json_provider.py
+
+"""
+JSON 텍스트 컬럼: 깨진 row가 있어도 admin 목록 응답은 올바른 JSON이어야 한다.
+"""
+
+import json
+
+from db_config import db, HandMetrics, SurveyResponse
+from utils.json_provider import json_column
+
+
+def test_json_column_falls_back_to_default():
+    assert json_column('[0.9, 1.0]', []) == [0.9, 1.0]
+    assert json_column("[0.9,", []) == []
+    assert json_column(None, []) == []
+
+
+def test_corrupt_json_rows_do_not_break_listings(app, client):
+    with app.app_context():
+        db.session.add(
+            HandMetrics(
+                hand_length_mm=180.0,
+                hand_width_mm=82.0,
+                hand_length_score=50.0,
+                hand_width_score=50.0,
+                hand_size_category="MEDIUM",
+                finger_ratios_json="[0.95,",
+            )
+        )
+        db.session.add(SurveyResponse(level="advanced", styles_json="{broken", payload_hash="x"))
+        db.session.commit()
+
+    hand = json.loads(client.get("/admin/hand-metrics").get_data(as_text=True))
+    assert hand["items"][0]["fingerRatios"] == []
+    surveys = json.loads(client.get("/admin/surveys").get_data(as_text=True))
+    assert surveys["items"][0]["styles"] == []
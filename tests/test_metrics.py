@@ -0,0 +1,59 @@
+# tests/test_metrics.py
+
+"""
+METRICS_DIR 워커 간 합산: 죽은/오래된 워커 파일은 빼고, 종료한 워커는 자기 파일을 지운다.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import utils.metrics as metrics
+
+KEY = ("test_dump_total", ())
+
+
+def _write_dump(directory, pid, value, age_sec=0.0):
+    path = directory / f"metrics-{pid}.json"
+    path.write_text(json.dumps([[KEY[0], [], [value]]]))
+    if age_sec:
+        stamp = time.time() - age_sec
+        os.utime(path, (stamp, stamp))
+    return path
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_collect_skips_dead_and_stale_dumps(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "METRICS_STALE_SEC", 15.0)
+
+    _write_dump(tmp_path, os.getppid(), 1.0)
+    _write_dump(tmp_path, 1, 10.0, age_sec=60.0)
+    dead = _write_dump(tmp_path, _dead_pid(), 100.0)
+
+    total = metrics._collect_all_processes()
+
+    assert total[KEY] == [1.0]
+    assert not dead.exists()
+
+
+def test_remove_process_dump_stops_further_dumps(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_removed_pid", None)
+    own = tmp_path / f"metrics-{os.getpid()}.json"
+
+    metrics.dump_process_metrics(force=True)
+    assert own.exists()
+
+    metrics.remove_process_dump()
+    assert not own.exists()
+
+    metrics.dump_process_metrics(force=True)
+    assert not own.exists()
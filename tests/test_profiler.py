@@ -0,0 +1,33 @@
+# tests/test_profiler.py
+
+"""
+느린 요청 스택 샘플: 요청이 기다리는 executor 스레드(손 분석 추론)의 스택도 같이 찍히는지.
+"""
+
+import threading
+import time
+
+import utils.profiler as profiler
+from utils.executors import inference_executor
+
+
+def _busy_inference(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return True
+
+
+def test_sampler_includes_executor_thread_of_request(monkeypatch):
+    sampler = profiler._StackSampler(0.002)
+    monkeypatch.setattr(profiler, "_sampler", sampler)
+
+    owner_id = threading.get_ident()
+    sampler.start(owner_id)
+    assert inference_executor().submit(_busy_inference, 0.2).result()
+    stacks = sampler.stop(owner_id)
+
+    helper = [s for s in stacks if s.startswith("[inference") and "_busy_inference" in s]
+    assert helper
+    # 요청 스레드 자신은 future.result()에서 기다리는 스택
+    assert any(not s.startswith("[") for s in stacks)
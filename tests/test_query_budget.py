@@ -0,0 +1,62 @@
+# tests/test_query_budget.py
+
+"""
+admin keyset 목록 API의 쿼리 수가 이력 row 수(N)와 무관하게 고정인지 확인한다.
+(row별 lazy load가 생기면 N에 비례해 늘어난다)
+"""
+
+import pytest
+from sqlalchemy import select
+
+from db_config import db, HandMetrics, SurveyResponse, RecommendationLog, Racket
+from utils.query_plan import capture_statements
+
+LISTINGS = ["/admin/recommendations", "/admin/hand-metrics", "/admin/surveys"]
+
+
+def _seed_logs(app, n):
+    with app.app_context():
+        racket_ids = db.session.execute(select(Racket.id)).scalars().all()
+        for i in range(n):
+            hm = HandMetrics(
+                hand_length_mm=170.0 + i % 30,
+                hand_width_mm=80.0,
+                hand_length_score=50.0,
+                hand_width_score=50.0,
+                hand_size_category="MEDIUM",
+                finger_ratios_json="[0.95, 1.0]",
+            )
+            sr = SurveyResponse(level="advanced", styles_json='["spin"]', payload_hash=f"seed-{i}")
+            log = RecommendationLog(
+                hand_metrics=hm,
+                survey_response=sr,
+                racket_id=racket_ids[i % len(racket_ids)],
+                recommendation_score=80.0,
+                rank_in_result=1,
+            )
+            db.session.add_all([hm, sr, log])
+        db.session.commit()
+
+
+def _query_count(client, url):
+    with capture_statements() as statements:
+        resp = client.get(url)
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return len(statements), resp.get_json()
+
+
+@pytest.mark.parametrize("n", [3, 60])
+@pytest.mark.parametrize("url", LISTINGS)
+def test_keyset_listing_query_count_is_constant(app, client, url, n):
+    _seed_logs(app, n)
+
+    count, body = _query_count(client, f"{url}?limit=200")
+    assert len(body["items"]) == n
+    assert count == 1
+
+    # 다음 페이지(cursor)도 같은 한 쿼리
+    count, body = _query_count(client, f"{url}?limit=2")
+    assert count == 1
+    count, body = _query_count(client, f"{url}?limit=200&cursor={body['nextCursor']}")
+    assert len(body["items"]) == n - 2
+    assert count == 1
@@ -0,0 +1,86 @@
+# tests/test_query_plans.py
+
+"""
+엔드포인트/배치 작업이 실제로 실행한 SQL을 모아 EXPLAIN QUERY PLAN으로 확인한다.
+이력 테이블(utils.query_plan.LARGE_TABLES)을 SCAN하는 문장이 하나라도 있으면 실패.
+"""
+
+import io
+import json
+from datetime import date
+
+from conftest import PNG_BYTES
+from db_config import db
+from services.analytics_service import rebuild_recommendation_rollups
+from services.cohort_service import rebuild_histograms
+from services.retention_service import archive_old_history
+from utils.query_plan import capture_statements, find_full_scans
+
+SURVEY = {"level": "advanced", "styles": ["spin"]}
+
+ADMIN_GETS = [
+    "/admin/hand-metrics",
+    "/admin/surveys",
+    "/admin/recommendations",
+    "/admin/hand-metrics?cursor=3",
+    "/admin/surveys?cursor=3",
+    "/admin/recommendations?cursor=5",
+    "/admin/export/recommendations?since=2000-01-01&until=2100-01-01",
+    "/admin/export/hand-metrics?since=2000-01-01&format=csv",
+    "/admin/export/surveys",
+    "/admin/export/recommendations?format=csv",
+    "/admin/analytics/top-rackets",
+    "/admin/analytics/breakdown/day",
+    "/admin/analytics/breakdown/cohort?racketId=1&since=2000-01-01",
+    "/admin/archive-rollups",
+    "/admin/rackets",
+    "/rackets",
+    "/readyz",
+]
+
+
+def _scan(client, url, **form):
+    data = {"file": (io.BytesIO(PNG_BYTES), "hand.png"), **form}
+    return client.post(url, data=data, content_type="multipart/form-data")
+
+
+def _exercise(app, client, tmp_path):
+    for i in range(3):
+        resp = client.post("/recommend-rackets", json={"handLengthMm": 180 + i, "survey": SURVEY})
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    resp = _scan(client, "/scan-hand")
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    resp = _scan(client, "/scan-and-recommend", survey=json.dumps({"level": "beginner"}))
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    resp = client.post("/recommend-rackets", json={"handMetricsId": 1, "surveyResponseId": 1})
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    resp = client.post(
+        "/recommend-rackets/sweep",
+        json={"handLengthMm": 180, "survey": SURVEY, "vary": {"level": ["beginner", "advanced"]}},
+    )
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    for url in ADMIN_GETS:
+        resp = client.get(url)
+        assert resp.status_code == 200, (url, resp.get_data(as_text=True))
+        resp.get_data()  # 스트리밍 응답(export)도 끝까지 실행
+
+    with app.app_context():
+        archive_old_history(archive_dir=str(tmp_path), max_age_days=1)
+        rebuild_recommendation_rollups(date(2000, 1, 1))
+        rebuild_histograms()
+
+
+def test_history_tables_are_never_scanned(app, client, fake_analyze_hand, tmp_path):
+    with capture_statements() as statements:
+        _exercise(app, client, tmp_path)
+
+    assert statements
+
+    with app.app_context():
+        failures = find_full_scans(db.session.connection(), statements)
+
+    report = "\n".join(f"{' / '.join(plan)}\n    {' '.join(sql.split())}" for sql, plan in failures.items())
+    assert not failures, "이력 테이블 풀스캔:\n" + report
@@ -0,0 +1,129 @@
+# tests/test_retention_service.py
+
+"""
+retention_service: 보존기간 아카이브가 동시에 재사용된 row를 지우지 않는지,
+실제로 지운 row만 아카이브 파일에 남기는지, 지난 실행의 pending 파일을 중복 없이 복구하는지.
+"""
+
+import gzip
+import json
+from datetime import datetime
+
+from sqlalchemy import exists, select
+
+import services.retention_service as retention_service
+from db_config import db, ProfileSnapshot, RecommendationLog, SurveyResponse
+from services.profile_cache import style_profiles
+
+OLD = datetime(2000, 1, 1)
+
+
+def _archived_ids(archive_dir, table):
+    ids = []
+    for path in sorted((archive_dir / table).glob("*.ndjson.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            ids.extend(json.loads(line)["id"] for line in f if line.strip())
+    return ids
+
+
+def _old_survey(payload_hash):
+    sr = SurveyResponse(level="advanced", styles_json="[]", payload_hash=payload_hash, created_at=OLD)
+    db.session.add(sr)
+    return sr
+
+
+def test_row_reused_after_selection_is_kept(app, tmp_path):
+    with app.app_context():
+        reused, orphan = _old_survey("reused"), _old_survey("orphan")
+        db.session.commit()
+        reused_id, orphan_id = reused.id, orphan.id
+
+        def reuse_between_select_and_delete(rows):
+            # 아카이브가 후보를 고른 직후 /recommend-rackets가 같은 설문을 재사용한 상황
+            db.session.add(RecommendationLog(racket_id=1, survey_response_id=reused_id))
+            db.session.flush()
+            return rows
+
+        log = RecommendationLog
+        archived = retention_service._archive_table(
+            SurveyResponse,
+            datetime(2001, 1, 1),
+            str(tmp_path),
+            100,
+            extra_filters=(~exists().where(log.survey_response_id == SurveyResponse.id),),
+            transform=reuse_between_select_and_delete,
+        )
+
+        assert archived == 1
+        assert _archived_ids(tmp_path, "survey_responses") == [orphan_id]
+        remaining = db.session.execute(select(SurveyResponse.id)).scalars().all()
+        assert remaining == [reused_id]
+
+
+def test_orphan_snapshot_reused_after_selection_is_kept(app, monkeypatch):
+    with app.app_context():
+        snap = ProfileSnapshot(kind="hand", content_hash="h", payload_json="{}", created_at=OLD)
+        db.session.add(snap)
+        db.session.commit()
+        snap_id = snap.id
+
+        execute = db.session.execute
+
+        def execute_then_reuse(stmt, *args, **kwargs):
+            result = execute(stmt, *args, **kwargs)
+            if getattr(stmt, "is_select", False) and ProfileSnapshot.__table__ in stmt.get_final_froms():
+                db.session.add(RecommendationLog(racket_id=1, hand_profile_snapshot_id=snap_id))
+                db.session.flush()
+            return result
+
+        monkeypatch.setattr(db.session, "execute", execute_then_reuse)
+        deleted = retention_service._delete_orphan_snapshots(datetime(2001, 1, 1), 100)
+        monkeypatch.undo()
+
+        assert deleted == 0
+        assert db.session.get(ProfileSnapshot, snap_id) is not None
+
+
+def test_archive_clears_profile_cache(app, tmp_path):
+    style_profiles.put(1, {"level": "advanced"})
+    with app.app_context():
+        retention_service.archive_old_history(archive_dir=str(tmp_path), max_age_days=1)
+    assert style_profiles.get(1) is None
+
+
+def _write_archive(path, ids):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for row_id in ids:
+            f.write(json.dumps({"id": row_id}) + "\n")
+
+
+def test_pending_for_rows_still_in_db_is_discarded(app, tmp_path):
+    """삭제 커밋 전에 멈춘 실행의 pending → 버리고 이번 실행이 한 번만 다시 아카이브"""
+    with app.app_context():
+        sr = _old_survey("pending")
+        db.session.commit()
+        sr_id = sr.id
+        pending = tmp_path / "survey_responses" / "2000-01-01.ndjson.gz.pending"
+        _write_archive(pending, [sr_id])
+
+        archived = retention_service._archive_table(SurveyResponse, datetime(2001, 1, 1), str(tmp_path), 100)
+
+        assert archived == 1
+        assert not pending.exists()
+        assert _archived_ids(tmp_path, "survey_responses") == [sr_id]
+
+
+def test_pending_for_deleted_rows_is_appended_without_duplicates(app, tmp_path):
+    """삭제 커밋 후 붙이는 도중 멈춘 실행의 pending → 날짜 파일에 이미 있는 id는 빼고 붙임"""
+    table_dir = tmp_path / "survey_responses"
+    _write_archive(table_dir / "2000-01-01.ndjson.gz", [101])
+    pending = table_dir / "2000-01-01.ndjson.gz.pending"
+    _write_archive(pending, [101, 102])
+
+    with app.app_context():
+        archived = retention_service._archive_table(SurveyResponse, datetime(2001, 1, 1), str(tmp_path), 100)
+
+    assert archived == 0
+    assert not pending.exists()
+    assert _archived_ids(tmp_path, "survey_responses") == [101, 102]
@@ -0,0 +1,43 @@
+# tests/test_scan_and_recommend.py
+
+"""
+scan_and_recommend: 준비 단계 예외가 추론 중인 임시 파일을 먼저 지우지 않는지 확인한다.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import services.recommend_service as recommend_service
+from conftest import HAND_RESULT
+
+
+def test_prep_failure_waits_for_inference(app, monkeypatch, tmp_path):
+    image_path = tmp_path / "hand.jpg"
+    image_path.write_bytes(b"\xff\xd8\xff")
+    started = threading.Event()
+    seen = {}
+
+    def slow_analyze(path, **kwargs):
+        started.set()
+        time.sleep(0.2)
+        seen["exists"] = os.path.exists(path)
+        return dict(HAND_RESULT)
+
+    def broken_snapshot():
+        started.wait(1.0)  # 추론이 이미 돌고 있어 cancel()이 실패하는 경우
+        raise RuntimeError("catalog unavailable")
+
+    monkeypatch.setattr(recommend_service, "analyze_hand", slow_analyze)
+    monkeypatch.setattr(recommend_service, "get_catalog_snapshot", broken_snapshot)
+
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            try:
+                recommend_service.scan_and_recommend(str(image_path), {})
+            finally:
+                os.remove(image_path)  # api.hand._uploaded_image 와 같은 정리
+
+    assert seen == {"exists": True}
@@ -0,0 +1,103 @@
+# tests/test_upload_guard.py
+
+"""
+@image_upload: magic byte 415, 해상도 413, 본문 크기 413 (Content-Length / chunked), 정상 JPEG·PNG 통과.
+"""
+
+import io
+import json
+import struct
+
+import pytest
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from conftest import PNG_BYTES
+from utils.upload_guard import UPLOAD_MAX_BYTES
+
+BOUNDARY = "guard-test-boundary"
+
+
+def _jpeg(width, height):
+    """SOI + APP0 + SOF0 헤더까지만 있는 JPEG"""
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof0
+
+
+GIF_BYTES = b"GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00"
+
+
+def _scan(client, payload, filename="hand.jpg"):
+    data = {"file": (io.BytesIO(payload), filename)}
+    return client.post("/scan-hand", data=data, content_type="multipart/form-data")
+
+
+def _multipart(payload):
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="hand.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + payload + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.mark.parametrize(
+    "payload, filename",
+    [(_jpeg(640, 480), "hand.jpg"), (PNG_BYTES, "hand.png")],
+)
+def test_valid_image_is_accepted(client, fake_analyze_hand, payload, filename):
+    resp = _scan(client, payload, filename)
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    assert "handMetricsId" in resp.get_json()
+
+
+def test_non_image_is_rejected_by_magic_bytes(client, fake_analyze_hand):
+    resp = _scan(client, GIF_BYTES, "hand.jpg")  # 확장자가 아니라 내용으로 판단
+    assert resp.status_code == 415
+    assert "error" in resp.get_json()
+
+
+def test_too_many_pixels_is_rejected_before_decode(client, fake_analyze_hand):
+    resp = _scan(client, _jpeg(10000, 10000))
+    assert resp.status_code == 413
+    assert "10000x10000" in resp.get_json()["error"]
+
+
+def test_body_over_limit_with_content_length(client, fake_analyze_hand):
+    body = _multipart(_jpeg(640, 480) + b"\x00" * (11 * 1024 * 1024))
+    assert len(body) > UPLOAD_MAX_BYTES
+    resp = client.post(
+        "/scan-hand",
+        data=body,
+        content_type=f"multipart/form-data; boundary={BOUNDARY}",
+    )
+    assert resp.status_code == 413
+    assert "error" in resp.get_json()
+
+
+def test_chunked_body_over_limit(app, fake_analyze_hand):
+    """Content-Length 없이 오는 본문은 읽다가 상한을 넘는 순간 413"""
+    body = _multipart(_jpeg(640, 480) + b"\x00" * (11 * 1024 * 1024))
+    environ = EnvironBuilder(
+        path="/scan-hand",
+        method="POST",
+        input_stream=io.BytesIO(body),
+        content_type=f"multipart/form-data; boundary={BOUNDARY}",
+        headers={"Transfer-Encoding": "chunked"},
+    ).get_environ()
+    # 서버가 chunked를 풀어 넘겨 줄 때처럼: 길이 없음 + 스트림 끝 표시
+    del environ["CONTENT_LENGTH"]
+    environ["wsgi.input_terminated"] = True
+
+    # test client는 environ을 다시 만들며 Content-Length를 채우므로 WSGI 앱을 직접 호출
+    app_iter, status, _ = run_wsgi_app(app, environ, buffered=True)
+    assert status.startswith("413")
+    assert "error" in json.loads(b"".join(app_iter))
+
+
+def test_other_endpoints_are_not_sniffed(client):
+    resp = client.post(
+        "/admin/rackets/bulk",
+        data={"file": (io.BytesIO(b"brand,name\nNew,One\n"), "rackets.csv")},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200, resp.get_data(as_text=True)
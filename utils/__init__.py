@@ -1,7 +1,18 @@
 """
 utils 패키지
 
-- hand_utils.py : MediaPipe / OpenCV 손 이미지 분석 유틸 함수 (analyze_hand)
+- hand_utils.py    : MediaPipe / OpenCV 손 이미지 분석 유틸 함수 (analyze_hand)
+- query_plan.py    : 실행된 SQL 수집 + SQLite EXPLAIN QUERY PLAN 풀스캔 체크 (tests용)
+- sql_stats.py     : 요청 단위 SQL 쿼리 카운터 / 쿼리 수 예산(query_budget)
+- memory.py        : /proc 기반 프로세스 메모리(RSS/PSS/USS) 측정
+- json_provider.py : Flask JSON provider (orjson 우선, 표준 json fallback)
+- http_cache.py    : ETag / Last-Modified 조건부 요청(304) 헬퍼
+- admission.py     : /scan-hand 입장 제어 (클라이언트별 토큰 버킷 + 동시 처리 상한)
+- metrics.py       : Prometheus 텍스트 포맷 메트릭 (/metrics) 및 단계별 타이머
+- profiler.py      : 샘플링/느린 요청 프로파일 수집 (디스크 ring, /admin/profiles)
+- bench.py         : 요청당 DB 왕복/commit 수, 느린 클라이언트 동시성 측정 (bench-recommend / bench-concurrency)
+- executors.py     : 요청 중 병렬 작업용 스레드 풀 (손 분석 추론)
+- upload_guard.py  : 손 사진 업로드 크기/형식/해상도 제한 (decode 전 조기 거부)
 """
 
 # 필요 시 유틸 함수 재노출 예시:
@@ -0,0 +1,348 @@
+# utils/admission.py
+
+"""
+무거운 엔드포인트(/scan-hand) 입장 제어.
+
+- 클라이언트(원격 주소)별 토큰 버킷 → 초과 시 바로 429 (Retry-After)
+  (X-Device-Id 같은 클라이언트가 정하는 헤더는 값을 바꿔 가며 새 버킷을 받을 수 있어 키로 쓰지 않는다)
+- 동시에 처리 중인 스캔 수 상한 → 자리가 없으면 기다리지 않고 바로 503 (Retry-After)
+  상한을 워커 수보다 작게 두면 /recommend-rackets, admin 같은 가벼운 요청을 받을
+  워커가 항상 남는다. (가벼운 엔드포인트는 입장 제어를 거치지 않는다)
+
+ADMISSION_MODE (기본: WEB_CONCURRENCY > 1 이면 sqlite, 아니면 local)
+- local  : 프로세스 메모리에 상태 보관 (워커마다 따로 센다 — 워커 하나(스레드 여러 개)일 때용)
+- sqlite : ADMISSION_SQLITE_PATH 의 SQLite 파일로 같은 호스트 워커끼리 공유
+           sync 워커는 어차피 한 번에 요청 하나라 워커별 상한은 아무것도 막지 못한다.
+           호스트 전체 상한(기본 WEB_CONCURRENCY - 1)이어야 가벼운 요청용 워커가 남는다.
+- off    : 입장 제어 끄기
+
+SCAN_RATE_PER_MIN / SCAN_BURST : 클라이언트별 분당 허용량 / 버스트
+SCAN_MAX_INFLIGHT             : 동시 스캔 상한 (local은 프로세스당, sqlite는 호스트 전체)
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, jsonify, request
+
+from utils.metrics import ADMISSION_DECISIONS, Gauge
+
+# 오래된 슬롯(워커가 죽어 반납되지 않은 것)은 이 시간이 지나면 회수한다.
+SLOT_TTL_SEC = 300.0
+_PRUNE_EVERY = 1000
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+def _take_token(tokens: float, rate: float) -> Tuple[bool, float, float]:
+    """
+    반환: (허용 여부, 남은 토큰, 재시도까지 초)
+    """
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    return False, tokens, (1.0 - tokens) / rate if rate > 0 else 60.0
+
+
+class LocalAdmissionStore:
+    """
+    프로세스 내 상태 (스레드 안전)
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._slots: Dict[str, int] = {}
+        self._calls = 0
+
+    def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            allowed, tokens, retry_after = _take_token(_refill(tokens, updated, now, rate, burst), rate)
+            self._buckets[key] = (tokens, now)
+
+            self._calls += 1
+            if self._calls % _PRUNE_EVERY == 0:
+                # 가득 찬 버킷은 없는 것과 같으므로 버린다.
+                full_after = burst / rate if rate > 0 else 0.0
+                self._buckets = {
+                    k: v for k, v in self._buckets.items() if now - v[1] < full_after
+                }
+        return allowed, retry_after
+
+    def acquire_slot(self, name: str, limit: int) -> Optional[str]:
+        with self._lock:
+            if self._slots.get(name, 0) >= limit:
+                return None
+            self._slots[name] = self._slots.get(name, 0) + 1
+        return name
+
+    def release_slot(self, name: str, slot: str):
+        with self._lock:
+            self._slots[name] = max(0, self._slots.get(name, 0) - 1)
+
+    def inflight(self, name: str) -> int:
+        return self._slots.get(name, 0)
+
+
+class SqliteAdmissionStore:
+    """
+    같은 호스트의 워커끼리 SQLite 파일 하나로 상태를 공유한다.
+    (BEGIN IMMEDIATE로 직렬화, 연결은 스레드/프로세스별)
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.clock = clock
+        self._local = threading.local()
+        self._calls = 0
+        conn = self._conn()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS admission_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS admission_slots (
+                slot_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                acquired_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_admission_slots_name ON admission_slots (name);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        now = self.clock()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM admission_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            allowed, tokens, retry_after = _take_token(_refill(tokens, updated, now, rate, burst), rate)
+            conn.execute(
+                "INSERT OR REPLACE INTO admission_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+
+            self._calls += 1
+            if self._calls % _PRUNE_EVERY == 0 and rate > 0:
+                conn.execute(
+                    "DELETE FROM admission_buckets WHERE updated < ?", (now - burst / rate,)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    def _reap_dead_slots(self, conn, name: str, now: float):
+        conn.execute(
+            "DELETE FROM admission_slots WHERE name = ? AND acquired_at < ?",
+            (name, now - SLOT_TTL_SEC),
+        )
+        for (pid,) in conn.execute(
+            "SELECT DISTINCT pid FROM admission_slots WHERE name = ?", (name,)
+        ).fetchall():
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                conn.execute(
+                    "DELETE FROM admission_slots WHERE name = ? AND pid = ?", (name, pid)
+                )
+            except OSError:
+                pass
+
+    def acquire_slot(self, name: str, limit: int) -> Optional[str]:
+        now = self.clock()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM admission_slots WHERE name = ?", (name,)
+            ).fetchone()[0]
+            if count >= limit:
+                # 꽉 찼을 때만 죽은 워커의 슬롯을 회수해 본다.
+                self._reap_dead_slots(conn, name, now)
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM admission_slots WHERE name = ?", (name,)
+                ).fetchone()[0]
+            slot = None
+            if count < limit:
+                slot = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO admission_slots (slot_id, name, pid, acquired_at) VALUES (?, ?, ?, ?)",
+                    (slot, name, os.getpid(), now),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return slot
+
+    def release_slot(self, name: str, slot: str):
+        self._conn().execute("DELETE FROM admission_slots WHERE slot_id = ?", (slot,))
+
+    def inflight(self, name: str) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM admission_slots WHERE name = ?", (name,)
+        ).fetchone()[0]
+
+
+class AdmissionController:
+    """
+    엔드포인트 그룹(name)별 정책: (분당 허용량, 버스트, 동시 처리 상한)
+    """
+
+    def __init__(self, store, policies: Dict[str, Tuple[float, int, int]]):
+        self.store = store
+        self.policies = policies
+
+    def admit(self, name: str, client_key: str):
+        """
+        반환: (slot, 거절 응답 정보)
+        - 통과: (slot, None)  → 처리 후 release(name, slot) 필요
+        - 거절: (None, (status, retry_after_sec, message))
+        """
+        rate_per_min, burst, max_inflight = self.policies[name]
+        try:
+            allowed, retry_after = self.store.take(f"{name}:{client_key}", rate_per_min / 60.0, burst)
+            if not allowed:
+                ADMISSION_DECISIONS.inc(name=name, result="rate_limited")
+                return None, (429, retry_after, "요청이 너무 많습니다. 잠시 후 다시 시도하세요.")
+
+            slot = self.store.acquire_slot(name, max_inflight)
+            if slot is None:
+                ADMISSION_DECISIONS.inc(name=name, result="over_capacity")
+                return None, (503, 1.0, "분석 요청이 몰려 있습니다. 잠시 후 다시 시도하세요.")
+        except sqlite3.Error:
+            # 공유 상태를 못 쓰면 막지 않는다 (입장 제어 때문에 서비스가 멈추면 안 됨)
+            ADMISSION_DECISIONS.inc(name=name, result="error")
+            return "", None
+
+        ADMISSION_DECISIONS.inc(name=name, result="admitted")
+        return slot, None
+
+    def release(self, name: str, slot: str):
+        if not slot:
+            return
+        try:
+            self.store.release_slot(name, slot)
+        except sqlite3.Error:
+            ADMISSION_DECISIONS.inc(name=name, result="error")
+
+    def inflight(self, name: str) -> int:
+        return self.store.inflight(name)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def build_controller_from_env() -> Optional[AdmissionController]:
+    # gunicorn.conf.py가 실제 워커 수를 WEB_CONCURRENCY로 내보낸다 (flask run 등은 1)
+    workers = max(1, int(_env_float("WEB_CONCURRENCY", 1)))
+    default_mode = "sqlite" if workers > 1 else "local"
+    mode = (os.getenv("ADMISSION_MODE") or default_mode).strip().lower()
+    if mode == "off":
+        return None
+
+    if mode == "sqlite":
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        path = os.getenv("ADMISSION_SQLITE_PATH") or os.path.join(base, "hand-analyzer-admission.db")
+        store = SqliteAdmissionStore(path)
+        # 호스트 전체 상한: 워커 하나는 항상 가벼운 요청용으로 남긴다.
+        default_inflight = max(1, workers - 1)
+    else:
+        store = LocalAdmissionStore()
+        default_inflight = 1
+
+    policies = {
+        "scan": (
+            _env_float("SCAN_RATE_PER_MIN", 10.0),
+            int(_env_float("SCAN_BURST", 5)),
+            int(_env_float("SCAN_MAX_INFLIGHT", default_inflight)),
+        ),
+    }
+    return AdmissionController(store, policies)
+
+
+def client_key() -> str:
+    # 프록시 뒤라면 ProxyFix 등으로 remote_addr가 실제 클라이언트 주소가 되게 할 것
+    return "ip:" + (request.remote_addr or "unknown")
+
+
+def admission_control(name: str):
+    """
+    뷰 함수에 입장 제어를 건다. (init_admission(app)으로 컨트롤러가 등록돼 있어야 동작)
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = current_app.extensions.get("admission")
+            if controller is None:
+                return view(*args, **kwargs)
+
+            slot, rejected = controller.admit(name, client_key())
+            if rejected is not None:
+                status, retry_after, message = rejected
+                response = jsonify({"error": message})
+                response.status_code = status
+                response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+                return response
+            try:
+                return view(*args, **kwargs)
+            finally:
+                controller.release(name, slot)
+
+        return wrapper
+
+    return decorator
+
+
+_active_controller: Optional[AdmissionController] = None
+
+
+def _inflight_by_name():
+    controller = _active_controller
+    if controller is None:
+        return {}
+    return {(name,): controller.inflight(name) for name in controller.policies}
+
+
+# local 모드는 이 워커의 값, sqlite 모드는 호스트 전체 값
+IN_FLIGHT = Gauge("admission_in_flight", "입장 제어 중인 처리 건수 (예: 진행 중 스캔)", ["name"], fn=_inflight_by_name)
+
+
+def init_admission(app, controller: Optional[AdmissionController] = None):
+    global _active_controller
+    controller = controller if controller is not None else build_controller_from_env()
+    app.extensions["admission"] = controller
+    _active_controller = controller
@@ -0,0 +1,209 @@
+# utils/bench.py
+
+"""
+성능 측정 도구 (개발용/샘플 DB에서만 쓸 것 — 추천 로그가 실제로 쌓인다)
+
+- bench_recommend()    : /recommend-rackets 요청당 DB 왕복 수 / commit 수 / 지연
+                         (`flask --app app bench-recommend`)
+- bench_slow_clients() : 떠 있는 서버에 느린 클라이언트(본문을 천천히 보내는 POST)를 계속 붙여 두고
+                         그동안 /healthz 지연을 잰다. 워커 모델(sync / gthread) 비교용
+                         (`flask --app app bench-concurrency --url ...`)
+"""
+
+import http.client
+import json
+import socket
+import statistics
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db_config import db, HandMetrics, SurveyResponse
+
+_SURVEY = {
+    "level": "intermediate",
+    "pain": "sometimes",
+    "swing": "normal",
+    "styles": ["spin", "control"],
+    "stringTypePreference": "auto",
+}
+_HAND = {
+    "handLength": 720.0,
+    "handWidth": 330.0,
+    "handLengthMm": 180.0,
+    "handWidthMm": 82.5,
+    "handSizeCategory": "MEDIUM",
+    "fingerRatios": [0.95, 1.01],
+}
+
+
+def _scenarios(app) -> Dict[str, dict]:
+    scenarios = {
+        # 프론트가 메트릭 + 설문을 직접 보내는 경우 (설문 row 재사용)
+        "payload": dict(_HAND, survey=_SURVEY),
+    }
+    with app.app_context():
+        hm_id = db.session.query(HandMetrics.id).order_by(HandMetrics.id.desc()).limit(1).scalar()
+        sr_id = (
+            db.session.query(SurveyResponse.id).order_by(SurveyResponse.id.desc()).limit(1).scalar()
+        )
+    if hm_id and sr_id:
+        # /scan-hand 이후 id로 다시 추천받는 경우
+        scenarios["ids"] = {"handMetricsId": hm_id, "surveyResponseId": sr_id}
+    return scenarios
+
+
+def bench_recommend(app, requests: int = 200) -> Dict[str, dict]:
+    counters = {"statements": 0, "commits": 0}
+
+    def on_execute(*args, **kwargs):
+        counters["statements"] += 1
+
+    def on_commit(conn):
+        counters["commits"] += 1
+
+    event.listen(Engine, "before_cursor_execute", on_execute)
+    event.listen(Engine, "commit", on_commit)
+    try:
+        client = app.test_client()
+        report = {}
+        for name, body in _scenarios(app).items():
+            # 워밍업 (카탈로그/코호트 캐시, 스냅샷 row 생성)
+            client.post("/recommend-rackets", json=body)
+
+            statements: List[int] = []
+            commits: List[int] = []
+            latencies: List[float] = []
+            for _ in range(requests):
+                counters["statements"] = counters["commits"] = 0
+                started = time.perf_counter()
+                response = client.post("/recommend-rackets", json=body)
+                latencies.append((time.perf_counter() - started) * 1000.0)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name}: HTTP {response.status_code}")
+                statements.append(counters["statements"])
+                commits.append(counters["commits"])
+
+            latencies.sort()
+            report[name] = {
+                "requests": requests,
+                "statementsPerRequest": statistics.mean(statements),
+                "commitsPerRequest": statistics.mean(commits),
+                "p50Ms": round(latencies[len(latencies) // 2], 2),
+                "p95Ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+            }
+        return report
+    finally:
+        event.remove(Engine, "before_cursor_execute", on_execute)
+        event.remove(Engine, "commit", on_commit)
+
+
+def _percentile(values: List[float], q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _slow_request(host, port, body: bytes, trickle_sec: float, results: list):
+    """
+    POST /recommend-rackets 본문을 trickle_sec 동안 20조각으로 나눠 보낸다. (느린 모바일 업로드 흉내)
+    """
+    started = time.perf_counter()
+    ok = False
+    try:
+        with socket.create_connection((host, port), timeout=120) as sock:
+            head = (
+                f"POST /recommend-rackets HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            sock.sendall(head.encode("ascii"))
+            step = max(1, len(body) // 20)
+            for i in range(0, len(body), step):
+                sock.sendall(body[i : i + step])
+                time.sleep(trickle_sec / 20)
+            reader = sock.makefile("rb")
+            ok = b" 200 " in reader.readline()
+            reader.read()
+    except OSError:
+        pass
+    results.append((ok, time.perf_counter() - started))
+
+
+def bench_slow_clients(
+    url: str, clients: int = 32, trickle_sec: float = 2.0, duration_sec: float = 10.0
+) -> Dict[str, dict]:
+    """
+    clients 개의 연결이 duration_sec 동안 느린 요청을 계속 보내는 상황에서
+    느린 요청 처리량과 /healthz 지연을 잰다.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    body = json.dumps(dict(_HAND, survey=_SURVEY)).encode("utf-8")
+    deadline = time.perf_counter() + duration_sec
+
+    slow_results = []
+
+    def slow_client():
+        while time.perf_counter() < deadline:
+            _slow_request(host, port, body, trickle_sec, slow_results)
+
+    threads = [threading.Thread(target=slow_client) for _ in range(clients)]
+
+    probe_ms: List[float] = []
+    probe_failed = [0]
+    done = threading.Event()
+
+    def probe():
+        # 느린 클라이언트가 도는 동안 가벼운 요청이 얼마나 기다리는지
+        while not done.is_set():
+            started = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                conn.request("GET", "/healthz")
+                ok = conn.getresponse().status == 200
+                conn.close()
+            except OSError:
+                ok = False
+            if ok:
+                probe_ms.append((time.perf_counter() - started) * 1000.0)
+            else:
+                probe_failed[0] += 1
+            time.sleep(0.05)
+
+    prober = threading.Thread(target=probe)
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    prober.start()
+    for t in threads:
+        t.join()
+    done.set()
+    prober.join()
+    wall = time.perf_counter() - started
+
+    durations = [d for ok, d in slow_results if ok]
+    return {
+        "clients": clients,
+        "trickleSec": trickle_sec,
+        "durationSec": duration_sec,
+        "wallSec": round(wall, 2),
+        "slowRequests": {
+            "ok": len(durations),
+            "failed": len(slow_results) - len(durations),
+            "p50Sec": round(_percentile(durations, 0.5) or 0, 2),
+            "maxSec": round(max(durations, default=0), 2),
+        },
+        "probe": {
+            "count": len(probe_ms),
+            "failed": probe_failed[0],
+            "p50Ms": round(_percentile(probe_ms, 0.5) or 0, 1),
+            "p95Ms": round(_percentile(probe_ms, 0.95) or 0, 1),
+            "maxMs": round(max(probe_ms, default=0), 1),
+        },
+    }
@@ -0,0 +1,64 @@
+# utils/executors.py
+
+"""
+요청 처리 중 병렬로 돌릴 작업용 executor (프로세스당 하나, 처음 쓸 때 생성).
+
+- inference_executor() : 손 분석(analyze_hand) 전용 스레드 풀 (INFERENCE_THREADS, 기본 1)
+  MediaPipe 그래프는 프로세스당 하나라 추론 자체는 _detector_lock으로 직렬화되므로,
+  풀은 "요청 스레드가 다른 준비 작업을 하는 동안 추론을 돌리는" 용도다.
+- submit()한 작업은 실행되는 동안 제출한 (요청) 스레드의 느린 요청 스택 샘플에 포함된다.
+  (utils.profiler.on_behalf_of)
+- 스레드는 fork로 복제되지 않으므로 pid가 바뀌면 새로 만든다.
+  (gunicorn post_fork 에서는 reset_executors()로 명시적으로 버린다)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.profiler import on_behalf_of
+
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "1"))
+
+class _RequestExecutor(ThreadPoolExecutor):
+    def submit(self, fn, /, *args, **kwargs):
+        owner_id = threading.get_ident()
+
+        def run():
+            with on_behalf_of(owner_id):
+                return fn(*args, **kwargs)
+
+        return super().submit(run)
+
+
+_lock = threading.Lock()
+_executors = {}
+_executors_pid = None
+
+
+def _get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    global _executors_pid
+    with _lock:
+        if _executors_pid != os.getpid():
+            _executors.clear()
+            _executors_pid = os.getpid()
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = _RequestExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+        return executor
+
+
+def inference_executor() -> ThreadPoolExecutor:
+    return _get_executor("inference", INFERENCE_THREADS)
+
+
+def reset_executors():
+    """
+    fork 직후 호출: 부모에서 상속한 executor 객체를 버린다 (스레드는 상속되지 않음).
+    """
+    global _executors_pid
+    with _lock:
+        _executors.clear()
+        _executors_pid = None
@@ -1,6 +1,60 @@
 import cv2
 import mediapipe as mp
 import math
+import os
+import threading
+
+from utils.metrics import stage_timer
+
+
+# ---------------------------------
+# MediaPipe Hands 그래프 (프로세스당 1개 재사용)
+# - 그래프는 fork 후 공유하면 안 되므로 pid가 바뀌면 새로 만든다.
+# - gunicorn post_fork 에서는 reset_hand_detector()로 명시적으로 버린다.
+# ---------------------------------
+_detector_lock = threading.Lock()
+_detector = None
+_detector_pid = None
+
+
+def _get_hand_detector():
+    global _detector, _detector_pid
+    if _detector is None or _detector_pid != os.getpid():
+        _detector = mp.solutions.hands.Hands(
+            static_image_mode=True,
+            max_num_hands=1,
+            min_detection_confidence=0.5,
+        )
+        _detector_pid = os.getpid()
+    return _detector
+
+
+def reset_hand_detector():
+    """
+    fork 직후 호출: 부모에서 상속한 그래프 핸들을 버린다 (다음 호출 때 새로 생성).
+    """
+    global _detector, _detector_pid
+    _detector = None
+    _detector_pid = None
+
+
+def preload_detector_assets():
+    """
+    fork 전(마스터)에서 호출: MediaPipe 손 모델 파일(.tflite)을 읽어 OS 페이지 캐시에 올린다.
+    (모듈 코드/상수는 import 시점에 이미 마스터 메모리에 올라가 워커와 copy-on-write로 공유)
+    반환: 읽은 바이트 수
+    """
+    module_dir = os.path.join(os.path.dirname(mp.__file__), "modules")
+    total = 0
+    for sub in ("hand_landmark", "palm_detection"):
+        d = os.path.join(module_dir, sub)
+        if not os.path.isdir(d):
+            continue
+        for name in os.listdir(d):
+            if name.endswith(".tflite"):
+                with open(os.path.join(d, name), "rb") as f:
+                    total += len(f.read())
+    return total
 
 
 def _dist(px1, px2):
@@ -57,23 +111,28 @@ def analyze_hand(image_path, capture_distance_cm=None, capture_device=None):
         "captureDistanceCm": 40.0,
     }
     """
-    img = cv2.imread(image_path)
-    if img is None:
-        return None
+    with stage_timer("analyze_hand.decode"):
+        img = cv2.imread(image_path)
+        if img is None:
+            return None
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        static_image_mode=True,
-        max_num_hands=1,
-        min_detection_confidence=0.5,
-    )
-    results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    with stage_timer("analyze_hand.inference"):
+        with _detector_lock:
+            results = _get_hand_detector().process(rgb)
 
     if not results.multi_hand_landmarks:
         return None
 
-    hand = results.multi_hand_landmarks[0]
-    h, w, _ = img.shape
+    with stage_timer("analyze_hand.geometry"):
+        return _measure_hand(results.multi_hand_landmarks[0], img.shape, capture_distance_cm, capture_device)
+
+
+def _measure_hand(hand, shape, capture_distance_cm, capture_device):
+    """
+    랜드마크 → 길이/너비/비율/등급 (analyze_hand의 geometry 단계)
+    """
+    h, w, _ = shape
 
     def to_px(lm):
         return (lm.x * w, lm.y * h)
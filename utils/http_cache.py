@@ -0,0 +1,65 @@
+# utils/http_cache.py
+
+"""
+HTTP 조건부 요청(ETag / Last-Modified) 헬퍼.
+
+- 카탈로그처럼 버전 카운터가 있는 리소스는 버전으로 strong ETag를 만든다.
+- not_modified()는 본문을 만들기 전에 호출해서, 맞으면 바로 304를 돌려준다.
+  (If-None-Match가 있으면 그것만 보고, 없을 때만 If-Modified-Since 비교)
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import current_app, request
+
+
+def version_etag(kind: str, version) -> str:
+    return f"{kind}-v{version}"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # DB의 DateTime 컬럼은 naive UTC로 저장된다.
+        value = value.replace(tzinfo=timezone.utc)
+    # HTTP date는 초 단위
+    return value.replace(microsecond=0)
+
+
+def _apply_headers(response, etag, last_modified, cache_control):
+    response.set_etag(etag)
+    last_modified = _as_utc(last_modified)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None, cache_control: str = None):
+    """
+    클라이언트 캐시가 최신이면 304 응답, 아니면 None.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        last_modified = _as_utc(last_modified)
+        fresh = since is not None and last_modified is not None and last_modified <= since
+
+    if not fresh:
+        return None
+    response = current_app.response_class(status=304)
+    return _apply_headers(response, etag, last_modified, cache_control)
+
+
+def with_cache_headers(response, etag: str, last_modified: Optional[datetime] = None, cache_control: str = None):
+    """
+    200 응답에 ETag / Last-Modified / Cache-Control을 붙인다.
+    """
+    return _apply_headers(response, etag, last_modified, cache_control)
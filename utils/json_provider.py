@@ -0,0 +1,77 @@
+# utils/json_provider.py
+
+"""
+Flask JSON provider (orjson 우선, 없으면 표준 json).
+
+- orjson이 설치돼 있으면 jsonify / request.get_json 모두 orjson으로 인코딩/디코딩한다.
+  (키 정렬, 날짜(HTTP date)·Decimal(str) 변환 규칙은 Flask 기본 provider와 동일,
+   단 NaN/Infinity는 기본 provider처럼 NaN 토큰이 아니라 null로 나간다)
+- 설치돼 있지 않거나 json 옵션(kwargs)을 직접 넘긴 호출은 기존 DefaultJSONProvider로 처리.
+- loads_json() / json_column() : 모델의 JSON 텍스트 컬럼을 읽을 때 쓰는 빠른 경로.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def loads_json(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def json_column(text, default=None):
+    """
+    JSON 텍스트 컬럼 값 → 응답에 넣을 값. 비었거나 깨진 값이면 default.
+    (원문을 검증 없이 끼워 넣으면 깨진 row 하나가 목록 응답 전체를 잘못된 JSON으로 만든다)
+    """
+    if not text:
+        return default
+    try:
+        return loads_json(text)
+    except Exception:
+        return default
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def _orjson_option(self, indent: bool = False) -> int:
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            # datetime은 Flask 기본과 같이 default(HTTP date)로 넘긴다.
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_option(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,73 @@
+# utils/memory.py
+
+"""
+프로세스 메모리 측정 (Linux /proc 기반).
+
+- rss : 상주 메모리 (공유 페이지 포함)
+- pss : 공유 페이지를 공유 프로세스 수로 나눈 값
+- uss : 이 프로세스만 가진 페이지 (Private_Clean + Private_Dirty)
+  → preload(copy-on-write) 효과는 워커별 uss로 비교한다.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+
+def process_memory(pid: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """
+    {"pid", "rssKb", "pssKb", "ussKb"} (Linux가 아니거나 읽을 수 없으면 None)
+    """
+    pid = pid or os.getpid()
+    path = f"/proc/{pid}/smaps_rollup"
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+            fields[parts[0][:-1]] = int(parts[1])
+
+    return {
+        "pid": pid,
+        "rssKb": fields.get("Rss", 0),
+        "pssKb": fields.get("Pss", 0),
+        "ussKb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    try:
+        tids = os.listdir(task_dir)
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(os.path.join(task_dir, tid, "children")) as f:
+                children.extend(int(p) for p in f.read().split())
+        except OSError:
+            continue
+    return children
+
+
+def memory_report(master_pid: int) -> Dict[str, object]:
+    """
+    gunicorn 마스터 pid 기준으로 마스터/워커별 메모리와 워커 uss 합계를 낸다.
+    GUNICORN_PRELOAD=1 / 0 으로 각각 띄워 놓고 비교하면 된다.
+    """
+    master = process_memory(master_pid)
+    workers = [m for m in (process_memory(p) for p in child_pids(master_pid)) if m]
+    uss = [w["ussKb"] for w in workers]
+    return {
+        "master": master,
+        "workers": workers,
+        "workerCount": len(workers),
+        "workerUssTotalKb": sum(uss),
+        "workerUssAvgKb": int(sum(uss) / len(uss)) if uss else 0,
+        "totalPssKb": sum(w["pssKb"] for w in workers) + (master["pssKb"] if master else 0),
+    }
@@ -0,0 +1,456 @@
+# utils/metrics.py
+
+"""
+Prometheus 텍스트 포맷 메트릭 (GET /metrics).
+
+- Counter / Histogram 은 스레드별 샤드에 기록하고(기록 경로에 락 없음) scrape 때만 합친다.
+- Gauge 는 scrape 때 값을 읽는 콜백 또는 inc/dec.
+- stage_timer("analyze_hand.decode") / @timed_stage("match_rackets") : 단계별 소요 시간
+- init_metrics(app) : 엔드포인트별 요청 지연 히스토그램 / 상태 코드 카운터 / 처리 중 요청 게이지
+
+gunicorn 처럼 워커가 여러 개면 scrape는 한 워커에만 간다.
+METRICS_DIR 을 지정하면 각 워커가 METRICS_DUMP_INTERVAL_SEC 마다 누적값을 파일로 남기고,
+scrape한 워커가 다른 워커 파일까지 합쳐서 내려준다. (콜백 게이지는 scrape한 워커 값만)
+- 요청이 없는 워커도 백그라운드 스레드가 주기적으로 남긴다.
+- 워커가 끝나면 자기 파일을 지운다 (atexit, gunicorn worker_exit/child_exit 훅).
+- 합칠 때 pid가 죽었거나 METRICS_STALE_SEC(기본 dump 주기 x3)보다 오래된 파일은 건너뛴다.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from flask import g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+METRICS_DUMP_INTERVAL_SEC = float(os.getenv("METRICS_DUMP_INTERVAL_SEC", "5"))
+METRICS_STALE_SEC = float(os.getenv("METRICS_STALE_SEC") or METRICS_DUMP_INTERVAL_SEC * 3)
+
+
+# ----------------------------------------------------------------------
+# 스레드별 샤드
+# ----------------------------------------------------------------------
+class _Shard:
+    """
+    한 스레드가 쓰는 {(metric, labels): 값} 모음. 스레드가 끝나면 retired 로 합쳐진다.
+    """
+
+    __slots__ = ("cells", "__weakref__")
+
+    def __init__(self):
+        self.cells: Dict[Tuple[str, tuple], list] = {}
+
+    def __del__(self):
+        try:
+            _merge_into_retired(self.cells)
+        except Exception:
+            pass
+
+
+_local = threading.local()
+_shards_lock = threading.Lock()
+_shards: "weakref.WeakSet[_Shard]" = weakref.WeakSet()
+_retired: Dict[Tuple[str, tuple], list] = {}
+
+
+def _merge_cells(target: Dict, cells: Dict):
+    for key, values in list(cells.items()):
+        current = target.get(key)
+        if current is None:
+            target[key] = list(values)
+        else:
+            for i, v in enumerate(values):
+                current[i] += v
+
+
+def _merge_into_retired(cells):
+    with _shards_lock:
+        _merge_cells(_retired, cells)
+
+
+def _cells() -> Dict[Tuple[str, tuple], list]:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _Shard()
+        _local.shard = shard
+        with _shards_lock:
+            _shards.add(shard)
+    return shard.cells
+
+
+def _collect() -> Dict[Tuple[str, tuple], list]:
+    with _shards_lock:
+        total = {k: list(v) for k, v in _retired.items()}
+        shards = list(_shards)
+    for shard in shards:
+        _merge_cells(total, shard.cells)
+    return total
+
+
+# ----------------------------------------------------------------------
+# 메트릭 타입
+# ----------------------------------------------------------------------
+_registry: Dict[str, "_Metric"] = {}
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        _registry[name] = self
+
+    def _key(self, labels: dict) -> Tuple[str, tuple]:
+        return self.name, tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        cells = _cells()
+        key = self._key(labels)
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [amount]
+        else:
+            cell[0] += amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        cells = _cells()
+        key = self._key(labels)
+        cell = cells.get(key)
+        if cell is None:
+            # [bucket별 개수..., +Inf 개수, 합]
+            cell = cells[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                cell[i] += 1
+                break
+        else:
+            cell[len(self.buckets)] += 1
+        cell[-1] += value
+
+
+class Gauge(_Metric):
+    """
+    - fn 을 주면 scrape 때 fn() 값(숫자 또는 {labels tuple: 값})을 그대로 쓴다.
+    - 아니면 inc/dec 으로 누적 (샤드 합산, METRICS_DIR 사용 시 워커 합계)
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), fn: Optional[Callable] = None):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def inc(self, amount: float = 1.0, **labels):
+        cells = _cells()
+        key = self._key(labels)
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [amount]
+        else:
+            cell[0] += amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+# ----------------------------------------------------------------------
+# 공용 메트릭
+# ----------------------------------------------------------------------
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간", ["endpoint", "method"]
+)
+REQUESTS = Counter("http_requests_total", "HTTP 요청 수", ["endpoint", "method", "status"])
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "처리 중인 HTTP 요청 수")
+STAGE_LATENCY = Histogram("stage_duration_seconds", "처리 단계별 소요 시간", ["stage"])
+DB_QUERIES = Counter("db_queries_total", "실행한 SQL 문 수", ["kind"])
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL 문 실행 시간", ["kind"], buckets=DB_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "요청 하나가 실행한 SQL 문 수",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "요청 하나가 SQL 실행에 쓴 시간", ["endpoint"], buckets=DB_BUCKETS
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "프로세스 캐시 조회 (hit/miss)", ["cache", "result"])
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total", "입장 제어 결과", ["name", "result"]
+)
+
+
+def cache_result(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+@contextmanager
+def stage_timer(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, stage=stage)
+
+
+def timed_stage(stage: str):
+    """
+    함수 전체 소요 시간을 stage_duration_seconds{stage=...} 에 기록한다.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage=stage)
+
+        return wrapper
+
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# 워커 간 합산 (METRICS_DIR)
+# ----------------------------------------------------------------------
+_last_dump = 0.0
+_dumper_pid = None
+_removed_pid = None  # 이 pid는 이미 종료 정리됨 → 다시 dump 하지 않음
+
+
+def reset_after_fork():
+    """
+    fork 직후 워커에서 호출: 마스터에서 쌓인 값을 버린다 (워커 합산 시 중복 방지).
+    """
+    global _local, _last_dump
+    with _shards_lock:
+        _retired.clear()
+        for shard in list(_shards):
+            shard.cells.clear()
+        _shards.clear()
+    _local = threading.local()
+    _last_dump = 0.0
+
+
+def _dump_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+def _dump_pid(name: str) -> Optional[int]:
+    if not name.startswith("metrics-") or not name.endswith(".json"):
+        return None
+    try:
+        return int(name[len("metrics-") : -len(".json")])
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_process_dump(pid: Optional[int] = None):
+    """
+    워커 종료 시 그 워커의 dump 파일을 지운다. (기본: 현재 프로세스)
+    """
+    global _removed_pid
+    if METRICS_DIR is None:
+        return
+    if pid is None or pid == os.getpid():
+        pid = os.getpid()
+        _removed_pid = pid
+    try:
+        os.remove(_dump_path(pid))
+    except OSError:
+        pass
+
+
+atexit.register(remove_process_dump)
+
+
+def _dump_periodically():
+    while True:
+        time.sleep(METRICS_DUMP_INTERVAL_SEC)
+        dump_process_metrics(force=True)
+
+
+def _ensure_dumper():
+    """
+    프로세스(fork된 워커 포함)마다 한 번: 주기 dump 스레드 시작.
+    요청이 끊긴 워커 파일도 METRICS_STALE_SEC 안에 갱신되도록.
+    """
+    global _dumper_pid
+    if _dumper_pid == os.getpid():
+        return
+    _dumper_pid = os.getpid()
+    threading.Thread(target=_dump_periodically, name="metrics-dump", daemon=True).start()
+
+
+def dump_process_metrics(force: bool = False):
+    """
+    현재 프로세스 누적값을 METRICS_DIR/metrics-<pid>.json 으로 남긴다.
+    """
+    global _last_dump
+    if METRICS_DIR is None or _removed_pid == os.getpid():
+        return
+    now = time.monotonic()
+    if not force and now - _last_dump < METRICS_DUMP_INTERVAL_SEC:
+        return
+    _last_dump = now
+    _ensure_dumper()
+
+    cells = _collect()
+    payload = [[name, list(labels), values] for (name, labels), values in cells.items()]
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = _dump_path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _collect_all_processes() -> Dict[Tuple[str, tuple], list]:
+    total = _collect()
+    if METRICS_DIR is None or not os.path.isdir(METRICS_DIR):
+        return total
+    now = time.time()
+    for name in os.listdir(METRICS_DIR):
+        pid = _dump_pid(name)
+        if pid is None or pid == os.getpid():
+            continue
+        path = os.path.join(METRICS_DIR, name)
+        if not _pid_alive(pid):
+            # 정리 훅 없이 죽은 워커 (SIGKILL 등)
+            remove_process_dump(pid)
+            continue
+        try:
+            if now - os.path.getmtime(path) > METRICS_STALE_SEC:
+                continue
+            with open(path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            continue
+        _merge_cells(total, {(m, tuple(labels)): values for m, labels, values in payload})
+    return total
+
+
+# ----------------------------------------------------------------------
+# 텍스트 포맷
+# ----------------------------------------------------------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_metrics() -> str:
+    cells = _collect_all_processes()
+    by_metric: Dict[str, list] = {}
+    for (name, labels), values in cells.items():
+        by_metric.setdefault(name, []).append((labels, values))
+
+    lines = []
+    for name, metric in _registry.items():
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+
+        if isinstance(metric, Gauge) and metric.fn is not None:
+            try:
+                value = metric.fn()
+            except Exception:
+                continue
+            items = value.items() if isinstance(value, dict) else [((), value)]
+            for labels, v in items:
+                if v is not None:
+                    lines.append(f"{name}{_labels(metric.labelnames, labels)} {_fmt(v)}")
+            continue
+
+        for labels, values in sorted(by_metric.get(name, [])):
+            if isinstance(metric, Histogram):
+                running = 0
+                for upper, count in zip(metric.buckets + (float("inf"),), values[:-1]):
+                    running += count
+                    le = _labels(metric.labelnames, labels, ("le", _fmt(upper)))
+                    lines.append(f"{name}_bucket{le} {_fmt(running)}")
+                label_str = _labels(metric.labelnames, labels)
+                lines.append(f"{name}_sum{label_str} {_fmt(values[-1])}")
+                lines.append(f"{name}_count{label_str} {_fmt(running)}")
+            else:
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_fmt(values[0])}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Flask 연동
+# ----------------------------------------------------------------------
+def init_metrics(app):
+    @app.before_request
+    def _metrics_start():
+        g._metrics_started = time.perf_counter()
+        g._metrics_in_flight = True
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _metrics_observe(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            endpoint = request.endpoint or "unmatched"
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started, endpoint=endpoint, method=request.method
+            )
+            REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        if g.pop("_metrics_in_flight", False):
+            REQUESTS_IN_FLIGHT.dec()
+        dump_process_metrics()
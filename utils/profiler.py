@@ -0,0 +1,292 @@
+# utils/profiler.py
+
+"""
+느린 요청 프로파일 자동 수집 (opt-in).
+
+- PROFILE_SAMPLE_RATE : 이 비율(0~1)의 요청은 cProfile로 전체 프로파일
+- PROFILE_SLOW_MS     : 이 시간을 넘긴 요청은 스택 샘플링 결과를 남긴다.
+                        (백그라운드 스레드가 PROFILE_STACK_INTERVAL_MS 마다 요청 스레드 스택을 찍고,
+                         요청이 느리게 끝났을 때만 저장 → 평소 비용은 샘플링 스레드 하나)
+                        요청을 대신해 executor 스레드에서 도는 작업(손 분석 추론 등)도
+                        on_behalf_of()로 그 요청에 붙여 같이 찍는다. (스택 앞에 "[스레드 이름]")
+- 둘 다 0(기본)이면 꺼져 있다.
+
+결과는 PROFILE_DIR 에 요청당 JSON 파일 하나로 쓰고, 최근 PROFILE_MAX_FILES 개만 남긴다. (ring)
+요청 중 실행된 SQL 문과 시간도 함께 담는다. 목록/조회는 GET /admin/profiles.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from flask import g, request
+
+from utils.sql_stats import start_statement_capture, stop_statement_capture
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_STACK_INTERVAL_MS = float(os.getenv("PROFILE_STACK_INTERVAL_MS", "10"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(
+    tempfile.gettempdir(), "hand-analyzer-profiles"
+)
+
+_TOP_FUNCTIONS = 40
+_TOP_STACKS = 100
+_MAX_STACK_DEPTH = 40
+
+
+# ----------------------------------------------------------------------
+# 스택 샘플러 (느린 요청용)
+# ----------------------------------------------------------------------
+class _StackSampler:
+    """
+    등록된 요청 스레드들의 스택을 주기적으로 찍어 "a;b;c" 형태(folded)로 센다.
+    요청에 붙은 보조 스레드(attach)의 스택은 "[스레드 이름];a;b" 로 같은 요청 카운터에 센다.
+    """
+
+    def __init__(self, interval_sec: float):
+        self.interval = interval_sec
+        self._lock = threading.Lock()
+        self._active: Dict[int, Counter] = {}
+        self._helpers: Dict[int, Tuple[int, str]] = {}  # 보조 스레드 id → (요청 스레드 id, 이름)
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # fork 후에는 스레드가 없으므로 pid 기준으로 다시 띄운다.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def start(self, thread_id: int):
+        with self._lock:
+            self._ensure_thread()
+            self._active[thread_id] = Counter()
+
+    def stop(self, thread_id: int) -> Counter:
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def attach(self, owner_id: int, thread_id: int, name: str):
+        with self._lock:
+            self._helpers[thread_id] = (owner_id, name)
+
+    def detach(self, thread_id: int):
+        with self._lock:
+            self._helpers.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, counts in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counts[_fold(frame)] += 1
+                for thread_id, (owner_id, name) in self._helpers.items():
+                    counts = self._active.get(owner_id)
+                    frame = frames.get(thread_id)
+                    if counts is not None and frame is not None:
+                        counts[f"[{name}];{_fold(frame)}"] += 1
+
+
+def _fold(frame) -> str:
+    parts = []
+    while frame is not None and len(parts) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+_sampler: Optional[_StackSampler] = None
+
+
+@contextmanager
+def on_behalf_of(owner_id: int):
+    """
+    with 블록 동안 현재(보조) 스레드를 owner_id 요청 스레드의 스택 샘플에 포함한다.
+    스택 샘플링이 꺼져 있으면 아무것도 하지 않는다.
+    """
+    sampler = _sampler
+    if sampler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    sampler.attach(owner_id, thread_id, threading.current_thread().name)
+    try:
+        yield
+    finally:
+        sampler.detach(thread_id)
+
+
+# ----------------------------------------------------------------------
+# 결과 파일 (ring)
+# ----------------------------------------------------------------------
+def _cprofile_summary(profile: cProfile.Profile) -> str:
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.sort_stats("cumulative").print_stats(_TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def _write_profile(record: dict):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    endpoint = (record.get("endpoint") or "unmatched").replace("/", "_")
+    name = f"{int(record['startedAt'] * 1000)}-{os.getpid()}-{endpoint}.json"
+    path = os.path.join(PROFILE_DIR, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    files = sorted(n for n in os.listdir(PROFILE_DIR) if n.endswith(".json"))
+    for old in files[:-PROFILE_MAX_FILES] if PROFILE_MAX_FILES > 0 else []:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old))
+        except OSError:
+            pass
+
+
+def list_profiles() -> List[dict]:
+    """
+    최근 프로파일 요약 목록 (최신순)
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    items = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        items.append(
+            {
+                "name": name,
+                "endpoint": record.get("endpoint"),
+                "method": record.get("method"),
+                "path": record.get("path"),
+                "status": record.get("status"),
+                "reason": record.get("reason"),
+                "durationMs": record.get("durationMs"),
+                "sqlCount": len(record.get("sql") or []),
+                "startedAt": record.get("startedAt"),
+            }
+        )
+    return items
+
+
+def load_profile(name: str) -> Optional[dict]:
+    # 경로 조작 방지: 디렉터리 안의 파일 이름만 허용
+    if os.path.basename(name) != name or not name.endswith(".json"):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------
+# Flask 연동
+# ----------------------------------------------------------------------
+def profiler_enabled() -> bool:
+    return PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0
+
+
+def init_profiler(app):
+    global _sampler
+    if not profiler_enabled():
+        return
+    if PROFILE_SLOW_MS > 0:
+        _sampler = _StackSampler(PROFILE_STACK_INTERVAL_MS / 1000.0)
+
+    @app.before_request
+    def _profile_start():
+        state = {"started": time.perf_counter(), "startedAt": time.time(), "profile": None}
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                state["profile"] = profile
+            except ValueError:
+                # 다른 프로파일러가 이미 동작 중
+                pass
+        if state["profile"] is None and _sampler is not None:
+            state["thread_id"] = threading.get_ident()
+            _sampler.start(state["thread_id"])
+        start_statement_capture()
+        g._profile_state = state
+
+    @app.after_request
+    def _profile_finish(response):
+        state = g.pop("_profile_state", None)
+        if state is None:
+            return response
+
+        profile = state["profile"]
+        if profile is not None:
+            profile.disable()
+        stacks = _sampler.stop(state["thread_id"]) if "thread_id" in state else None
+        statements = stop_statement_capture()
+
+        duration_ms = (time.perf_counter() - state["started"]) * 1000.0
+        slow = PROFILE_SLOW_MS > 0 and duration_ms >= PROFILE_SLOW_MS
+        if profile is None and not slow:
+            return response
+
+        record = {
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "reason": "sampled" if profile is not None else "slow",
+            "durationMs": round(duration_ms, 2),
+            "startedAt": state["startedAt"],
+            "pid": os.getpid(),
+            "sql": statements,
+            "sqlTotalMs": round(sum(s["durationMs"] for s in statements), 3),
+        }
+        if profile is not None:
+            record["cprofile"] = _cprofile_summary(profile)
+        if stacks:
+            record["stackIntervalMs"] = PROFILE_STACK_INTERVAL_MS
+            record["stacks"] = [
+                {"stack": stack, "samples": n} for stack, n in stacks.most_common(_TOP_STACKS)
+            ]
+        try:
+            _write_profile(record)
+        except OSError:
+            pass
+        return response
+
+    @app.teardown_request
+    def _profile_cleanup(exc):
+        # after_request까지 가지 못한 요청: 프로파일러/샘플러 등록만 정리
+        state = g.pop("_profile_state", None)
+        if state is None:
+            return
+        if state["profile"] is not None:
+            state["profile"].disable()
+        if "thread_id" in state:
+            _sampler.stop(state["thread_id"])
+        stop_statement_capture()
@@ -0,0 +1,72 @@
+# utils/query_plan.py
+
+"""
+SQLite EXPLAIN QUERY PLAN 기반 풀스캔 회귀 체크 (tests/test_query_plans.py 에서 사용).
+
+- capture_statements() 안에서 엔드포인트/작업을 실제로 실행해 날아간 SQL(문 + 파라미터)을 모으고,
+- find_full_scans()로 그 문장들의 plan에 이력 테이블 SCAN이 있는지 본다.
+  'SCAN <table>'은 인덱스를 쓰더라도('USING INDEX ...') 테이블/인덱스 전체를 훑는 것이므로
+  LIMIT 유무와 상관없이 모두 실패로 본다. (SEARCH만 허용)
+"""
+
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 시간이 지날수록 계속 커지는 테이블 (rackets는 카탈로그라 제외)
+LARGE_TABLES = {
+    "hand_metrics",
+    "survey_responses",
+    "recommendation_logs",
+    "profile_snapshots",
+}
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+@contextmanager
+def capture_statements():
+    """
+    with 블록 안에서 실행된 SQL을 [(statement, parameters), ...] 로 모은다. (executemany 제외)
+    """
+    statements: List[Tuple[str, object]] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", on_execute)
+
+
+def explain_query_plan(connection, statement: str, parameters=()) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN detail 문자열 목록 (SQLite 연결에서만)
+    """
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _is_full_scan(detail: str) -> bool:
+    # 'SCAN hand_metrics', 'SCAN recommendation_logs USING INDEX ...' 모두 포함
+    parts = detail.split()
+    return len(parts) >= 2 and parts[0] == "SCAN" and parts[1] in LARGE_TABLES
+
+
+def find_full_scans(connection, statements) -> Dict[str, List[str]]:
+    """
+    statements 중 plan에 이력 테이블 SCAN이 있는 문장만 {SQL: plan} 으로 반환.
+    """
+    failures: Dict[str, List[str]] = {}
+    for statement, parameters in statements:
+        if statement in failures or statement.lstrip().split(None, 1)[0].upper() not in _EXPLAINABLE:
+            continue
+        plan = explain_query_plan(connection, statement, parameters)
+        if any(_is_full_scan(d) for d in plan):
+            failures[statement] = plan
+    return failures
@@ -0,0 +1,184 @@
+# utils/sql_stats.py
+
+"""
+요청 단위 SQL 쿼리 카운터 / 시간 / 느린 쿼리 로그.
+
+- 모든 Engine의 cursor execute 이벤트로 현재 요청(g)의 쿼리 수와 누적 시간을 센다.
+- 요청이 끝나면 엔드포인트별로 /metrics 에 기록한다.
+  (http_request_db_queries, http_request_db_seconds 히스토그램 — 엔드포인트별 쿼리 수 회귀 확인용)
+- SQL_SLOW_MS 이상 걸린 문장은 "sql.slow" 로거에 경고로 남긴다. (파라미터는 값 대신 모양만)
+- debug 모드(또는 SQL_SERVER_TIMING=1)에서는 응답에 Server-Timing: db;dur=..;desc="N queries" 헤더를 단다.
+- @query_budget(n) 을 붙인 뷰가 n개를 넘는 쿼리를 날리면
+  TESTING 모드에서는 AssertionError로 실패시키고, 그 외에는 X-Query-Budget-Exceeded 헤더를 단다.
+  (목록 API에 N+1이 생기는 회귀를 잡기 위한 용도)
+- 문장 종류(select/insert/...)별 실행 수와 시간은 /metrics (db_queries_total, db_query_duration_seconds)
+- start_statement_capture() 이후 현재 요청에서 실행된 SQL 문/시간을 모은다. (프로파일러용)
+"""
+
+import logging
+import os
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import DB_QUERIES, DB_QUERY_LATENCY, REQUEST_DB_QUERIES, REQUEST_DB_TIME
+
+slow_query_logger = logging.getLogger("sql.slow")
+
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "100"))
+SQL_SERVER_TIMING = os.getenv("SQL_SERVER_TIMING", "0").strip().lower() in ("1", "true", "yes", "on")
+
+_listening = False
+
+# 요청 하나에서 모을 최대 SQL 문 수
+MAX_CAPTURED_STATEMENTS = 500
+
+
+def _statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:10].split(None, 1)
+    return head[0].lower() if head else "other"
+
+
+def _on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g._sql_query_count = g.get("_sql_query_count", 0) + 1
+    conn.info.setdefault("_sql_started", []).append(time.perf_counter())
+
+
+def _on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("_sql_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    kind = _statement_kind(statement)
+    DB_QUERIES.inc(kind=kind)
+    DB_QUERY_LATENCY.observe(elapsed, kind=kind)
+
+    in_request = has_request_context()
+    if SQL_SLOW_MS > 0 and elapsed * 1000.0 >= SQL_SLOW_MS:
+        slow_query_logger.warning(
+            "slow query %.1fms endpoint=%s params=%s sql=%s",
+            elapsed * 1000.0,
+            request.endpoint if in_request else None,
+            _params_shape(parameters, executemany),
+            " ".join(statement.split())[:1000],
+        )
+
+    if in_request:
+        g._sql_query_time = g.get("_sql_query_time", 0.0) + elapsed
+        captured = g.get("_sql_captured")
+        if captured is not None and len(captured) < MAX_CAPTURED_STATEMENTS:
+            captured.append(
+                {
+                    "statement": statement[:2000],
+                    "durationMs": round(elapsed * 1000.0, 3),
+                    "executemany": bool(executemany),
+                }
+            )
+
+
+def _on_handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("_sql_started") if conn is not None else None
+    if started:
+        started.pop()
+
+
+def _params_shape(parameters, executemany) -> str:
+    """
+    바인딩 값은 로그에 남기지 않고 모양만: dict → 키 목록, 시퀀스 → 개수, executemany → 행 수 × 모양
+    """
+    if (
+        executemany
+        and isinstance(parameters, (list, tuple))
+        and parameters
+        and isinstance(parameters[0], (list, tuple, dict))
+    ):
+        first = _params_shape(parameters[0], False)
+        return f"{len(parameters)}x{first}"
+    if isinstance(parameters, dict):
+        return "{" + ",".join(sorted(str(k) for k in parameters)) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return f"[{len(parameters)}]"
+    return "-"
+
+
+def start_statement_capture():
+    g._sql_captured = []
+
+
+def stop_statement_capture() -> list:
+    captured = g.pop("_sql_captured", None)
+    return captured or []
+
+
+def request_query_count() -> int:
+    if not has_request_context():
+        return 0
+    return g.get("_sql_query_count", 0)
+
+
+def request_query_time() -> float:
+    """
+    현재 요청에서 SQL 실행에 쓴 시간 (초)
+    """
+    if not has_request_context():
+        return 0.0
+    return g.get("_sql_query_time", 0.0)
+
+
+def query_budget(max_queries: int):
+    """
+    뷰 함수가 한 요청에서 쓸 수 있는 최대 쿼리 수를 선언한다.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+
+        wrapper._query_budget = max_queries
+        return wrapper
+
+    return decorator
+
+
+def init_sql_stats(app):
+    global _listening
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _on_before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _on_after_cursor_execute)
+        event.listen(Engine, "handle_error", _on_handle_error)
+        _listening = True
+
+    @app.after_request
+    def _record_request_sql(response):
+        count = request_query_count()
+        elapsed = request_query_time()
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_DB_QUERIES.observe(count, endpoint=endpoint)
+        REQUEST_DB_TIME.observe(elapsed, endpoint=endpoint)
+        if app.debug or SQL_SERVER_TIMING:
+            response.headers.add(
+                "Server-Timing", f'db;dur={elapsed * 1000.0:.2f};desc="{count} queries"'
+            )
+        return response
+
+    @app.after_request
+    def _check_query_budget(response):
+        view = app.view_functions.get(request.endpoint)
+        budget = getattr(view, "_query_budget", None)
+        if budget is None:
+            return response
+
+        count = request_query_count()
+        if count > budget:
+            if app.testing:
+                raise AssertionError(
+                    f"{request.endpoint}: {count} queries (budget {budget})"
+                )
+            response.headers["X-Query-Budget-Exceeded"] = f"{count}/{budget}"
+        return response
@@ -0,0 +1,181 @@
+# utils/upload_guard.py
+
+"""
+손 사진 업로드 제한 (@image_upload 를 붙인 뷰만).
+
+- UPLOAD_MAX_BYTES (기본 10 MiB) : 요청 본문 상한. Content-Length가 넘으면 본문을 읽기 전에 413,
+  Content-Length 없이(chunked) 오면 읽다가 넘는 순간 413.
+  그 밖의 요청은 MAX_CONTENT_LENGTH (기본 32 MiB, admin CSV 업로드 등)
+- 파일 part의 첫 청크가 들어오는 즉시 magic byte 확인 → JPEG/PNG/WebP가 아니면 415 (나머지 본문은 읽지 않음)
+- JPEG는 SOF, PNG는 IHDR 헤더에서 가로×세로를 읽어 UPLOAD_MAX_PIXELS (기본 50M) 를 넘으면 413 (decode 전)
+  (SOF가 UPLOAD_HEADER_SCAN_BYTES 안에 없으면 크기 검사 없이 통과 — decode 단계에서 판단)
+- 오류 응답은 {"error": ...} JSON
+"""
+
+import os
+import struct
+
+from flask import Request, current_app, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_MAX_PIXELS = int(os.getenv("UPLOAD_MAX_PIXELS", str(50 * 1000 * 1000)))
+UPLOAD_HEADER_SCAN_BYTES = int(os.getenv("UPLOAD_HEADER_SCAN_BYTES", str(512 * 1024)))
+MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(32 * 1024 * 1024)))
+
+_JPEG = b"\xff\xd8\xff"
+_PNG = b"\x89PNG\r\n\x1a\n"
+
+# 길이 필드가 없는 JPEG 마커 (TEM, RST0~7)
+_JPEG_STANDALONE = {0x01} | set(range(0xD0, 0xD8))
+# 크기 정보가 있는 SOF 마커 (DHT/JPG/DAC 제외)
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_upload(view):
+    """
+    뷰에 업로드 제한을 건다. (route 바로 아래에 붙일 것)
+    """
+    view._image_upload = True
+    return view
+
+
+# ----------------------------------------------------------------------
+# 헤더 검사
+# ----------------------------------------------------------------------
+def _jpeg_size(head: bytes):
+    """
+    JPEG 마커를 따라가 SOF의 (가로, 세로). 아직 바이트가 모자라면 None, SOF 없이 끝나면 False
+    """
+    pos = 2
+    while True:
+        # 마커 앞 0xFF 채움 바이트는 건너뛴다
+        while pos < len(head) and head[pos] == 0xFF:
+            pos += 1
+        if pos + 1 > len(head):
+            return None
+        marker = head[pos]
+        pos += 1
+        if marker in _JPEG_STANDALONE:
+            continue
+        if marker in (0xD9, 0xDA):
+            # EOI / SOS 전에 SOF가 없었음
+            return False
+        if pos + 2 > len(head):
+            return None
+        (length,) = struct.unpack(">H", head[pos : pos + 2])
+        if marker in _JPEG_SOF:
+            if pos + 7 > len(head):
+                return None
+            height, width = struct.unpack(">HH", head[pos + 3 : pos + 7])
+            return width, height
+        pos += length
+
+
+def _inspect_image_head(head: bytes, final: bool) -> bool:
+    """
+    업로드 앞부분 검사. 판정이 끝났으면 True, 바이트가 더 필요하면 False.
+    이미지가 아니거나 너무 크면 HTTPException.
+    """
+    if len(head) < 12 and not final:
+        return False
+
+    if head.startswith(_JPEG):
+        size = _jpeg_size(head)
+        if size is None and not final and len(head) < UPLOAD_HEADER_SCAN_BYTES:
+            return False
+    elif head.startswith(_PNG):
+        if len(head) < 24:
+            if not final:
+                return False
+            raise UnsupportedMediaType("이미지 파일이 손상되었습니다")
+        size = struct.unpack(">II", head[16:24])
+    elif head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        size = None
+    else:
+        raise UnsupportedMediaType("JPEG / PNG / WebP 이미지만 업로드할 수 있습니다")
+
+    if size:
+        width, height = size
+        if width * height > UPLOAD_MAX_PIXELS:
+            raise RequestEntityTooLarge(
+                f"이미지 해상도가 너무 큽니다 ({width}x{height}, 최대 {UPLOAD_MAX_PIXELS} 픽셀)"
+            )
+    return True
+
+
+class _ImageSniffStream:
+    """
+    multipart 파서가 파일 part를 써 넣는 스트림. 앞부분이 모이는 대로 형식/해상도를 검사한다.
+    (예외는 파서 밖으로 올라가 request.files 접근 시점에 응답이 되고, 남은 본문은 읽지 않는다)
+    """
+
+    def __init__(self, inner):
+        self._inner = inner
+        self._head = bytearray()
+        self._checked = False
+
+    def write(self, data):
+        if not self._checked:
+            self._head += data
+            self._checked = _inspect_image_head(bytes(self._head), final=False)
+            if self._checked:
+                self._head = None
+        return self._inner.write(data)
+
+    def seek(self, *args):
+        # 파서는 part를 다 쓴 뒤 seek(0) 한다 → 짧은 파일도 여기서 최종 판정
+        if not self._checked:
+            self._checked = _inspect_image_head(bytes(self._head), final=True)
+            self._head = None
+        return self._inner.seek(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+# ----------------------------------------------------------------------
+# Flask 연동
+# ----------------------------------------------------------------------
+class UploadGuardRequest(Request):
+    def _is_image_upload(self) -> bool:
+        if not current_app or self.endpoint is None:
+            return False
+        view = current_app.view_functions.get(self.endpoint)
+        return getattr(view, "_image_upload", False)
+
+    @property
+    def max_content_length(self):
+        if self._max_content_length is None and self._is_image_upload():
+            return UPLOAD_MAX_BYTES
+        return super().max_content_length
+
+    @max_content_length.setter
+    def max_content_length(self, value):
+        self._max_content_length = value
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        if self._is_image_upload():
+            return _ImageSniffStream(stream)
+        return stream
+
+
+def init_upload_guard(app):
+    app.request_class = UploadGuardRequest
+    # Flask 기본값은 None(무제한)
+    if app.config.get("MAX_CONTENT_LENGTH") is None:
+        app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
+
+    @app.errorhandler(RequestEntityTooLarge)
+    @app.errorhandler(UnsupportedMediaType)
+    def _upload_rejected(e):
+        message = e.description
+        if message == type(e).description:
+            # werkzeug 기본 문구 (본문 크기 초과 등)
+            if e.code == 413:
+                limit_mib = (request.max_content_length or 0) / (1024 * 1024)
+                message = f"업로드 크기가 너무 큽니다 (최대 {limit_mib:g} MiB)"
+            else:
+                message = "지원하지 않는 형식입니다"
+        return jsonify({"error": message}), e.code